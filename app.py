@@ -1,17 +1,24 @@
-from dash import Dash, html, dcc, Input, Output, callback
-from pages import commitment_of_traders_eur_forcast, german_10_year_breakeven_inflation, german_10_year_inflation_protected_rate,german_10_year_bonds, german_breakeven_eurusd, philippine_instant_3_in_1_coffee_price,telecom_interest_sensitive_stock, wilshire_cumulative_change, wilshire_net_income, us_companies_cashflow_tax, capital_expenditure, interest_rate_differential_eur_usd, free_cash_flow_to_debt, commitment_of_traders, philippine_rice_price, philippine_egg_price, philippine_milk_price, philippine_instant_noodles_price, philippine_cooking_oil_price, philippine_onion_price, philippine_sugar_price, philippine_detergent_powder, philippine_sardines, philippine_milk_alternative, philippine_vinegar_white, philippine_vinegar_cane, philippine_garlic_price
-from cache import cache
+from dash import Dash, html, dcc, Input, Output, callback, MATCH, ctx
+from dash.exceptions import PreventUpdate
+from cache import cache, bump_data_version
+from snapshot import DIV_ID_PLACEHOLDER, get_snapshot, embed_response_parts, prerender_snapshots
 from flask import request
 import data.queries as dq
-import time
+from data.refresh import refresh_all, REFRESH_MAX_WORKERS
+from metrics import LAST_REFRESH_KEY, prometheus_text, refresh_metrics_text, summary as metrics_summary
 from datetime import datetime 
-import inspect
 from flask import Response, json
 from flask_cors import CORS
-from utils.utility import find_graph
-import data.queries as dq
+from utils.figures import figure_to_json, TYPED_ARRAY_FALLBACK_JS
+from layouts import get_layout, get_figure, get_detail_figure, DETAIL_GRAPH, DOWNLOAD, DOWNLOAD_BUTTON
+from pages.registry import LazyPageRegistry, PAGE_MODULES
+from utils.data_export import FORMATS as EXPORT_FORMATS, format_available, negotiate_encoding, export_frame
+from data.ranges import accepts_range, as_date, slice_range
 import json
 import re
+from html import escape as html_escape
+import numpy as np
+import pandas as pd
 
 app = Dash(__name__,  suppress_callback_exceptions=True)
 CORS(app.server)
@@ -21,45 +28,24 @@ app.layout = html.Div([
     html.Div(id='page-content')
 ])
 
-# Centralized page → layout cache mapping
-PAGE_LAYOUTS = {
-    "german-10-year-bonds": german_10_year_bonds,
-    "german-10-year-inflation-protected-rate": german_10_year_inflation_protected_rate,
-    "german-10-year-breakeven-inflation": german_10_year_breakeven_inflation,
-    "wilshire-total-net-income": wilshire_net_income,
-    "german-inflation-real-return-spread-eurusd": german_breakeven_eurusd,
-    "telecom-interest-sensitive-stock": telecom_interest_sensitive_stock,
-    "wilshire-5000-cumulative-change": wilshire_cumulative_change,
-    "us-companies-cashflow-tax": us_companies_cashflow_tax,
-    "capital-expenditure": capital_expenditure,
-    "interest-rate-differential-eur-usd": interest_rate_differential_eur_usd,
-    "free-cash-flow-to-debt": free_cash_flow_to_debt,
-    "commitment-of-traders": commitment_of_traders,
-    "commitment-of_traders-eur-forecast": commitment_of_traders_eur_forcast,
-    "philippine-rice-price-history": philippine_rice_price,
-    "philippine-egg-price-history": philippine_egg_price,
-    "philippine-milk-price-history": philippine_milk_price,
-    "philippine-milk-alternative-price-history": philippine_milk_alternative,
-    "philippine-instant-noodles-price-history": philippine_instant_noodles_price,
-    "philippine-instant-3-in-1-coffee-price-history": philippine_instant_3_in_1_coffee_price,
-    "philippine-cooking-oil-price-history": philippine_cooking_oil_price,
-    "philippine-onion-price-history": philippine_onion_price,
-    "philippine-sugar-history": philippine_sugar_price,
-    "philippine-detergent-powder": philippine_detergent_powder,
-    "philippine-sardines": philippine_sardines,
-    "philippine-white-vinegar": philippine_vinegar_white,
-    "philippine-cane-vinegar": philippine_vinegar_cane,
-    "philippine-garlic-price": philippine_garlic_price,
-}
+# Centralized page → layout cache mapping, pages are imported on first use
+PAGE_LAYOUTS = LazyPageRegistry(PAGE_MODULES)
 
 # Same mapping for API figure extraction
 API_FIGURES = PAGE_LAYOUTS
 
+# Page module → slug, for callbacks whose component ids name the module
+PAGE_SLUGS = {module: slug for slug, module in PAGE_MODULES.items()}
+
+
+# Hidden SEO table limits: long daily series are sampled down to this many rows
+SEO_TABLE_MAX_ROWS = 500
+SEO_TABLE_SAMPLING = "even"
 
 def get_raw_data_for_pathname(pathname):
     """
-    Retrieves the raw data DataFrame using the module's get_data() function
-    and converts it into the column-oriented dictionary format for the table generator.
+    Retrieves the raw data DataFrame using the module's get_data() function.
+    Returns None when the page has no data to show.
     """
     # Use the existing PAGE_LAYOUTS mapping to find the correct module
     module = API_FIGURES.get(pathname) 
@@ -67,60 +53,84 @@ def get_raw_data_for_pathname(pathname):
     if module is None or not hasattr(module, "get_data"):
         # This case should ideally be caught by api_router/api_data, 
         # but handled here for safety.
-        return {}
+        return None
 
     try:
         # Call the module's get_data() function to get the DataFrame
         df = module.get_data()
     except Exception as e:
         print(f"Error retrieving data for {pathname}: {e}")
-        return {}
+        return None
         
     if df is None or df.empty:
-        return {}
-    
-    # Convert the DataFrame to a dictionary where keys are column names 
-    # and values are lists of data points. This is the required format.
+        return None
+
     # Note: We return all columns in the DataFrame for completeness in the hidden table.
-    return df.to_dict('list')
+    return df
+
+def sample_rows(df, max_rows=SEO_TABLE_MAX_ROWS, sampling=SEO_TABLE_SAMPLING):
+    """
+    Caps the number of rows shown in the hidden table.
+
+    Args:
+        df (pd.DataFrame): Page data.
+        max_rows (int): Row cap, None for no cap.
+        sampling (str): 'even' keeps evenly spaced rows including the first and
+            last, 'tail' keeps the most recent rows, 'head' the oldest.
+    """
+    if max_rows is None or len(df) <= max_rows:
+        return df
+    if sampling == "tail":
+        return df.iloc[-max_rows:]
+    if sampling == "head":
+        return df.iloc[:max_rows]
+    positions = np.unique(np.linspace(0, len(df) - 1, max_rows).round().astype(int))
+    return df.iloc[positions]
+
+def _cell_strings(values):
+    # Dates without a time part render as 2025-05-24, not 2025-05-24 00:00:00
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        dates = values.dropna()
+        if (dates == dates.dt.normalize()).all():
+            return values.dt.strftime('%Y-%m-%d')
+    return values.astype(str)
+
+def _escaped_column(values):
+    # Nulls are masked after the cast; astype(str) turns them into "nan"/"NaT"
+    return (
+        _cell_strings(values)
+        .where(values.notna(), "")
+        .str.replace("&", "&amp;", regex=False)
+        .str.replace("<", "&lt;", regex=False)
+        .str.replace(">", "&gt;", regex=False)
+    )
 
-def generate_invisible_data_table(raw_data, pathname):
+def generate_invisible_data_table(df, pathname, max_rows=SEO_TABLE_MAX_ROWS, sampling=SEO_TABLE_SAMPLING):
     """
     Generates a hidden HTML table containing the raw data for SEO and accessibility.
     
     Args:
-        raw_data (dict): Data in {'col_name': [v1, v2, ...]} format.
+        df (pd.DataFrame): Page data as returned by get_data().
         pathname (str): The API endpoint path, used for table summary.
+        max_rows (int): Row cap passed to sample_rows().
+        sampling (str): Sampling strategy passed to sample_rows().
     """
     
-    if not raw_data:
+    if df is None or len(df.columns) == 0 or df.empty:
         return ""
-    
-    # Determine Headers
-    headers = list(raw_data.keys()) 
-    
-    # Determine number of rows based on the length of the first column list
-    try:
-        num_rows = len(raw_data[headers[0]])
-    except IndexError:
-        return "" 
+
+    df = sample_rows(df, max_rows, sampling)
 
     # Build Table Header
-    thead = "<thead><tr>"
-    for h in headers:
-        thead += f"<th>{h}</th>"
-    thead += "</tr></thead>"
-    
-    # Build Table Body (Iterate rows, then columns)
-    tbody = "<tbody>"
-    for i in range(num_rows):
-        tbody += "<tr>"
-        for col in headers:
-            # Access the cell value
-            cell_value = raw_data[col][i]
-            tbody += f"<td>{cell_value}</td>"
-        tbody += "</tr>"
-    tbody += "</tbody>"
+    thead = "<thead><tr>" + "".join(f"<th>{html_escape(str(h))}</th>" for h in df.columns) + "</tr></thead>"
+
+    # Build Table Body column-wise: each column is escaped in bulk and the row
+    # strings are concatenated as vectors, then joined once
+    rows = None
+    for col in range(len(df.columns)):
+        cells = "<td>" + _escaped_column(df.iloc[:, col]) + "</td>"
+        rows = cells if rows is None else rows + cells
+    tbody = "<tbody><tr>" + "</tr><tr>".join(rows.tolist()) + "</tr></tbody>"
     
     # CSS to hide the table but keep it accessible for screen readers and indexers
     table_style = """
@@ -145,6 +155,22 @@ def generate_invisible_data_table(raw_data, pathname):
     """
     return table_html
 
+def get_invisible_data_table(pathname, version):
+    """
+    Returns (table_html, columns) for a page, rendered once per data version
+    and shared across workers through the cache.
+    """
+    key = f"seo_table:{pathname}:{version}:{SEO_TABLE_MAX_ROWS}:{SEO_TABLE_SAMPLING}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    df = get_raw_data_for_pathname(pathname)
+    columns = list(df.columns) if df is not None else []
+    cached = (generate_invisible_data_table(df, pathname), columns)
+    cache.set(key, cached)
+    return cached
+
 def get_schema_org_jsonld(pathname, title, description, columns, date_modified, url, spatial_coverage):
     """
     Generates the JSON-LD script tag for Schema.org Dataset annotation.
@@ -193,91 +219,58 @@ def get_schema_org_jsonld(pathname, title, description, columns, date_modified,
 
 @app.server.route('/refresh_cache', methods=['POST'])
 def refresh_cache():
-    all_funcs = [
-        func for name, func in inspect.getmembers(dq, inspect.isfunction)
-        if func.__module__ == dq.__name__
-    ]
-
-    errors = []
-
-    for func in all_funcs:
-        # Clear cache first
-        cache.delete_memoized(func)
-
-        try:
-            # Execute the function to repopulate cache
-            print(f"🔄 Caching → {func.__name__}()")
-            func()  
-        except Exception as e:
-            msg = f"⚠️ {func.__name__} failed: {e}"
-            print(msg)
-            errors.append(msg)
-
-    # Optional: return response listing which functions failed
-    if errors:
-        return Response(
-            "Cache refreshed with some errors:\n" + "\n".join(errors), 
-            status=207
-        )
-
-    return Response("Cache has been fully refreshed and rebuilt.", status=200)
-
-@app.server.route('/api/<pathname>')
-def api_router(pathname):
-    div_id = request.args.get('div_id', 'plotly-chart')
+    # Queries run concurrently and each cache entry is overwritten in place
+    # Incremental queries only fetch new rows unless ?full=1
+    max_workers = request.args.get('max_workers', REFRESH_MAX_WORKERS, type=int)
+    full = request.args.get('full', '0') in ('1', 'true')
+    report = refresh_all(max_workers=max_workers, full=full)
+
+    # New data version: invalidates old embed snapshots and pre-renders the new ones
+    bump_data_version()
+    report["snapshot_errors"] = prerender_snapshots(PAGE_LAYOUTS, render_embed)
+
+    # Structured report; 207 lists which queries failed
+    status = 207 if report["failed"] or report["snapshot_errors"] else 200
+    return Response(json.dumps(report, indent=2), status=status, mimetype="application/json")
+
+@app.server.route('/metrics')
+def metrics():
+    # Query counters are per worker (labelled with pid), the last refresh is shared
+    body = prometheus_text() + refresh_metrics_text(cache.get(LAST_REFRESH_KEY))
+    return Response(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.server.route('/metrics.json')
+def metrics_json():
+    data = metrics_summary()
+    data["last_refresh"] = cache.get(LAST_REFRESH_KEY)
+    return Response(json.dumps(data, indent=2), mimetype="application/json")
+
+def render_embed(pathname, date_modified):
+    """
+    Renders the embeddable HTML block for a page. The caller's div_id is left as
+    DIV_ID_PLACEHOLDER so the result can be stored once per data version.
 
-    if pathname not in API_FIGURES:
-        return Response(f"Unknown API endpoint: {pathname}", status=404)
+    Args:
+        pathname (str): Key in API_FIGURES.
+        date_modified (str): ISO 8601 timestamp of the data version.
+    """
+    div_id = DIV_ID_PLACEHOLDER
 
-    layout = API_FIGURES[pathname].layout()
-    meta_data = API_FIGURES[pathname].get_meta_data()
+    module = API_FIGURES[pathname]
+    meta_data = module.get_meta_data()
 
     spatial_coverage = meta_data.get('spatial_coverage')
     url = meta_data.get('url')
 
-    fig = find_graph(layout) # Assuming find_graph returns the plotly.graph_objects.Figure
-
-    extracted_title = ""
-    extracted_desc = ""
-
-    # Extract title
-    full_title_html = fig.layout.title.text
-
-    # --- Extract Title (before <br>) ---
-    extracted_title = full_title_html.split("<br>")[0].strip()
-
-    # --- Extract Description (inside <span>...</span>) ---
-    try:
-        # Get everything after <span ...>
-        span_block = full_title_html.split("<span")[1]
-
-        # Remove the leading attributes up to closing ">"
-        span_block = span_block.split(">", 1)[1]
-
-        # Remove closing </span>
-        span_block = span_block.replace("</span>", "")
+    # Figure dict straight from the page contract, no Dash tree to build or walk
+    fig = get_figure(pathname, module)
 
-        # Replace <br> with space
-        span_block = span_block.replace("<br>", " ")
-
-        # Remove <b> tags
-        span_block = span_block.replace("<b>", "").replace("</b>", "")
-
-        # Remove the datasource line entirely
-        span_block = span_block.replace("Data provided by yellowplannet.com", "")
-
-        # Final clean text
-        extracted_desc = span_block.strip()
-
-    except Exception:
-        extracted_desc = ""
+    if fig is None:
+        return None
 
-    if extracted_desc is None:
-        extracted_desc = ""
+    extracted_title = meta_data.get('title', '')
+    extracted_desc = meta_data.get('description', '')
 
-    if fig is None:
-        return Response(f"No figure found for {pathname}", status=404)
-    
     # --- START HIGH-RES CONFIGURATION & DYNAMIC FILENAME ---
 
     # 1. Generate sanitized filename
@@ -307,12 +300,14 @@ def api_router(pathname):
 
     # --- END CONFIGURATION ---
 
-    figure_json = fig.to_json()
+    # Serialized once per data version and kept in the cache for reuse
+    figure_key = f"figure_json:{pathname}:{date_modified}"
+    figure_json = cache.get(figure_key)
+    if figure_json is None:
+        figure_json = figure_to_json(fig)
+        cache.set(figure_key, figure_json)
 
-    raw_data = get_raw_data_for_pathname(pathname) 
-    table_html = generate_invisible_data_table(raw_data, pathname) 
-    columns = list(raw_data.keys()) if raw_data else []
-    date_modified = datetime.now().isoformat() 
+    table_html, columns = get_invisible_data_table(pathname, date_modified)
     json_ld_annotation = get_schema_org_jsonld(
         pathname, 
         extracted_title, 
@@ -371,20 +366,62 @@ def api_router(pathname):
         {table_html}
 
         <script>
-            // The FIX: Pass the config_json_str as the 4th argument to Plotly.newPlot
-            Plotly.newPlot("{div_id}", {figure_json}.data, {figure_json}.layout, {config_json_str});
-
-            // Add window resize listener for responsiveness
-            window.addEventListener('resize', () => {{
-                const chartDiv = document.getElementById("{div_id}");
-                if (chartDiv && typeof Plotly !== 'undefined') {{
-                    Plotly.relayout(chartDiv, {{ autosize: true }});
+            (function () {{
+                // Figure payload is emitted once and bound to a block-scoped variable,
+                // so several embeds on one page don't clash
+                let figure = {figure_json};
+
+                // Arrays are base64 typed arrays; decode them for hosts on Plotly.js < 2.28
+                {TYPED_ARRAY_FALLBACK_JS}
+                if (!supportsTypedArrays()) {{
+                    figure = decodeTypedArrays(figure);
                 }}
-            }});
+
+                // The FIX: Pass the config_json_str as the 4th argument to Plotly.newPlot
+                Plotly.newPlot("{div_id}", figure.data, figure.layout, {config_json_str});
+
+                // Add window resize listener for responsiveness
+                window.addEventListener('resize', () => {{
+                    const chartDiv = document.getElementById("{div_id}");
+                    if (chartDiv && typeof Plotly !== 'undefined') {{
+                        Plotly.relayout(chartDiv, {{ autosize: true }});
+                    }}
+                }});
+            }})();
         </script>
         """
 
-    return Response(embed_html, mimetype="text/html")
+    return embed_html
+
+
+@app.server.route('/api/<pathname>')
+def api_router(pathname):
+    div_id = request.args.get('div_id', 'plotly-chart')
+
+    if pathname not in API_FIGURES:
+        return Response(f"Unknown API endpoint: {pathname}", status=404)
+
+    snapshot = get_snapshot(pathname, render_embed)
+    if snapshot["html"] is None:
+        return Response(f"No figure found for {pathname}", status=404)
+
+    embed_html, etag = embed_response_parts(snapshot, div_id)
+    headers = {
+        "Cache-Control": "public, max-age=300",
+        "Last-Modified": datetime.fromisoformat(snapshot["date_modified"]).strftime("%a, %d %b %Y %H:%M:%S GMT"),
+    }
+
+    # Embeds revalidate on every page view; answer unchanged ones without a body
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        response = Response(embed_html, mimetype="text/html", headers=headers)
+    response.set_etag(etag)
+    return response
+
+
+# Date columns ?start=&end= filters on for pages without a ranged get_data
+RANGE_COLUMNS = ("date", "dt")
 
 
 @app.server.route("/api/<pathname>/data")
@@ -393,24 +430,111 @@ def api_data(pathname):
         return Response(f"Unknown dataset: {pathname}", status=404)
 
     module = PAGE_LAYOUTS[pathname]
-    # if not hasattr(module, "get_data"):
-    #     return Response(f"Page '{pathname}' has no get_data() function.", status=400)
+    if not hasattr(module, "get_data"):
+        return Response(f"Page '{pathname}' has no get_data() function.", status=400)
+
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return Response(f"Unknown format: {fmt}", status=400)
+    if not format_available(fmt):
+        return Response(f"Format '{fmt}' is not available on this server.", status=406)
 
-    df = module.get_data()
-    csv_bytes = df.to_csv(index=False)
+    try:
+        start, end = as_date(request.args.get('start')), as_date(request.args.get('end'))
+    except ValueError:
+        return Response("start and end must be dates (YYYY-MM-DD)", status=400)
+    if start is not None and end is not None and start > end:
+        return Response("start must not be after end", status=400)
+
+    if start is None and end is None:
+        df = module.get_data()
+    elif accepts_range(module.get_data):
+        # Pushed down to the query, or sliced from a cached superset
+        df = module.get_data(start=start, end=end)
+    else:
+        df = module.get_data()
+        column = next((c for c in RANGE_COLUMNS if c in df.columns), None)
+        if column is None:
+            return Response(f"Dataset '{pathname}' has no date column to filter on.", status=400)
+        df = slice_range(df, column, start, end)
+
+    # Stream straight from the cached frame, compressed if the client accepts it
+    body, encoding = export_frame(df, fmt, negotiate_encoding(request.accept_encodings))
+    headers = {
+        "Content-Disposition": f'attachment; filename="{pathname}.{EXPORT_FORMATS[fmt]["extension"]}"',
+        "Vary": "Accept-Encoding",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
 
     return Response(
-        csv_bytes,
-        mimetype="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{pathname}.csv"'}
+        body,
+        mimetype=EXPORT_FORMATS[fmt]["mimetype"],
+        headers=headers
     )
 
 @app.callback(Output('page-content', 'children'), Input('url', 'pathname'))
 def display_page(pathname):
     clean_path = pathname.lstrip("/")
     if clean_path in PAGE_LAYOUTS:
-        return PAGE_LAYOUTS[clean_path].layout()
+        # Built once per data version and worker, see layouts.get_layout
+        return get_layout(clean_path, PAGE_LAYOUTS[clean_path].layout)
     return "404 - Page not found"
 
+
+def _relayout_x_range(relayout):
+    """
+    (x0, x1) from a Graph's relayoutData: the zoomed or panned x range,
+    (None, None) after autoscale, None when the x axis did not change.
+    """
+    if not relayout:
+        return None
+    if "xaxis.range[0]" in relayout and "xaxis.range[1]" in relayout:
+        return relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]
+    if isinstance(relayout.get("xaxis.range"), list) and len(relayout["xaxis.range"]) == 2:
+        return tuple(relayout["xaxis.range"])
+    if relayout.get("xaxis.autorange"):
+        return None, None
+    return None
+
+
+@app.callback(
+    Output({"type": DETAIL_GRAPH, "page": MATCH}, "figure"),
+    Input({"type": DETAIL_GRAPH, "page": MATCH}, "relayoutData"),
+    prevent_initial_call=True,
+)
+def reload_detail(relayout):
+    # The page ships a screen-resolution overview; reload the zoomed window
+    # at full resolution from the per-version series, see layouts.get_detail_figure
+    slug = PAGE_SLUGS.get(ctx.triggered_id["page"])
+    x_range = _relayout_x_range(relayout)
+    if slug is None or x_range is None:
+        raise PreventUpdate
+    try:
+        figure = get_detail_figure(slug, PAGE_LAYOUTS[slug].layout, *x_range)
+    except (ValueError, TypeError) as e:
+        print(f"⚠️ detail reload for {slug} failed: {e}")
+        raise PreventUpdate
+    if figure is None:
+        raise PreventUpdate
+    return figure
+
+
+@app.callback(
+    Output({"type": DOWNLOAD, "page": MATCH}, "data"),
+    Input({"type": DOWNLOAD_BUTTON, "page": MATCH}, "n_clicks"),
+    prevent_initial_call=True,
+)
+def download_page_csv(n_clicks):
+    # One app-level callback for every page's CSV button, so pages stay
+    # unimported until they are served, see pages.registry
+    slug = PAGE_SLUGS.get(ctx.triggered_id["page"])
+    if slug is None or not n_clicks:
+        raise PreventUpdate
+    module = PAGE_LAYOUTS[slug]
+    if not hasattr(module, "download_csv"):
+        raise PreventUpdate
+    return module.download_csv()
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=8050)
\ No newline at end of file
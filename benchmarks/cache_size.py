@@ -0,0 +1,42 @@
+"""
+Bytes per cached query result: pickled DataFrame versus the Arrow encoding
+used by cache.memoize_swr.
+
+Run from the repository root against a populated cache:
+    python benchmarks/cache_size.py [--json]
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from data.refresh import memoized_queries
+from utils.frame_codec import size_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args()
+
+    with app.server.app_context():
+        frames = {func.__name__: func() for func in memoized_queries()}
+    report = size_report(frames)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'query':<50} {'rows':>8} {'pickle':>12} {'arrow':>12} {'ratio':>6}")
+    for r in sorted(report, key=lambda r: r["pickle_bytes"], reverse=True):
+        print(f"{r['name']:<50} {r['rows']:>8} {r['pickle_bytes']:>12,} {r['encoded_bytes']:>12,} {r['ratio']:>6}")
+    total_before = sum(r["pickle_bytes"] for r in report)
+    total_after = sum(r["encoded_bytes"] for r in report)
+    print(f"{'total':<50} {'':>8} {total_before:>12,} {total_after:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+End-to-end benchmark of every page against recorded ClickHouse results.
+
+For every entry in PAGE_LAYOUTS it times layout(), get_data(), the embed API
+(/api/<page>) and the data API (/api/<page>/data): once cold (empty cache)
+and --repeats times warm, reported as p50/p95. The peak Python allocation of
+one extra warm call is measured under tracemalloc, separately from the
+timings, and the process max RSS is reported at the end.
+
+Record once against a live server, then benchmark offline and compare
+commits:
+    python -m data.replay record
+    python benchmarks/e2e.py --output before.json
+    python benchmarks/e2e.py --compare before.json [--repeats 20] [--pages a,b] [--json]
+
+--synthetic SCALE seeds the cache with data.synthetic frames instead, so no
+recordings are needed and cold calls measure everything but the query.
+
+Defaults to replay mode with an in-process SimpleCache; --live queries the
+server from config.db_config and --cache app uses the app's Redis (which is
+then not cleared between pages).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data.replay import MODE_ENV, DIR_ENV, LIVE, REPLAY
+
+OPERATIONS = ("layout", "get_data", "api_router", "api_data")
+
+
+def _git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        return commit.stdout.strip(), bool(status.stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def measure(call, repeats):
+    """
+    Times call() cold and warm, then measures its peak allocation.
+
+    Returns:
+        dict: {'cold_ms', 'p50_ms', 'p95_ms', 'mean_ms', 'min_ms', 'max_ms', 'runs', 'peak_bytes'}
+    """
+    start = time.perf_counter()
+    call()
+    cold = time.perf_counter() - start
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times = np.array(times) if times else np.array([cold])
+    return {
+        "cold_ms": _ms(cold),
+        "p50_ms": _ms(np.percentile(times, 50)),
+        "p95_ms": _ms(np.percentile(times, 95)),
+        "mean_ms": _ms(times.mean()),
+        "min_ms": _ms(times.min()),
+        "max_ms": _ms(times.max()),
+        "runs": repeats,
+        "peak_bytes": int(peak),
+    }
+
+
+def _http(client, url):
+    def call():
+        response = client.get(url)
+        body = response.get_data()
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}: {body[:200]!r}")
+        return body
+    return call
+
+
+def run(pages, repeats, clear_cache, synthetic=None):
+    from app import app, PAGE_LAYOUTS
+    from cache import cache, l1_cache
+    from data.synthetic import seed_cache
+
+    server = app.server
+    client = server.test_client()
+    results = []
+    for pathname in pages:
+        if clear_cache:
+            # Every page starts cold, regardless of what earlier pages cached
+            with server.app_context():
+                cache.clear()
+            l1_cache.clear()
+        if synthetic is not None:
+            with server.app_context():
+                seed_cache(synthetic)
+
+        module = PAGE_LAYOUTS[pathname]
+        has_data = hasattr(module, "get_data")
+        calls = {
+            "layout": module.layout,
+            "get_data": module.get_data if has_data else None,
+            "api_router": _http(client, f"/api/{pathname}"),
+            "api_data": _http(client, f"/api/{pathname}/data") if has_data else None,
+        }
+        for operation in OPERATIONS:
+            call = calls[operation]
+            entry = {"page": pathname, "operation": operation, "status": "ok", "error": None}
+            if call is None:
+                entry["status"] = "skipped"
+            else:
+                try:
+                    with server.test_request_context(f"/{pathname}"):
+                        entry.update(measure(call, repeats))
+                except Exception as e:
+                    entry["status"], entry["error"] = "failed", f"{type(e).__name__}: {e}"
+            results.append(entry)
+            print(f"  {pathname:<50} {operation:<10} {entry['status']}", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline):
+    """
+    p50/p95 change against a previous report, per page and operation.
+    """
+    before = {(r["page"], r["operation"]): r for r in baseline["results"] if r["status"] == "ok"}
+    rows = []
+    for r in results:
+        old = before.get((r["page"], r["operation"]))
+        if r["status"] != "ok" or old is None:
+            continue
+        row = {"page": r["page"], "operation": r["operation"]}
+        for metric in ("p50_ms", "p95_ms", "peak_bytes"):
+            row[f"{metric}_before"], row[f"{metric}_after"] = old[metric], r[metric]
+            row[f"{metric}_change"] = round(r[metric] / old[metric] - 1, 4) if old[metric] else None
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=10, help="warm runs per operation")
+    parser.add_argument("--pages", default=None, help="comma-separated page slugs (default: all)")
+    parser.add_argument("--recordings", default=None, help=f"recordings directory (default ${DIR_ENV})")
+    parser.add_argument("--live", action="store_true", help="query the live server instead of the recordings")
+    parser.add_argument("--synthetic", type=float, default=None, metavar="SCALE",
+                        help="seed the cache with data.synthetic results at this scale instead of querying")
+    parser.add_argument("--cache", choices=["simple", "app"], default="simple",
+                        help="in-process SimpleCache (default) or the app's configured cache")
+    parser.add_argument("--output", default=None, help="also write the JSON report to this file")
+    parser.add_argument("--compare", default=None, help="previous JSON report to compare against")
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args()
+
+    # Before the app is imported: the ClickHouse client reads these on creation
+    os.environ[MODE_ENV] = LIVE if args.live else REPLAY
+    if args.recordings:
+        os.environ[DIR_ENV] = args.recordings
+
+    from app import app, PAGE_LAYOUTS
+    from cache import cache
+    if args.cache == "simple":
+        cache.init_app(app.server, config={"CACHE_TYPE": "SimpleCache", "CACHE_THRESHOLD": 100000,
+                                           "CACHE_DEFAULT_TIMEOUT": 0})
+
+    pages = args.pages.split(",") if args.pages else list(PAGE_LAYOUTS)
+    unknown = [p for p in pages if p not in PAGE_LAYOUTS]
+    if unknown:
+        parser.error(f"unknown pages: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    results = run(pages, args.repeats, clear_cache=args.cache == "simple", synthetic=args.synthetic)
+    commit, dirty = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": os.environ[MODE_ENV],
+            "cache": args.cache,
+            "synthetic_scale": args.synthetic,
+            "repeats": args.repeats,
+            "duration_s": round(time.perf_counter() - start, 3),
+            # ru_maxrss is in KiB on Linux
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(results, json.load(f))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'page':<50} {'operation':<10} {'cold':>9} {'p50':>9} {'p95':>9} {'peak KiB':>10}")
+    for r in results:
+        if r["status"] != "ok":
+            print(f"{r['page']:<50} {r['operation']:<10} {r['status']}" + (f": {r['error']}" if r["error"] else ""))
+            continue
+        print(f"{r['page']:<50} {r['operation']:<10} {r['cold_ms']:>9.1f} {r['p50_ms']:>9.1f} "
+              f"{r['p95_ms']:>9.1f} {r['peak_bytes'] / 1024:>10.0f}")
+    print(f"\nmax RSS: {report['meta']['max_rss_kb'] / 1024:.0f} MiB, {report['meta']['duration_s']} s")
+
+    for row in report.get("comparison", []):
+        change = row["p50_ms_change"]
+        if change is not None:
+            print(f"{row['page']:<50} {row['operation']:<10} p50 {change:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+How page cost grows with data volume, on synthetic query results.
+
+For each scale factor the query cache is seeded with data.synthetic frames
+(no ClickHouse needed) and, per page, layout() is timed (p50/p95 over
+--repeats), the figure as served (downsampled and typed-array encoded, see
+layouts.get_layout) serialized to measure the payload, and the peak
+Python allocation of one build measured under tracemalloc. get_data() rows
+are reported alongside.
+
+Run from the repository root:
+    python benchmarks/scaling.py [--scales 1,10,100,1000] [--pages a,b] [--repeats 3] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data.replay import MODE_ENV, REPLAY
+
+# The seeded cache answers every query; nothing should reach a server
+os.environ.setdefault(MODE_ENV, REPLAY)
+
+from app import app, PAGE_LAYOUTS
+from cache import cache, l1_cache
+from benchmarks.e2e import measure
+from data.synthetic import seed_cache, DEFAULT_SEED
+from layouts import get_layout, clear_layouts
+from utils.figures import find_graph, figure_to_json
+
+
+def page_at_scale(pathname, module, repeats):
+    entry = {"status": "ok", "error": None}
+    try:
+        entry.update(measure(module.layout, repeats))
+        figure = find_graph(get_layout(pathname, module.layout))
+        entry["payload_bytes"] = len(figure_to_json(figure)) if figure is not None else None
+        entry["data_rows"] = len(module.get_data()) if hasattr(module, "get_data") else None
+    except Exception as e:
+        entry["status"], entry["error"] = "failed", f"{type(e).__name__}: {e}"
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10,100,1000", help="comma-separated scale factors")
+    parser.add_argument("--pages", default=None, help="comma-separated page slugs (default: all)")
+    parser.add_argument("--repeats", type=int, default=3, help="warm layout() runs per page and scale")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args()
+
+    scales = [float(s) for s in args.scales.split(",")]
+    pages = args.pages.split(",") if args.pages else list(PAGE_LAYOUTS)
+    unknown = [p for p in pages if p not in PAGE_LAYOUTS]
+    if unknown:
+        parser.error(f"unknown pages: {', '.join(unknown)}")
+
+    cache.init_app(app.server, config={"CACHE_TYPE": "SimpleCache", "CACHE_THRESHOLD": 100000,
+                                       "CACHE_DEFAULT_TIMEOUT": 0})
+    results = []
+    for scale in scales:
+        with app.server.test_request_context("/"):
+            cache.clear()
+            l1_cache.clear()
+            clear_layouts()
+            start = time.perf_counter()
+            query_rows = seed_cache(scale, seed=args.seed)
+            seed_s = round(time.perf_counter() - start, 3)
+            print(f"scale {scale:g}: seeded {sum(query_rows.values()):,} rows in {seed_s} s", file=sys.stderr)
+            for pathname in pages:
+                entry = {"scale": scale, "page": pathname, **page_at_scale(pathname, PAGE_LAYOUTS[pathname], args.repeats)}
+                results.append(entry)
+                print(f"  {pathname:<50} {entry['status']}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps({"scales": scales, "seed": args.seed, "results": results}, indent=2))
+        return
+
+    print(f"{'page':<50} {'scale':>7} {'p50 ms':>10} {'payload KiB':>12} {'peak KiB':>10} {'rows':>10}")
+    for r in results:
+        if r["status"] != "ok":
+            print(f"{r['page']:<50} {r['scale']:>7g} failed: {r['error']}")
+            continue
+        payload = f"{r['payload_bytes'] / 1024:.0f}" if r["payload_bytes"] is not None else "-"
+        rows = r["data_rows"] if r["data_rows"] is not None else "-"
+        print(f"{r['page']:<50} {r['scale']:>7g} {r['p50_ms']:>10.1f} {payload:>12} "
+              f"{r['peak_bytes'] / 1024:>10.0f} {rows:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Worker cold-start benchmark.
+
+Measures, each in a fresh interpreter:
+  - the time to import wsgi (what every gunicorn worker pays at boot)
+  - the top modules by cumulative import time during that boot
+  - the extra time each page module costs when it is first used
+
+Run from the repository root (config.db_config must be importable):
+    python benchmarks/startup.py [--top 20] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pages.registry import PAGE_MODULES
+
+
+def _run(code, importtime=False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", code]
+    return subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def boot_profile(top):
+    """
+    Imports wsgi under -X importtime and returns the total boot time and the
+    slowest modules by cumulative microseconds.
+    """
+    result = _run("import wsgi", importtime=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        self_us, cumulative_us = self_us.strip(), cumulative_us.strip()
+        if not self_us.isdigit():
+            continue  # header line
+        modules.append({"module": name.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+
+    total = next((m["cumulative_ms"] for m in modules if m["module"] == "wsgi"), None)
+    modules.sort(key=lambda m: m["cumulative_ms"], reverse=True)
+    return total, modules[:top]
+
+
+def page_import_times():
+    """
+    Time to import each page in a worker that has already booted.
+    """
+    times = {}
+    for slug, module_path in PAGE_MODULES.items():
+        code = (
+            "import time, importlib, wsgi\n"
+            "start = time.perf_counter()\n"
+            f"importlib.import_module({module_path!r})\n"
+            "print((time.perf_counter() - start) * 1000)"
+        )
+        times[slug] = {"module": module_path, "import_ms": round(float(_run(code).stdout.strip()), 2)}
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=20, help="number of slowest boot modules to report")
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args()
+
+    boot_ms, slowest = boot_profile(args.top)
+    pages = page_import_times()
+    report = {"boot_ms": boot_ms, "slowest_boot_modules": slowest, "page_first_use": pages}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"wsgi boot: {boot_ms:.1f} ms\n")
+    print("Slowest modules at boot (cumulative ms):")
+    for m in slowest:
+        print(f"  {m['cumulative_ms']:>9.1f}  {m['module']}")
+    print("\nFirst-use page import (ms):")
+    for slug, p in sorted(pages.items(), key=lambda kv: kv[1]["import_ms"], reverse=True):
+        print(f"  {p['import_ms']:>9.1f}  {slug}")
+
+
+if __name__ == "__main__":
+    main()
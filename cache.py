@@ -1,9 +1,267 @@
+import functools
+import hashlib
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import pandas as pd
+from flask import current_app
 from flask_caching import Cache
 
+from metrics import record_cache
+from utils.frame_codec import encode_value, decode_value
+
 cache = Cache(config={
     'CACHE_TYPE': 'RedisCache',
     'CACHE_REDIS_HOST': 'localhost',
     'CACHE_REDIS_PORT': 6379,
     'CACHE_REDIS_DB': 0,
     'CACHE_DEFAULT_TIMEOUT': 60 * 60 * 24 * 2
-})
\ No newline at end of file
+})
+
+DATA_VERSION_KEY = 'data_version'
+
+
+def bump_data_version():
+    """
+    Marks the cached query results as rebuilt. The version is the UTC time of
+    the rebuild, so it doubles as the dateModified of everything derived from it.
+    """
+    version = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    cache.set(DATA_VERSION_KEY, version, timeout=0)
+    return version
+
+
+def get_data_version():
+    """
+    Returns the current data version shared by all workers, creating one on
+    first use. cache.add only writes when the key is missing, so concurrent
+    workers agree on the same value.
+    """
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, datetime.now(timezone.utc).isoformat(timespec='seconds'), timeout=0)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+# --- Stale-while-revalidate memoization ---------------------------------------
+#
+# Entries are stored as {'value', 'computed_at', 'version', 'meta'} and kept for HARD seconds.
+# After SOFT seconds they are stale: the caller still gets the cached value
+# immediately while one worker (fleet-wide, via a lock key in the shared
+# cache) recomputes it in the background.
+
+SWR_SOFT_TIMEOUT = 60 * 60 * 24 * 2
+SWR_HARD_TIMEOUT = 60 * 60 * 24 * 7
+SWR_LOCK_TIMEOUT = 60 * 10
+SWR_WAIT_INTERVAL = 0.25
+# How long a miss waits for the worker holding the lock before computing
+# itself; the lock outlives slow queries, a request must not
+SWR_MISS_WAIT = 5
+
+
+def _memo_key(func, args, kwargs):
+    arg_hash = hashlib.sha256(repr((args, sorted(kwargs.items()))).encode("utf-8")).hexdigest()[:16]
+    return f"memo:{func.__module__}.{func.__name__}:{arg_hash}"
+
+
+def _acquire(lock_key, timeout):
+    # cache.add is SET NX on Redis: exactly one worker across the fleet wins
+    return cache.add(lock_key, os.getpid(), timeout=timeout)
+
+
+# --- Per-worker L1 ---------------------------------------------------------------
+#
+# Each entry also writes a small '<key>:v' version key. A worker keeps the
+# decoded value in memory and only re-reads (and unpickles) the full entry
+# from Redis when that version key has changed.
+
+L1_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _sizeof(value):
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return sys.getsizeof(value)
+
+
+class LocalLRU:
+    """
+    Thread-safe in-process LRU bounded by the estimated size of its values.
+    """
+
+    def __init__(self, max_bytes=L1_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] != version:
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key, version, entry):
+        nbytes = _sizeof(entry["value"])
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= old[2]
+            self._items[key] = (version, entry, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, _, evicted) = self._items.popitem(last=False)
+                self.size -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+
+l1_cache = LocalLRU()
+
+
+# Copy-on-write is always on from pandas 3. Older pandas is left as
+# configured: the option is process-wide and changes the semantics of every
+# chained assignment in the app, so cached frames are deep-copied there
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
+
+
+def _same_value(old, new):
+    # A revalidation that returns identical data leaves the data version alone
+    try:
+        if hasattr(old, "equals"):
+            return type(old) is type(new) and bool(old.equals(new))
+        return bool(old == new)
+    except Exception:
+        return False
+
+
+def _detached(value):
+    # Every caller gets its own frame object, as it did when each call
+    # unpickled from Redis. With copy-on-write a shallow copy is enough to
+    # keep column assignments in pages from leaking into the shared L1
+    # entry; before pandas 3 only a deep copy is safe
+    if hasattr(value, "copy") and hasattr(value, "columns"):
+        return value.copy(deep=not COPY_ON_WRITE)
+    return value
+
+
+def memoize_swr(soft_timeout=SWR_SOFT_TIMEOUT, hard_timeout=SWR_HARD_TIMEOUT, lock_timeout=SWR_LOCK_TIMEOUT,
+                miss_wait=SWR_MISS_WAIT):
+    """
+    Memoizes a function in the shared cache with soft and hard TTLs and a
+    single-flight lock, so an expiring entry never makes every worker run the
+    same query at once. A miss waits at most miss_wait seconds for the worker
+    holding the lock before running the query itself.
+
+    The decorated function exposes:
+        uncached        the original function
+        make_cache_key  make_cache_key(*args, **kwargs) -> cache key
+        store           store(value, *args, meta=None, **kwargs) writes a fresh entry;
+                        meta is kept with it as entry['meta'] and goes when
+                        the entry is replaced or deleted
+        peek            peek(*args, **kwargs) -> cached entry or None, never computes
+        delete_memoized drops the entry for the given arguments
+    """
+    def decorator(func):
+        def store(value, *args, meta=None, **kwargs):
+            key = _memo_key(func, args, kwargs)
+            entry = {"value": value, "computed_at": time.time(), "version": uuid.uuid4().hex, "meta": meta or {}}
+            # Payload first, then its version: a reader that sees the new
+            # version is guaranteed to find the new payload. DataFrames go to
+            # Redis as compressed Arrow, the L1 keeps the decoded frame.
+            cache.set(key, dict(entry, value=encode_value(value)), timeout=hard_timeout)
+            cache.set(f"{key}:v", entry["version"], timeout=hard_timeout)
+            l1_cache.put(key, entry["version"], entry)
+            return entry
+
+        def load(key):
+            version = cache.get(f"{key}:v")
+            if version is not None:
+                entry = l1_cache.get(key, version)
+                if entry is not None:
+                    return entry
+            entry = cache.get(key)
+            if entry is not None:
+                entry["value"] = decode_value(entry["value"])
+                l1_cache.put(key, entry["version"], entry)
+            return entry
+
+        def revalidate(app, lock_key, args, kwargs, previous):
+            with app.app_context():
+                try:
+                    value = func(*args, **kwargs)
+                    store(value, *args, **kwargs)
+                    # Layouts, figures and embed snapshots are keyed on the
+                    # data version; move it on so they pick up the new data.
+                    # They render from the argument-less entries only, a
+                    # ranged or parametrized entry changing leaves them valid
+                    if not args and not kwargs and not _same_value(previous, value):
+                        bump_data_version()
+                except Exception as e:
+                    print(f"⚠️ background refresh of {func.__name__} failed: {e}")
+                finally:
+                    cache.delete(lock_key)
+
+        @functools.wraps(func)
+        def decorated(*args, **kwargs):
+            key = _memo_key(func, args, kwargs)
+            lock_key = f"{key}:lock"
+
+            entry = load(key)
+            if entry is not None:
+                stale = time.time() - entry["computed_at"] >= soft_timeout
+                record_cache(func.__name__, "stale" if stale else "hit")
+                if stale and _acquire(lock_key, lock_timeout):
+                    threading.Thread(
+                        target=revalidate,
+                        args=(current_app._get_current_object(), lock_key, args, kwargs, entry["value"]),
+                        daemon=True,
+                    ).start()
+                return _detached(entry["value"])
+
+            # Miss: one worker computes, the others wait a little for its
+            # result and then compute it themselves
+            record_cache(func.__name__, "miss")
+            deadline = time.time() + miss_wait
+            while not _acquire(lock_key, lock_timeout):
+                time.sleep(SWR_WAIT_INTERVAL)
+                entry = load(key)
+                if entry is not None:
+                    return _detached(entry["value"])
+                if time.time() >= deadline:
+                    return func(*args, **kwargs)
+
+            try:
+                # Another worker may have finished between our get and the lock
+                entry = load(key)
+                if entry is not None:
+                    return _detached(entry["value"])
+                return _detached(store(func(*args, **kwargs), *args, **kwargs)["value"])
+            finally:
+                cache.delete(lock_key)
+
+        decorated.uncached = func
+        decorated.cache_timeout = hard_timeout
+        decorated.soft_timeout = soft_timeout
+        decorated.make_cache_key = lambda *args, **kwargs: _memo_key(func, args, kwargs)
+        decorated.store = store
+        decorated.peek = lambda *args, **kwargs: load(_memo_key(func, args, kwargs))
+        decorated.delete_memoized = lambda *args, **kwargs: cache.delete_many(
+            _memo_key(func, args, kwargs), f"{_memo_key(func, args, kwargs)}:v"
+        )
+        return decorated
+
+    return decorator
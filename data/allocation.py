@@ -0,0 +1,83 @@
+"""
+Calendar-year allocation of fiscal-period values (10-K filings).
+
+A filing covering [start, end] contributes to each calendar year in
+proportion to the number of its days that fall in that year:
+
+    allocated = metric * overlap_days(year) / (dateDiff('day', start, end) + 1)
+
+This is exactly what expanding every filing into daily rows and summing them
+back per year produced, but a filing spans one or two calendar years instead
+of ~365 days, so the intermediate row count drops by two orders of magnitude.
+"""
+import numpy as np
+import pandas as pd
+
+MIN_YEAR = 2010
+# Latest complete reporting year: most 10-Ks for year Y are filed during Y+1
+MAX_YEAR_SQL = "toYear(today()) - 2"
+
+
+def yearly_allocation_sql(source, keys, metric="metric", min_year=MIN_YEAR, max_year=MAX_YEAR_SQL):
+    """
+    Wraps a filing-level SELECT into one that yields one row per filing and
+    overlapped calendar year.
+
+    Args:
+        source (str): SELECT returning start, end, the metric and the key columns.
+        keys (list): Columns carried through (e.g. ['entity', 'dimension', 'id']).
+        metric (str): Column or expression to allocate.
+        min_year (int): First calendar year kept.
+        max_year (str|int): Last calendar year kept, SQL expression allowed.
+
+    Returns:
+        str: SELECT with columns keys + period_start (Date, 1 Jan of the year)
+        + allocated_metric.
+    """
+    key_list = ",\n            ".join(keys)
+    return f"""
+        SELECT
+            {key_list},
+            makeDate(year, 1, 1) AS period_start,
+            {metric}
+                * (dateDiff('day', greatest(start, makeDate(year, 1, 1)), least(end, makeDate(year, 12, 31))) + 1)
+                / (dateDiff('day', start, end) + 1) AS allocated_metric
+        FROM ({source}) AS input
+        ARRAY JOIN range(toUInt32(toYear(start)), toUInt32(toYear(end)) + 1) AS year
+        WHERE year >= {min_year} AND year <= {max_year}
+    """
+
+
+def allocate_to_years(df, keys, metric="metric", start="start", end="end", min_year=MIN_YEAR, max_year=None):
+    """
+    Vectorized NumPy equivalent of yearly_allocation_sql for frames already in
+    memory.
+
+    Returns:
+        pd.DataFrame: keys + year + allocated_metric, one row per filing and
+        overlapped calendar year.
+    """
+    starts = pd.to_datetime(df[start]).to_numpy().astype("datetime64[D]")
+    ends = pd.to_datetime(df[end]).to_numpy().astype("datetime64[D]")
+    start_years = starts.astype("datetime64[Y]").astype(int) + 1970
+    end_years = ends.astype("datetime64[Y]").astype(int) + 1970
+
+    # One output row per (filing, year in [start_year, end_year])
+    spans = end_years - start_years + 1
+    rows = np.repeat(np.arange(len(df)), spans)
+    offsets = np.arange(len(rows)) - np.repeat(np.cumsum(spans) - spans, spans)
+    years = start_years[rows] + offsets
+
+    year_start = (years - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+    year_end = (years - 1970 + 1).astype("datetime64[Y]").astype("datetime64[D]") - np.timedelta64(1, "D")
+    overlap = (np.minimum(ends[rows], year_end) - np.maximum(starts[rows], year_start)).astype(int) + 1
+    total = (ends - starts).astype(int)[rows] + 1
+
+    out = df[keys].iloc[rows].reset_index(drop=True)
+    out["year"] = years
+    out["allocated_metric"] = df[metric].to_numpy(dtype=float)[rows] * overlap / total
+
+    keep = out["year"] >= min_year
+    if max_year is not None:
+        keep &= out["year"] <= max_year
+    return out[keep].reset_index(drop=True)
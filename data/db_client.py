@@ -1,5 +1,159 @@
+import json
+import os
+import threading
+import time
+
 import clickhouse_connect
-from config.db_config import CLICKHOUSE_SETTINGS
+import pandas as pd
+from clickhouse_connect.driver import httputil
+from metrics import record_clickhouse_summary
+from .result_schema import pa, apply_schema, arrow_to_frame
+from .replay import client_mode, replay_dir, LIVE, RECORD, REPLAY
+
+# One HTTP client per process, backed by a keep-alive connection pool that
+# query threads (e.g. the parallel cache refresh) share.
+POOL_SIZE = 8
+HEALTH_CHECK_INTERVAL = 60
+
+# Applied to every query; individual queries can override them, see
+# HEAVY_QUERY_SETTINGS.
+DEFAULT_QUERY_SETTINGS = {
+    "max_execution_time": 120,
+}
+
+# Sent with streamed queries: the server holds the response headers until the
+# query has finished, so X-ClickHouse-Summary has the final rows/bytes read
+STREAM_SETTINGS = {
+    "http_wait_end_of_query": 1,
+}
+
+# Multi-year fundamentals aggregations
+HEAVY_QUERY_SETTINGS = {
+    "max_execution_time": 600,
+    "max_threads": 8,
+}
+
+_client = None
+_client_pid = None
+_last_health_check = 0.0
+_lock = threading.Lock()
+
+
+def _create_client():
+    # CLICKHOUSE_MODE=replay answers from recorded Parquet files and needs
+    # neither a server nor config.db_config, see data.replay
+    mode = client_mode()
+    if mode == REPLAY:
+        from .replay import ReplayClient
+        return ReplayClient(replay_dir())
+
+    from config.db_config import CLICKHOUSE_SETTINGS
+    pool_mgr = httputil.get_pool_manager(maxsize=POOL_SIZE, num_pools=1, block=True)
+    options = {
+        "compress": True,
+        # No session: a sessionless client can run queries from many threads
+        "autogenerate_session_id": False,
+        "settings": DEFAULT_QUERY_SETTINGS,
+        "pool_mgr": pool_mgr,
+    }
+    options.update(CLICKHOUSE_SETTINGS)
+    client = clickhouse_connect.get_client(**options)
+    if mode == RECORD:
+        from .replay import RecordingClient
+        return RecordingClient(client, replay_dir())
+    return client
+
+
+def _healthy(client):
+    try:
+        return client.ping()
+    except Exception:
+        return False
+
 
 def get_clickhouse_client():
-    return clickhouse_connect.get_client(**CLICKHOUSE_SETTINGS)
\ No newline at end of file
+    """
+    Returns the process-wide ClickHouse client, creating it on first use, after
+    a fork (gunicorn workers must not share the parent's sockets) or when the
+    periodic health check fails.
+    """
+    global _client, _client_pid, _last_health_check
+    with _lock:
+        pid = os.getpid()
+        if _client is None or _client_pid != pid:
+            _client = _create_client()
+            _client_pid = pid
+            _last_health_check = time.monotonic()
+        elif time.monotonic() - _last_health_check > HEALTH_CHECK_INTERVAL:
+            if not _healthy(_client):
+                # Not closed: other threads may still be reading from it
+                print("⚠️ ClickHouse health check failed, reconnecting")
+                _client = _create_client()
+            _last_health_check = time.monotonic()
+        return _client
+
+
+def _forget_parent_client():
+    # Don't close: the parent still owns those sockets. The lock may have been
+    # held by another thread at fork time, so it is replaced too.
+    global _client, _client_pid, _lock
+    _client = None
+    _client_pid = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_parent_client)
+
+
+def _summary(headers):
+    try:
+        return json.loads(headers.get("X-ClickHouse-Summary") or "{}")
+    except (AttributeError, ValueError):
+        return {}
+
+
+def _query_arrow(client, query, parameters, settings):
+    # client.query_arrow drops the HTTP response and with it the summary
+    # header; the raw Arrow stream keeps both. Replay and recording clients
+    # have no raw_stream and go through query_arrow.
+    if getattr(client, "raw_stream", None) is None:
+        return client.query_arrow(query, parameters=parameters, settings=settings, use_strings=True)
+    # Strings as Arrow utf8, as query_arrow(use_strings=True) returns them
+    settings = dict(settings or {}, output_format_arrow_string_as_string=1, **STREAM_SETTINGS)
+    response = client.raw_stream(query, parameters=parameters, settings=settings, fmt="ArrowStream")
+    try:
+        table = pa.ipc.open_stream(response).read_all()
+    finally:
+        response.close()
+    record_clickhouse_summary(_summary(response.headers))
+    return table
+
+
+def _query_pandas(client, query, parameters, settings):
+    # Same conversion as client.query_df, but the stream keeps the result
+    # object (stream.source) that carries the summary
+    if getattr(client, "query_df_stream", None) is None:
+        return client.query_df(query, parameters=parameters, settings=settings)
+    settings = dict(settings or {}, **STREAM_SETTINGS)
+    with client.query_df_stream(query, parameters=parameters, settings=settings) as stream:
+        blocks = list(stream)
+        result = stream.source
+    record_clickhouse_summary(getattr(result, "summary", None))
+    if not blocks:
+        return pd.DataFrame(columns=list(result.column_names))
+    return pd.concat(blocks, ignore_index=True) if len(blocks) > 1 else blocks[0]
+
+
+def query_df(client, query, parameters=None, settings=None, schema=None):
+    """
+    client.query_df that also reports the ClickHouse query summary (rows and
+    bytes read) to the metrics of the query function being computed.
+
+    With a schema (see data.result_schema) the result is fetched as an Arrow
+    stream and cast to the declared column types instead.
+    """
+    if schema is not None:
+        if pa is None:
+            return apply_schema(_query_pandas(client, query, parameters, settings), schema)
+        return arrow_to_frame(_query_arrow(client, query, parameters, settings), schema)
+    return _query_pandas(client, query, parameters, settings)
@@ -0,0 +1,243 @@
+"""
+Single-scan aggregation of the Philippine grocery price series.
+
+All grocery series come from default.input_raw_products. Instead of one scan
+and one LIMIT 1 BY dedupe per product, the table is scanned once and every
+row is tagged with each product whose conditions it meets (PRODUCTS). As in
+the per-product queries, the conditions run on the raw rows and the dedupe
+comes after them: the latest matching row per (product, day, sku, market),
+or per (product, sku, insert_date) for PER_SCRAPE_PRODUCTS. The daily mean,
+median and sample count of all products come from a single GROUP BY.
+
+Sizes come from the parsed-SKU lookup table (see data.sku_units). Sardines
+and garlic still go through the server-side calc_total_grams UDF, evaluated
+only on rows whose other conditions already matched.
+"""
+from .result_schema import DATE, FLOAT64, INT64, CATEGORY
+from .sku_units import RULES, sku_units_join
+
+# product -> (condition on a raw row, unit price)
+# Unit prices follow the published series: per kilo, per piece, per liter or
+# per standard pack (e.g. a 55 g noodle pack, a 375 g bag of onions).
+PRODUCTS = {
+    "rice": (
+        """(lower(sku) like '%dinurado%' or lower(sku) like '%sinandomeng%')
+            and rice_kg > 0
+            and dt >= '2025-05-24'""",
+        "price / rice_kg",
+    ),
+    "egg": (
+        """lower(sku) like '%egg%'
+            and lower(sku) like '%medium%'
+            and egg_pcs > 0""",
+        "price / egg_pcs",
+    ),
+    "milk_cow": (
+        "is_milk and not is_milk_alternative",
+        "price / volume_liters",
+    ),
+    "milk_alternatives": (
+        "is_milk and is_milk_alternative",
+        "price / volume_liters",
+    ),
+    "instant_noodles": (
+        """lower(sku) like '%instant%'
+            and lower(category) like '%noodle%'
+            and dt > '2025-05-24'""",
+        "price / noodle_grams * 55",
+    ),
+    "coffee_3_in_1": (
+        r"""(lower(category) like '%coffee%' or (category = 'Beverages' and market = 'ever'))
+            and match(sku, '\\b[0-9]+\\s?g\\b')
+            and match(sku, '\\b[Cc]offee\\b')
+            and match(sku, '(?i)3[[:space:][:punct:]]*(in)?[[:space:][:punct:]]*1')
+            and sku != 'San Mig 3-in-1 Coffee Mix Original 20g | 30s'
+            and sku not ilike '%creamer%'""",
+        "price / coffee_grams * 400",
+    ),
+    "cooking_oil": (
+        """sku ilike '%oil%'
+            and category ilike '%cooking%'
+            and oil_liters is not null""",
+        "price / oil_liters",
+    ),
+    "onion": (
+        """(sku ilike '%onion%' or sku ilike '%sibuyas%')
+            and (
+                (category ilike '%fresh%' and category ilike '%vegetable%')
+                or (category ilike '%fresh%' and market = 'ever')
+            )
+            and sku not ilike '%leeks%'
+            and sku not ilike '%leave%'
+            and sku not ilike '%spring%'
+            and sku not ilike '%sprout%'
+            and onion_grams is not null""",
+        "price / onion_grams * 375",
+    ),
+    "sugar": (
+        """sku ilike '%sugar%'
+            and sku ilike '%refined%'
+            and (
+                (category ilike 'cooking%' and market = 'ever')
+                or (market = 'sm supermarket' and category ilike '%pantry%')
+                or (market = 'waltermart' and category ilike '%pantry%')
+            )
+            and sugar_kg > 0""",
+        "price / sugar_kg",
+    ),
+    "detergent_powder": (
+        """sku ilike '%detergent%'
+            and sku ilike '%powder%'
+            and sku not ilike '%free%'
+            and dt >= '2025-06-01'
+            and detergent_grams is not null""",
+        "price / detergent_grams * 2000",
+    ),
+    "sardines": (
+        """sku ilike '%sardin%'
+            and insert_date > '2025-05-24'
+            and calc_total_grams(sku, market) is not null""",
+        "price / calc_total_grams(sku, market) * 155",
+    ),
+    "white_vinegar": (
+        """sku ilike '%vinegar%'
+            and sku ilike '%white%'
+            and volume_liters is not null""",
+        "price / volume_liters",
+    ),
+    "cane_vinegar": (
+        """sku ilike '%vinegar%'
+            and sku ilike '%cane%'
+            and volume_liters is not null""",
+        "price / volume_liters",
+    ),
+    "garlic": (
+        """(sku ilike '%garlic%' or sku ilike '%bawang%')
+            and category ilike '%fresh%'
+            and calc_total_grams(sku, market) is not null""",
+        "price / calc_total_grams(sku, market) * 375",
+    ),
+}
+
+GROCERY_SCHEMA = {
+    "date": DATE,
+    "product": CATEGORY,
+    "mean_price": FLOAT64,
+    "median_price": FLOAT64,
+    "sampled_skus": INT64,
+}
+
+# Shared by both milk series
+MILK_CONDITIONS = """
+            lower(category) like '%milk%'
+            and lower(sku) not like '%evapora%'
+            and lower(sku) not like '%conden%'
+            and lower(sku) not like '%goat%'
+            and lower(sku) not like '%whip%'
+            and lower(sku) not like '%cream%'
+            and lower(sku) not like '%+%'
+            and lower(sku) not like '%yoghurt%'
+            and (lower(sku) like '%milk%' or lower(sku) like '%soy%' or lower(sku) like '%almond%' or lower(sku) like '%oat%')
+            and (lower(category) like '%fresh%' or lower(category) like '%liquid%' or category ilike '%milk%')
+            and volume_liters is not null
+"""
+MILK_ALTERNATIVE_CONDITIONS = """
+            lower(sku) like '%almond%' or lower(sku) like '% oat %' or lower(sku) like '%soy%'
+            or lower(sku) like '%coconut%' or lower(sku) like '%vita%'
+"""
+
+
+# Products deduplicated per (sku, insert_date), as their original queries
+# were, instead of to the latest row per (day, sku, market).
+PER_SCRAPE_PRODUCTS = ("coffee_3_in_1",)
+
+
+def grocery_panel_sql(since_filter=""):
+    """
+    Builds the single-scan query.
+
+    Args:
+        since_filter (str): Extra conditions on insert_date, e.g. the watermark of
+            an incremental refresh or a requested date range.
+
+    Returns:
+        str: SELECT date, product, mean_price, median_price, sampled_skus.
+    """
+    tags = ",\n                ".join(
+        f"if({condition}, '{product}', '')" for product, (condition, _) in PRODUCTS.items()
+    )
+    prices = ",\n                ".join(
+        f"product = '{product}', {unit_price}" for product, (_, unit_price) in PRODUCTS.items()
+    )
+    per_scrape = " or ".join(f"product = '{product}'" for product in PER_SCRAPE_PRODUCTS) or "0"
+    units = sku_units_join(how="LEFT", **{name: name for name in RULES})
+    return f"""
+    WITH matched AS (
+        SELECT
+            dt,
+            sku,
+            market,
+            insert_date,
+            product,
+            multiIf(
+                {prices},
+                NULL
+            ) AS unit_price
+        FROM (
+            SELECT
+                *,
+                toDate(insert_date) AS dt,
+                ({MILK_CONDITIONS}) AS is_milk,
+                ({MILK_ALTERNATIVE_CONDITIONS}) AS is_milk_alternative
+            FROM default.input_raw_products
+            {units}
+            WHERE main_category = 'groceries'
+                {since_filter}
+        )
+        ARRAY JOIN arrayFilter(p -> p != '', [
+                {tags}
+            ]) AS product
+    ),
+
+    latest AS (
+        -- The latest matching row per (product, day, sku, market), or one row
+        -- per (product, sku, insert_date) for PER_SCRAPE_PRODUCTS. The tuple
+        -- keeps a latest row whose unit price is NULL, as LIMIT 1 BY did.
+        SELECT
+            dt,
+            product,
+            sku,
+            any(market) AS kept_market,
+            argMax(tuple(unit_price), insert_date).1 AS unit_price
+        FROM matched
+        GROUP BY
+            product,
+            dt,
+            sku,
+            if({per_scrape}, '', market),
+            if({per_scrape}, insert_date, toDateTime(0))
+    )
+
+    SELECT
+        dt date,
+        product,
+        avg(unit_price) mean_price,
+        median(unit_price) median_price,
+        uniq(sku, kept_market) sampled_skus
+    FROM latest
+    GROUP BY dt, product
+    ORDER BY dt, product
+    """
+
+
+def grocery_slice(panel, product, columns):
+    """
+    One product's series out of the grocery panel.
+
+    Args:
+        panel (pd.DataFrame): Result of grocery_panel_sql.
+        product (str): Key in PRODUCTS.
+        columns (dict): Panel column -> output column, in output order.
+    """
+    df = panel[panel["product"] == product]
+    return df[list(columns)].rename(columns=columns).reset_index(drop=True)
@@ -0,0 +1,96 @@
+"""
+Watermark-based incremental refresh for append-only time series queries.
+
+A query opts in with @incremental(column, overlap_days) under @memoize_swr()
+and accepts since=None. A full run returns the whole history; since=<date>
+returns only rows with column >= since. The refresh re-queries from the
+cached high-water mark minus the overlap window (late corrections land there)
+and splices the result into the cached frame, so its cost follows the amount
+of new data instead of the length of the history.
+"""
+from datetime import timedelta
+
+import pandas as pd
+
+DEFAULT_OVERLAP_DAYS = 3
+
+
+def incremental(column="date", overlap_days=DEFAULT_OVERLAP_DAYS, history_version=None):
+    """
+    Marks a query function as incrementally refreshable.
+
+    Args:
+        column (str): Date column of the result the watermark is kept on.
+        overlap_days (int): Days before the watermark that are always re-queried.
+        history_version: What else the cached history was computed with, e.g.
+            data.sku_units.RULES_VERSION. A refresh after it changed is a
+            full one.
+    """
+    def decorator(func):
+        # memoize_swr copies __dict__ through functools.wraps
+        func.incremental = {"column": column, "overlap_days": overlap_days, "history_version": history_version}
+        return func
+    return decorator
+
+
+def get_watermark(func, entry):
+    """
+    The watermark of a cache entry, or None when its history can't be extended.
+    It is kept in the entry it describes, so an entry written by anything but
+    refresh_incremental (an SWR revalidation, a plain store) has none and a
+    deleted entry takes it along.
+    """
+    meta = (entry or {}).get("meta") or {}
+    if meta.get("history_version") != func.incremental["history_version"]:
+        return None
+    return meta.get("watermark")
+
+
+def _meta(func, frame):
+    spec = func.incremental
+    if not len(frame):
+        return {}
+    return {
+        "watermark": pd.Timestamp(frame[spec["column"]].max()).date(),
+        "history_version": spec["history_version"],
+    }
+
+
+def merge_increment(cached, fresh, column, since):
+    """
+    Replaces every cached row from the cutoff on with the freshly queried rows.
+    The cutoff is the earlier of since and the first fresh row, in case the
+    query widened since to a period boundary (e.g. start of week).
+    """
+    cutoff = pd.Timestamp(since)
+    if len(fresh):
+        cutoff = min(cutoff, pd.Timestamp(fresh[column].min()))
+    kept = cached[pd.to_datetime(cached[column]) < cutoff]
+    if not len(fresh):
+        return kept.reset_index(drop=True)
+    merged = pd.concat([kept, fresh], ignore_index=True)
+    return merged.sort_values(column, kind="stable").reset_index(drop=True)
+
+
+def refresh_incremental(func, full=False):
+    """
+    Refreshes the cache entry of an @incremental query and its watermark.
+    Falls back to a full run when forced, when nothing is cached yet or when
+    the entry has no watermark for the current history_version.
+
+    Returns:
+        tuple: (result DataFrame, 'full' | 'incremental')
+    """
+    spec = func.incremental
+    entry = None if full else func.peek()
+    watermark = get_watermark(func, entry)
+
+    if watermark is None:
+        result, mode = func.uncached(), "full"
+    else:
+        since = watermark - timedelta(days=spec["overlap_days"])
+        fresh = func.uncached(since=since)
+        result, mode = merge_increment(entry["value"], fresh, spec["column"], since), "incremental"
+
+    func.store(result, meta=_meta(func, result))
+    return result, mode
@@ -1,28 +1,38 @@
-from .db_client import get_clickhouse_client
-from cache import cache
-
-@cache.memoize()
-def fetch_inflation_data():
+import pandas as pd
+
+from .db_client import get_clickhouse_client, query_df, HEAVY_QUERY_SETTINGS
+from .allocation import yearly_allocation_sql
+from .incremental import incremental
+from .ranges import date_range, range_filter
+from .grocery import GROCERY_SCHEMA, grocery_panel_sql, grocery_slice
+from .sku_units import RULES_VERSION
+from .result_schema import DATE, FLOAT64, INT64, CATEGORY, STRING
+from .schema import latest_filings_sql
+from cache import memoize_swr
+from metrics import instrumented
+
+@date_range(column="date")
+@memoize_swr()
+@instrumented
+def fetch_inflation_data(start=None, end=None):
     client = get_clickhouse_client()
-    query = """
+    date_filter, parameters = range_filter("date", start, end)
+    query = f"""
             WITH bonds_data AS (
             select *
             from (
                 SELECT 
                     bond_type, ticker, date, isin, issue_date, maturity, coupon, close
-                FROM trading.asset_prices a
+                FROM trading.asset_prices_latest a FINAL
                 INNER JOIN (
                     SELECT coupon, date issue_date, isin, bond_type, maturity
-                    FROM trading.bonds 
+                    FROM trading.bonds_latest FINAL
                     WHERE 
                         isin LIKE 'DE%'
                         /* AND maturity >= today() */  
-                    ORDER BY version DESC 
-                    LIMIT 1 BY isin
-                ) t  ON t.isin = a.ticker
-                order by version desc 
-                limit 1 by ticker, date)
+                ) t  ON t.isin = a.ticker)
             where  close>0
+            {date_filter}
             ),
 
             ytm_data_bond AS (
@@ -147,21 +157,19 @@ def fetch_inflation_data():
             avg(case when attribute='us_ten_year_interest' then value end) us_ten_year_interest
             from (
             select *
-            from trading.economic_calendar ec 
+            from trading.economic_calendar_latest ec FINAL
             where attribute in ('us_10_year_breakeven_inflation_rate', 'us_ten_year_interest')
-            order by version desc 
-            limit 1 by date,attribute )
+            {date_filter})
             group by date
             ),
             eur_usd as (
             SELECT 
             date, 
             close eur_usd_fx
-            from trading.asset_prices 
+            from trading.asset_prices_latest FINAL
             where 
             ticker='eurusd'
-            order by version desc 
-            limit 1 by date
+            {date_filter}
             )
 
 
@@ -182,54 +190,32 @@ def fetch_inflation_data():
             where date>='2010-01-01'
             order by date asc
     """
-    return client.query_df(query)
+    return query_df(client, query, parameters=parameters or None)
 
-@cache.memoize()
+@memoize_swr()
+@instrumented
 def fetch_coporate_america_net_income_to_wilshire():
     client = get_clickhouse_client()
-    query = """
+    filings = latest_filings_sql(
+        {"metric": "case when dimension='Investment Income, Interest and Dividend' then  -metric else metric end"},
+        """
+            (
+                dimension LIKE 'Net Income (Loss) Attributable to Parent'
+                or 
+                dimension LIKE 'Investment Income, Interest and Dividend'
+            )	
+            AND start >= '2007-01-01'
+            AND form = '10-K'
+            AND dateDiff('day', start, end) > 350
+        """,
+    )
+    query = f"""
         with base as (
-            SELECT 
-                entity,
-                date,
-                metric / (dateDiff('day', start, end) + 1) AS allocated_metric
-            FROM (
-                SELECT 
-                    start,
-                    end,
-                    case when dimension='Investment Income, Interest and Dividend' then  -metric else metric end metric,
-                    entity,
-                    addDays(start, number) AS date
-                FROM (
-                    SELECT 
-                        start, 
-                        end, 
-                        dimension,
-                        metric, 
-                        entity
-                    FROM trading.equity_fundamental 
-                    WHERE 
-                        (
-                            dimension LIKE 'Net Income (Loss) Attributable to Parent'
-                            or 
-                            dimension LIKE 'Investment Income, Interest and Dividend'
-                        )	
-                        AND start >= '2007-01-01'
-                        AND form = '10-K'
-                        AND dateDiff('day', start, end) > 350
-                    
-                    ORDER BY created_at DESC, filed DESC 
-                    LIMIT 1 BY start, end, entity, dimension
-                ) AS input
-                ARRAY JOIN range(CAST(dateDiff('day', start, end) + 1 AS UInt64)) AS number
-            
-            )
-            where toYear(date)<=toYear(today())-2 and toYear(date)>=2010
-            ORDER BY date
+            {yearly_allocation_sql(filings, keys=["entity"])}
             ),
             income as (
             select 
-                toYear(date) dt, 
+                toYear(period_start) dt, 
                 count(distinct entity) entities,
                 sum(allocated_metric) total_net_income, 
                 sum(allocated_metric)/entities avg_revenue_per_entity
@@ -239,11 +225,10 @@ def fetch_coporate_america_net_income_to_wilshire():
             prices as (
             select 
                 date, cik, close, volume
-            from trading.asset_prices 
+            from trading.asset_prices_latest FINAL
             where 
                 ticker like '^W5000'
-                and date>='2010-01-01'
-            order by version desc limit 1 by date),
+                and date>='2010-01-01'),
 
             weighted_price as (
             select 
@@ -259,23 +244,28 @@ def fetch_coporate_america_net_income_to_wilshire():
             left join weighted_price on income.dt = weighted_price.dt
 
     """
-    return client.query_df(query)
-
-@cache.memoize()
-def fetch_telecom_interest_sensitive_stock():
+    return query_df(client, query, settings=HEAVY_QUERY_SETTINGS)
+
+@date_range(column="date", sliceable=False)
+@memoize_swr()
+@instrumented
+def fetch_telecom_interest_sensitive_stock(start=None, end=None):
+    # Gains are rebased to the first day of the window, so every range is
+    # queried; without a start the window is the last year
     client = get_clickhouse_client()
-    query = """
+    date_filter, parameters = range_filter("date", start, end)
+    if start is None:
+        date_filter = f"AND date >= today()- interval 1 year\n        {date_filter}"
+    query = f"""
     WITH stocks AS (
         SELECT 
             date, 
             CASE WHEN ticker = '^GSPC' THEN 'SP500' ELSE ticker END AS ticker, 
             close adj_close
-        FROM trading.asset_prices 
-        WHERE asset_prices.ticker IN ('T', 'VZ', 'CCOI', '^GSPC')
-            AND date >= today()- interval 1 year
+        FROM trading.asset_prices_latest FINAL
+        WHERE asset_prices_latest.ticker IN ('T', 'VZ', 'CCOI', '^GSPC')
+            {date_filter}
             -- AND date between '2019-04-01' and '2020-08-31'
-        ORDER BY version DESC 
-        LIMIT 1 BY ticker, date
         ),
 
         start_value AS (
@@ -305,59 +295,33 @@ def fetch_telecom_interest_sensitive_stock():
         -- or attribute='us_consumer_price_index_all_urban_consumers'
         order by date
     """
-    return client.query_df(query)
+    return query_df(client, query, parameters=parameters or None)
 
-@cache.memoize()
+@memoize_swr()
+@instrumented
 def get_cash_flow_tax_us_companies():
     client = get_clickhouse_client()
-    query = '''
+    filings = latest_filings_sql(
+        {"metric": "metric", "id": "id"},
+        """
+            (
+                dimension LIKE 'Income Taxes Paid, Net'
+                or 
+                dimension LIKE '%Net Cash Provided by (Used in) Operating Activities, Continuing Operations%'
+                or 
+                dimension like  'Net Cash Provided by (Used in) Operating Activities'
+                or 
+                dimension like 'Income Taxes Paid'
+            )	
+            AND id !='707605' -- faulty data
+            AND start >= '2007-01-01'
+            AND form = '10-K'
+            AND dateDiff('day', start, end) > 350
+        """,
+    )
+    query = f'''
         with base as (
-        SELECT 
-            entity,
-            date,
-            dimension,
-            id,
-            metric / (dateDiff('day', start, end) + 1) AS allocated_metric
-        FROM (
-            SELECT 
-                start,
-                end,
-                dimension,
-                metric,
-                entity,
-                id,
-                addDays(start, number) AS date
-            FROM (
-                SELECT 
-                    start, 
-                    end, 
-                    dimension,
-                    metric, 
-                    entity, 
-                    id
-                FROM trading.equity_fundamental 
-                WHERE 
-                    (
-                        dimension LIKE 'Income Taxes Paid, Net'
-                        or 
-                        dimension LIKE '%Net Cash Provided by (Used in) Operating Activities, Continuing Operations%'
-                        or 
-                        dimension like  'Net Cash Provided by (Used in) Operating Activities'
-                        or 
-                        dimension like 'Income Taxes Paid'
-                    )	
-                    AND id !='707605' -- faulty data
-                    AND start >= '2007-01-01'
-                    AND form = '10-K'
-                    AND dateDiff('day', start, end) > 350
-                ORDER BY created_at DESC, filed DESC 
-                LIMIT 1 BY start, end, entity, dimension
-            ) AS input
-            ARRAY JOIN range(CAST(dateDiff('day', start, end) + 1 AS UInt64)) AS number
-        
-        )
-        where toYear(date)<=toYear(today())-2 and toYear(date)>=2010
-        ORDER BY date
+            {yearly_allocation_sql(filings, keys=["entity", "dimension", "id"])}
         ),
 
         orgs as (
@@ -372,7 +336,7 @@ def get_cash_flow_tax_us_companies():
         summary as (
 
         select 
-            toStartOfYear(date) dt,
+            period_start dt,
             id,
             dimension,
             sum(allocated_metric) allocated_metric
@@ -394,57 +358,31 @@ def get_cash_flow_tax_us_companies():
             category
 
     '''
-    
-    return client.query_df(query)
+    schema = {"year": INT64, "category": STRING, "taxes_paid": FLOAT64, "cash_flow": FLOAT64, "tax_rate": FLOAT64}
+    return query_df(client, query, settings=HEAVY_QUERY_SETTINGS, schema=schema)
 
 
-@cache.memoize()
+@memoize_swr()
+@instrumented
 def fetch_capital_expenditure_by_industry():
     client = get_clickhouse_client()
-    query = """
+    filings = latest_filings_sql(
+        {"metric": "metric", "id": "id"},
+        """
+            (
+                dimension= 'Payments to Acquire Property, Plant, and Equipment'
+                or 
+                dimension like 'Payments to Acquire Intangible Assets'
+            )	
+            AND id !='707605' -- faulty data
+            AND start >= '2009-01-01'
+            AND form = '10-K'
+            AND dateDiff('day', start, end) > 350
+        """,
+    )
+    query = f"""
     with base as (
-        SELECT 
-            entity,
-            date,
-            dimension,
-            id,
-            metric / (dateDiff('day', start, end) + 1) AS allocated_metric
-        FROM (
-            SELECT 
-                start,
-                end,
-                dimension,
-                metric,
-                entity,
-                id,
-                addDays(start, number) AS date
-            FROM (
-                SELECT 
-                    start, 
-                    end, 
-                    dimension,
-                    metric, 
-                    entity, 
-                    id
-                FROM trading.equity_fundamental 
-                WHERE 
-                    (
-                        dimension= 'Payments to Acquire Property, Plant, and Equipment'
-                        or 
-                        dimension like 'Payments to Acquire Intangible Assets'
-                    )	
-                    AND id !='707605' -- faulty data
-                    AND start >= '2009-01-01'
-                    AND form = '10-K'
-                    AND dateDiff('day', start, end) > 350
-                ORDER BY created_at DESC, filed DESC 
-                LIMIT 1 BY start, end, entity, dimension
-            ) AS input
-            ARRAY JOIN range(CAST(dateDiff('day', start, end) + 1 AS UInt64)) AS number
-        
-        )
-        where toYear(date)<=toYear(today())-2 and toYear(date)>=2010
-        ORDER BY date
+            {yearly_allocation_sql(filings, keys=["entity", "dimension", "id"])}
         ),
         
         inflation_adjustment as (
@@ -459,12 +397,10 @@ def fetch_capital_expenditure_by_industry():
 			    sum(log(1 + value )) OVER (ORDER BY date ASC ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS cumulative_multiplier
 			FROM (
 			    SELECT *
-			    FROM trading.economic_calendar
+			    FROM trading.economic_calendar_latest FINAL
 			    WHERE 
 			        attribute = 'us_inflation_yearly'
 			        AND toYear(date) >= 2009
-			    ORDER BY version DESC
-			    LIMIT 1 BY date, attribute
 			))
 			ORDER BY year ASC
         
@@ -482,7 +418,7 @@ def fetch_capital_expenditure_by_industry():
         summary as (
 
         select 
-            toStartOfYear(date) dt,
+            period_start dt,
             id,
             dimension,
             sum(allocated_metric) allocated_metric
@@ -504,10 +440,18 @@ def fetch_capital_expenditure_by_industry():
             year, 
             category
     """
-    return client.query_df(query)
-
-
-@cache.memoize()
+    schema = {
+        "year": INT64,
+        "category": STRING,
+        "capital_expenditure": FLOAT64,
+        "inflation_adjusted_capital_expenditure": FLOAT64,
+        "cumulative_inflation_adjustment": FLOAT64,
+    }
+    return query_df(client, query, settings=HEAVY_QUERY_SETTINGS, schema=schema)
+
+
+@memoize_swr()
+@instrumented
 def fetch_debt_free_cash_flow_by_industry():
     client = get_clickhouse_client()
     query = """
@@ -516,12 +460,35 @@ def fetch_debt_free_cash_flow_by_industry():
         order by insert_date desc 
         limit 1 by year,category
     """
-    return client.query_df(query)
-
-@cache.memoize()
-def fetch_commitment_of_traders():
+    return query_df(client, query)
+
+# Position counts arrive as generic numbers; pages compute ratios on them
+COT_SCHEMA = {
+    "dt": DATE,
+    "df": DATE,
+    "report_date": DATE,
+    "close": FLOAT64,
+    "market_and_exchange_names": CATEGORY,
+    "dealer_positions_long_all": FLOAT64,
+    "dealer_positions_short_all": FLOAT64,
+    "asset_mgr_positions_long_all": FLOAT64,
+    "asset_mgr_positions_short_all": FLOAT64,
+    "lev_money_positions_long_all": FLOAT64,
+    "lev_money_positions_short_all": FLOAT64,
+}
+
+@date_range(column="dt")
+@memoize_swr()
+@instrumented
+@incremental(column="dt", overlap_days=21)
+def fetch_commitment_of_traders(since=None, start=None, end=None):
     client = get_clickhouse_client()
-    query = """
+    # Whole weeks only, the weekly close is an argMax over the week
+    since_filter = "and toDate(date) >= toStartOfWeek({since:Date})" if since is not None else ""
+    date_filter, parameters = range_filter("toStartOfWeek(toDate(date))", start, end)
+    if since is not None:
+        parameters["since"] = since
+    query = f"""
     WITH base AS (
         select 
             toStartOfWeek(toDate(date)) AS dt, 
@@ -529,6 +496,8 @@ def fetch_commitment_of_traders():
              1 AS key
         from trading.asset_prices
         where lower(ticker) ='eurusd'
+        {since_filter}
+        {date_filter}
         GROUP BY dt
     ), 
 
@@ -540,10 +509,8 @@ def fetch_commitment_of_traders():
         FROM (
             SELECT 
                 *
-            FROM trading.cot_financial_futures 
+            FROM trading.cot_financial_futures_latest FINAL
             WHERE market_and_exchange_names = 'EURO FX - CHICAGO MERCANTILE EXCHANGE'
-            ORDER BY version DESC 
-            LIMIT 1 BY report_date, market_and_exchange_names
         )
     )
 
@@ -553,799 +520,105 @@ def fetch_commitment_of_traders():
     ASOF JOIN cot 
     ON base.key = cot.key AND base.dt >= cot.df
     """
-    return client.query_df(query)
+    return query_df(client, query, parameters=parameters or None, schema=COT_SCHEMA)
 
-@cache.memoize()
-def fetch_philippine_rice_prices():
-    client = get_clickhouse_client()
-    query = """
-    with base as (
-        select 
-            toDate(insert_date) dt,
-            sku,
-            market,
-            price,
-            case 
-            	when market='ever' then toFloat32OrZero(extract(sku, 's*(\\d+(\\.\\d+)?)kg')) 
-            	else toFloat32OrZero(extract(sku, '\\|\\s*(\\d+(\\.\\d+)?)kg')) 
-            end AS kilos
-        from input_raw_products 
-        where main_category='groceries'
-        and (lower(sku) like '%dinurado%' or lower(sku) like '%sinandomeng%' )
-        and kilos>0 
-        and dt>='2025-05-24'
-        order by insert_date desc 
-        limit 1 by sku , dt, market
-        )
-
-        select 
-            dt date, 
-            avg(price/kilos) avg_price_per_kilo ,
-            median(price/kilos) median_price,
-            uniq(sku, market) sampled_skus
-        from base
-        group by dt
-        order by dt
+@date_range(column="date")
+@memoize_swr()
+@instrumented
+@incremental(column="date", history_version=RULES_VERSION)
+def fetch_philippine_grocery_prices(since=None, start=None, end=None):
     """
-    return client.query_df(query)
-
-
-@cache.memoize()
-def fetch_philippine_egg_prices():
-    client = get_clickhouse_client()
-    query = """
-    with base as (
-        select 
-            toDate(insert_date) dt,
-            sku,
-            market,
-            price,
-            case 	
-            	when market='ever' then toInt32OrZero(extract(sku, '(\\d+)')) 
-            	else toInt32OrZero(extract(sku, '\\|\\s*(\\d+)'))
-            end   AS pcs
-        from input_raw_products 
-        where 
-        	main_category='groceries'
-        	and lower(sku) like '%egg%'
---         	and insert_date='2025-06-22 16:52:51'
-        	and lower(sku) like  '%medium%'
-        	and pcs>0
-        order by insert_date desc 
-        limit 1 by dt, sku, market
-)
-
-      	select 
-            dt date, 
-            avg(price/pcs) avg_price_per_pc ,
-            median(price/pcs) median_pc, 
-            uniq(sku, market) sampled_skus
-        from base
-    group by dt
-    order by dt
+    Daily mean, median and sample count of every Philippine grocery product in
+    one scan of input_raw_products, see data.grocery. The per-product
+    functions below slice this frame.
     """
-    return client.query_df(query)
-
-
-
-@cache.memoize()
-def fetch_philippine_milk_prices():
-    client = get_clickhouse_client()
-    query = """
-        with base as (
-        SELECT
-            toDate(insert_date) dt, 
-            market,
-            sku,
-            price, 
-                multiIf(
-                -- Case: "X L Y pcs" or "X L Ypcs"
-                match(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]\\s*(\\d+)\\s*pcs'),
-                    toFloat64(extract(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]')) * toInt32(extract(sku, '(\\d+)\\s*pcs')),
-
-                -- Case: "X ml Y pcs" or "X ml Ypcs"
-                match(sku, '(\\d+)\\s*[mM][lL]\\s*(\\d+)\\s*pcs'),
-                    (toFloat64(extract(sku, '(\\d+)\\s*[mM][lL]')) * toInt32(extract(sku, '(\\d+)\\s*pcs'))) / 1000,
-
-                -- Case: "X ml x Y" or "X ml x Ys"
-                match(sku, '(\\d+)\\s*[mM][lL]\\s*[xX]\\s*(\\d+)s?'),
-                    (toFloat64(extract(sku, '(\\d+)\\s*[mM][lL]')) * toInt32(extract(sku, '[xX]\\s*(\\d+)'))) / 1000,
-
-                -- Case: "X L x Y" or "X L x Ys"
-                match(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]\\s*[xX]\\s*(\\d+)s?'),
-                    toFloat64(extract(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]')) * toInt32(extract(sku, '[xX]\\s*(\\d+)')),
-
-                -- Case: range in ml (e.g. "200-250ml")
-                match(sku, '(\\d+)\\s*-\\s*(\\d+)\\s*[mM][lL]'),
-                    ((toFloat64(arrayElement(extractAll(sku, '(\\d+)'), 1)) +
-                    toFloat64(arrayElement(extractAll(sku, '(\\d+)'), 2))) / 2.0) / 1000,
-
-                -- Case: "X L"
-                match(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]'),
-                    toFloat64(extract(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]')),
-
-                -- Case: "X ml"
-                match(sku, '(\\d+)\\s*[mM][lL]'),
-                    toFloat64(extract(sku, '(\\d+)\\s*[mM][lL]')) / 1000,
-
-                -- Else NULL
-                NULL
-            ) AS volume_liters,
-            case when (lower(sku) like '%almond%' or lower(sku) like '% oat %' or lower(sku) like '%soy%' or lower(sku) like '%coconut%' or lower(sku) like '%vita%') 
-                then 'Alternatives' else 'Cow Milk' end category_, 
-            price/volume_liters price_per_liters
-            FROM default.input_raw_products
-            WHERE main_category = 'groceries'
-            AND lower(category) LIKE '%milk%'
-            and lower(sku) not like '%evapora%'
-            and lower(sku) not like '%conden%'
-            and lower(sku) not like '%goat%'
-            and volume_liters is not null
-            and lower(sku)  not like '%whip%'
-            and lower(sku) not like '%cream%'
-            and lower(sku) not like '%+%'
-            and lower(sku) not like '%yoghurt%'
-            and  (
-            		lower(sku) like '%milk%'
-            		or 
-            		lower(sku) like '%soy%' 
-            		or 
-            		lower(sku) like '%almond%' 	
-            		or 
-            		lower(sku) like '%oat%' 
-   		
-            	)
-            and (lower(category) like '%fresh%' or lower(category) like '%liquid%' or category ilike '%milk%')
-            order by insert_date desc
-            limit 1 by dt, sku, market
-            )
-            select 
-                dt, 
-                category_ category, 
-                avg(price_per_liters) mean_price,
-                median(price_per_liters) median_price, 
-                uniq(sku, market) sampled_skus
-            from base 
-            group by 
-                dt, 
-                category
-            order by 
-                dt
-    """
-    return client.query_df(query)
-
-
-@cache.memoize()
-def philippine_instant_noodles_price():
-    client = get_clickhouse_client()
-    query = """
-        with base as (
-            select
-                toDate(insert_date) date, 
-                sku,
-                market,
-                -- extract base grams
-                toFloat64OrNull(extract(sku, '([0-9]+)g')) AS grams,
-                
-                -- extract multiplier (supports patterns like "6pcs", "x6s", "6s")
-                toFloat64OrNull(
-                    extract(sku, '(?:x\\s*)?([0-9]+)\\s*(?:pcs|s)')
-                ) AS pcs,
-                
-                -- compute total grams
-                (
-                    toFloat64OrNull(extract(sku, '([0-9]+)g')) *
-                    multiIf(
-                        extract(sku, '(?:x\\s*)?([0-9]+)\\s*(?:pcs|s)') != '',
-                        toFloat64OrNull(extract(sku, '(?:x\\s*)?([0-9]+)\\s*(?:pcs|s)')),
-                        1
-                    )
-                ) AS total_grams,
-                price, 
-                price/total_grams pc_gram
-            from default.input_raw_products
-            where main_category='groceries'
-            and lower(sku) like '%instant%'
-            and lower(category) like '%noodle%'
-            and date>'2025-05-24'
-            order by insert_date desc 
-            limit 1 by date, sku, market
-            )
-            select 
-                date, 
-                avg(pc_gram) * 55 mean_price, 
-                median(pc_gram) * 55 median_price,
-                uniq(sku, market) sampled_skus
-            from base 
-            group by 
-                date
-            order by date               
-    """
-    return client.query_df(query)
-
-
-
-@cache.memoize()
-def philippine_instant_3_in_1_coffee_price():
     client = get_clickhouse_client()
-    query = r"""
-        SELECT
-            date, 
-            avg(price / (weight*quantity) * 400) mean_price, 
-            median(price / (weight*quantity) * 400) median_price
-        FROM (
-              select  
-                toDate(insert_date) date,
-                sku, 
-                toFloat32OrZero(extract(sku, '(\\d+)\\s?g')) AS weight,
-                coalesce(
-                    toFloat32OrNull(
-                        extract(
-                            sku,
-                            '\\|[^|]*?\\d+\\s?g[^0-9]*(\\d+)\\s?(?:[pP][cC][sS]?|[sS](?:achet|s)?|pack|Pack)?'
-                        )
-                    ),
-                    1
-                ) AS quantity,
-                price 
-            from default.input_raw_products
-            where main_category='groceries'
-            and (lower(category) like '%coffee%' or (category='Beverages' and market='ever'))
-            and  match(sku, '\\b[0-9]+\\s?g\\b')
-            and  match(sku, '\\b[Cc]offee\\b')
-			and match(sku, '(?i)3[[:space:][:punct:]]*(in)?[[:space:][:punct:]]*1')
-            and sku !='San Mig 3-in-1 Coffee Mix Original 20g | 30s'
-            and sku not ilike '%creamer%'
-            limit 1 by sku, insert_date)
-            group by date
-            order by date
-        """
-    return client.query_df(query)
+    since_filter = "and toDate(insert_date) >= {since:Date}" if since is not None else ""
+    date_filter, parameters = range_filter("toDate(insert_date)", start, end)
+    if since is not None:
+        parameters["since"] = since
+    query = grocery_panel_sql(f"{since_filter}\n            {date_filter}")
+    return query_df(client, query, parameters=parameters or None, schema=GROCERY_SCHEMA)
 
 
+def fetch_philippine_rice_prices(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "rice", {
+        "date": "date", "mean_price": "avg_price_per_kilo", "median_price": "median_price", "sampled_skus": "sampled_skus",
+    })
 
-@cache.memoize()
-def philippine_cooking_oil():
-    client = get_clickhouse_client()
-    query = r"""
-         SELECT
-            date, 
-            avg(price / adj_vol ) mean_price, 
-            median(price / adj_vol) median_price, 
-            uniq(sku, market) sampled_skus
-        FROM (
-        SELECT
-            toDate(insert_date) date, 
-            market,
-            sku,
-        coalesce(
-
-		    -- Match 2x, 3x, "x 2", "x2", etc.
-		    toInt64OrNull(regexpExtract(sku, '(?i)(\\d+)\\s*x', 1)),
-		
-		    -- Match "x 2s", "x2s", "x 2pcs", "x2pcs"
-		    toInt64OrNull(regexpExtract(sku, '(?i)x\\s*(\\d+)', 1)),
-		
-		    -- Match "2s", "2pcs", "2 pc", "2 pck"
-		    toInt64OrNull(regexpExtract(sku, '(?i)(\\d+)\\s*(s|pcs|pc|pck)', 1)),
-		
-		    -- Fallback
-		    1
-		
-		) AS unit_multiplier,
-            price,
-            toFloat64OrNull(regexpExtract(sku, '(\\d+(?:[\\.\\/]\\d+)?)\\s*\\.?\\s*(?i)(ml|l|gallon)', 1)) AS vol,
-            lower(regexpExtract(sku, '(\\d+(?:[\\.\\/]\\d+)?)\\s*\\.?\\s*(?i)(ml|l|gallon)', 2)) AS unit,
-        case when unit='ml' then vol /1000 else vol end*unit_multiplier as adj_vol
-        FROM default.input_raw_products
-        WHERE main_category='groceries'
-        AND sku ILIKE '%oil%'
-        AND category ILIKE '%cooking%'
-        and unit in ('ml', 'l')
-        order by insert_date desc 
-        limit 1 by date, sku, market )
-        group by date
-        """
-    return client.query_df(query)
 
+def fetch_philippine_egg_prices(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "egg", {
+        "date": "date", "mean_price": "avg_price_per_pc", "median_price": "median_pc", "sampled_skus": "sampled_skus",
+    })
 
-@cache.memoize()
-def fetch_philippine_onion():
-    client = get_clickhouse_client()
-    query = r"""
-        WITH
-            lower(trim(substring(sku, position(sku, '|') + 1))) AS qty,
-            position(qty, 'kg') > 0 AS isKg,
-            toFloat64OrZero(regexpExtract(qty, '(\\d+(?:\\.\\d+)?)')) AS kg_val,
-            toFloat64OrZero(regexpExtract(qty, '^(\\d+(?:\\.\\d+)?)')) AS g_left,
-            toFloat64OrZero(regexpExtract(qty, '(\\d+(?:\\.\\d+)?)[^\\d]*$')) AS g_right, 
-            
-            base as (
-        SELECT
-            toDate(insert_date) date,
-            sku,
-            market,
-            -- min_qty
-            CASE
-                WHEN isKg THEN 1000 * if(kg_val = 0, 1, kg_val)
-                ELSE g_left
-            END AS min_qty,
-            -- max_qty
-            CASE
-                WHEN isKg THEN 1000 * if(kg_val = 0, 1, kg_val)
-                ELSE g_right
-            END AS max_qty, 
-            case 
-            	when min_qty = 0 and max_qty!=0 then max_qty
-            	when min_qty != 0 and max_qty=0 then min_qty
-            	else  (min_qty+max_qty)/2 
-            end avg_qty,
-            price , 
-            price/avg_qty price_per_gram, 
-            price_per_gram*375 stadard_price
-        from default.input_raw_products
-        where 
-            main_category='groceries'
-            and (sku ilike '%onion%' or sku ilike '%sibuyas%')
-            and (
-            		(category ilike '%fresh%' and category ilike '%vegetable%')
-            		or 
-            		(category ilike '%fresh%' and market='ever')
-            	)
-            and sku not ilike '%leeks%'
-            and sku not ilike '%leave%'
-            and sku not ilike '%spring%'
-            and (min_qty!=0 or max_qty!=0)
-            and sku not ilike '%sprout%'
-        order by insert_date desc 
-        limit 1 by sku, market, date
-        ) 
-      
-        select 
-            date, 
-            avg(stadard_price) avg_price, 
-            median(stadard_price) median_price,
-            uniq(sku, market) sampled_skus
-        from base 
-        group by date
-        order by date asc 
-        """
-    return client.query_df(query)
 
+def fetch_philippine_milk_prices(start=None, end=None):
+    panel = fetch_philippine_grocery_prices(start=start, end=end)
+    columns = {"date": "dt", "product": "category", "mean_price": "mean_price", "median_price": "median_price", "sampled_skus": "sampled_skus"}
+    df = pd.concat([
+        grocery_slice(panel, "milk_cow", columns),
+        grocery_slice(panel, "milk_alternatives", columns),
+    ], ignore_index=True)
+    df["category"] = df["category"].map({"milk_cow": "Cow Milk", "milk_alternatives": "Alternatives"})
+    return df.sort_values("dt", kind="stable").reset_index(drop=True)
 
 
-@cache.memoize()
-def fetch_philippine_sugar_prices():
-    client = get_clickhouse_client()
-    query = r"""
-        with base as (
-                select 
-                    toDate(insert_date) dt,
-                    sku,
-                    market,
-                    price,
-                    multiIf(
-                    -- FRACTIONS like 1/2kg, 3/4 kg
-                    extract(sku, '(?i)([0-9]+/[0-9]+)\\s*kg') != '',
-                        (
-                            toFloat64(splitByChar('/', extract(sku, '(?i)([0-9]+/[0-9]+)\\s*kg'))[1])
-                            /
-                            toFloat64(splitByChar('/', extract(sku, '(?i)([0-9]+/[0-9]+)\\s*kg'))[2])
-                        ),
-                
-                    -- DECIMALS or WHOLE NUMBERS like 1kg, 1.5kg, 2.5kg
-                    extract(sku, '(?i)([0-9]+(?:[.,][0-9]+)?)\\s*kg') != '',
-                        toFloat64(replaceOne(
-                            extract(sku, '(?i)([0-9]+(?:[.,][0-9]+)?)\\s*kg'),
-                            ',',
-                            '.'
-                        )),
-                
-                    -- Default
-                    NULL
-                ) AS kilos, 
-                price/kilos standard_price
-                from default.input_raw_products 
-                where 
-                    main_category='groceries'
-                    and sku ilike '%sugar%' 
-                    and sku ilike '%refined%'   
-                    and (
-                        ( category ilike 'cooking%' and market='ever')
-                        or 
-                        ( market='sm supermarket' and category ilike '%pantry%')
-                        or 
-                        ( market='waltermart' and category ilike '%pantry%')
-                        ) 
-                    and kilos>0 
-                order by insert_date desc 
-                limit 1 by sku , dt, market 
-        ) 
-        select 
-                dt date, 
-                avg(standard_price) avg_price_per_kilo ,
-                median(standard_price) median_price,
-                uniq(sku, market) sampled_skus
-        from base
-        group by dt
-        order by dt
-        """
-    return client.query_df(query)
+def philippine_instant_noodles_price(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "instant_noodles", {
+        "date": "date", "mean_price": "mean_price", "median_price": "median_price", "sampled_skus": "sampled_skus",
+    })
 
 
+def philippine_instant_3_in_1_coffee_price(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "coffee_3_in_1", {
+        "date": "date", "mean_price": "mean_price", "median_price": "median_price", "sampled_skus": "sampled_skus",
+    })
 
-@cache.memoize()
-def philippine_instant_3_in_1_coffee_price():
-    client = get_clickhouse_client()
-    query = r"""
-        SELECT
-            date, 
-            avg(price / (weight*quantity) * 400) mean_price, 
-            median(price / (weight*quantity) * 400) median_price,
-            uniq(sku, market) sampled_skus
-        FROM (
-              select  
-                toDate(insert_date) date,
-                market,
-                sku, 
-                toFloat32OrZero(extract(sku, '(\\d+)\\s?g')) AS weight,
-                coalesce(
-                    toFloat32OrNull(
-                        extract(
-                            sku,
-                            '\\|[^|]*?\\d+\\s?g[^0-9]*(\\d+)\\s?(?:[pP][cC][sS]?|[sS](?:achet|s)?|pack|Pack)?'
-                        )
-                    ),
-                    1
-                ) AS quantity,
-                price 
-            from default.input_raw_products
-            where main_category='groceries'
-            and (lower(category) like '%coffee%' or (category='Beverages' and market='ever'))
-            and  match(sku, '\\b[0-9]+\\s?g\\b')
-            and  match(sku, '\\b[Cc]offee\\b')
-			and match(sku, '(?i)3[[:space:][:punct:]]*(in)?[[:space:][:punct:]]*1')
-            and sku !='San Mig 3-in-1 Coffee Mix Original 20g | 30s'
-            and sku not ilike '%creamer%'
-            limit 1 by sku, insert_date)
-            group by date
-            order by date
-        """
-    return client.query_df(query)
 
+def philippine_cooking_oil(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "cooking_oil", {
+        "date": "date", "mean_price": "mean_price", "median_price": "median_price", "sampled_skus": "sampled_skus",
+    })
 
 
-@cache.memoize()
-def philippine_detergent_powder():
-    client = get_clickhouse_client()
-    query = r"""
-        with base as (
-            SELECT 
-                toDate(insert_date) td, 
-                sku, 
-                market,
-
-                /* ✅ extract qty from patterns like 6+1, 3+2pcs */
-                case 
-                    when market='ever' then toInt64OrNull(regexpExtract(sku, '(?i)(?:^|[^0-9])(\\d+)x\\s*(\\d+)\\s*(g|gr)', 1))
-                else 
-                    (
-                        toInt64OrNull(regexpExtract(sku, '(?i)(\\d+)\\s*\\+\\s*(\\d+)', 1)) +
-                        toInt64OrNull(regexpExtract(sku, '(?i)(\\d+)\\s*\\+\\s*(\\d+)', 2))
-                    ) end AS qty_plus,
-
-                /* ✅ extract simple multipliers: x6, 6x, 6pcs, 6s */
-                coalesce(
-                    toInt64OrNull(regexpExtract(sku, '(?i)\\b(\\d+)\\s*x\\b', 1)),
-                    toInt64OrNull(regexpExtract(sku, '(?i)x\\s*(\\d+)', 1)),
-                    toInt64OrNull(regexpExtract(sku, '(?i)(\\d+)\\s*(pcs|s)\\b', 1)),
-                    1
-                ) AS qty_simple,
-
-                /* ✅ base quantity = qty_plus fallback qty_simple */
-                coalesce(qty_plus, qty_simple, 1) AS qty,
-
-                /* ✅ base grams */
-                multiIf(
-                    match(sku, '(?i)(\\d+(?:\\.\\d+)?)\\s*kg'),
-                        toFloat64(extract(sku, '(?i)(\\d+(?:\\.\\d+)?)\\s*kg')) * 1000.0,
-
-                    match(sku, '(?i)(\\d+(?:\\.\\d+)?)\\s*(g|gr)'),
-                        toFloat64(extract(sku, '(?i)(\\d+(?:\\.\\d+)?)\\s*(g|gr)')),
-
-                    NULL
-                ) AS grams,
-
-                /* ✅ final total weight, rounded */
-                round(grams * toFloat64(qty)) AS total_grams,
-
-                price / total_grams AS price_per_gram
-
-            FROM default.input_raw_products
-            WHERE main_category = 'groceries'
-            AND sku ILIKE '%Detergent%'
-            AND sku ILIKE '%Powder%'
-            and sku not ilike '%free%'
-            and toDate(insert_date)>='2025-06-01'
-            AND grams IS NOT NULL
-            ORDER BY insert_date DESC
-            limit 1 by td,  sku, market 
-            )
-        select 
-            td date, 
-            uniq(sku, market) sampled_skus,
-            avg(price_per_gram * 2000) mean_price, 
-            median(price_per_gram * 2000) median_price
-        from base 
-        group by date
-        order by date
-        """
-    return client.query_df(query)
+def fetch_philippine_onion(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "onion", {
+        "date": "date", "mean_price": "avg_price", "median_price": "median_price", "sampled_skus": "sampled_skus",
+    })
 
 
+def fetch_philippine_sugar_prices(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "sugar", {
+        "date": "date", "mean_price": "avg_price_per_kilo", "median_price": "median_price", "sampled_skus": "sampled_skus",
+    })
 
-@cache.memoize()
-def philippine_sardines():
-    client = get_clickhouse_client()
-    query = r"""
-        with base as (
-            SELECT 
-                toDate(insert_date) td, 
-                sku, 
-                market,
 
-                calc_total_grams(sku, market) AS total_grams,
+def philippine_detergent_powder(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "detergent_powder", {
+        "date": "date", "sampled_skus": "sampled_skus", "mean_price": "mean_price", "median_price": "median_price",
+    })
 
-                price / total_grams AS price_per_gram
 
-            FROM default.input_raw_products
-            WHERE main_category = 'groceries'
-    		and sku ilike '%sardin%'
-    		and total_grams is not null
-    		and insert_date>'2025-05-24'
-            ORDER BY insert_date DESC
-            limit 1 by td,  sku, market 
-            )
-            
-   
-        select 
-            td date, 
-            uniq(sku, market) sampled_skus,
-            avg(price_per_gram * 155) mean_price, 
-            median(price_per_gram * 155) median_price
-        from base 
-        group by date
-        order by date
-        """
-    return client.query_df(query)
+def philippine_sardines(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "sardines", {
+        "date": "date", "sampled_skus": "sampled_skus", "mean_price": "mean_price", "median_price": "median_price",
+    })
 
 
-@cache.memoize()
-def fetch_philippine_sugar_prices():
-    client = get_clickhouse_client()
-    query = r"""
-        with base as (
-                select 
-                    toDate(insert_date) dt,
-                    sku,
-                    market,
-                    price,
-                    multiIf(
-                    -- FRACTIONS like 1/2kg, 3/4 kg
-                    extract(sku, '(?i)([0-9]+/[0-9]+)\\s*kg') != '',
-                        (
-                            toFloat64(splitByChar('/', extract(sku, '(?i)([0-9]+/[0-9]+)\\s*kg'))[1])
-                            /
-                            toFloat64(splitByChar('/', extract(sku, '(?i)([0-9]+/[0-9]+)\\s*kg'))[2])
-                        ),
-                
-                    -- DECIMALS or WHOLE NUMBERS like 1kg, 1.5kg, 2.5kg
-                    extract(sku, '(?i)([0-9]+(?:[.,][0-9]+)?)\\s*kg') != '',
-                        toFloat64(replaceOne(
-                            extract(sku, '(?i)([0-9]+(?:[.,][0-9]+)?)\\s*kg'),
-                            ',',
-                            '.'
-                        )),
-                
-                    -- Default
-                    NULL
-                ) AS kilos, 
-                price/kilos standard_price
-                from default.input_raw_products 
-                where 
-                    main_category='groceries'
-                    and sku ilike '%sugar%' 
-                    and sku ilike '%refined%'   
-                    and (
-                        ( category ilike 'cooking%' and market='ever')
-                        or 
-                        ( market='sm supermarket' and category ilike '%pantry%')
-                        or 
-                        ( market='waltermart' and category ilike '%pantry%')
-                        ) 
-                    and kilos>0 
-                order by insert_date desc 
-                limit 1 by sku , dt, market 
-        ) 
-        select 
-                dt date, 
-                avg(standard_price) avg_price_per_kilo ,
-                median(standard_price) median_price,
-                uniq(sku, market) sampled_skus
-        from base
-        group by dt
-        order by dt
-        """
-    return client.query_df(query)
+def philippine_white_vingar_prices(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "white_vinegar", {
+        "date": "date", "mean_price": "mean_price", "median_price": "median_price", "sampled_skus": "sampled_skus",
+    })
 
 
+def philippine_cane_vingar_prices(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "cane_vinegar", {
+        "date": "date", "mean_price": "mean_price", "median_price": "median_price", "sampled_skus": "sampled_skus",
+    })
 
-@cache.memoize()
-def philippine_white_vingar_prices():
-    client = get_clickhouse_client()
-    query = r"""
-        with base as (
-        select 	
-            toDate(insert_date) date,
-            sku, 
-            price, 
-            market, 
-            multiIf(
-        -- Case: "X L Y pcs" or "X L Ypcs"
-        match(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]\\s*(\\d+)\\s*pcs'),
-            toFloat64(extract(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]')) * toInt32(extract(sku, '(\\d+)\\s*pcs')),
-
-        -- Case: "X ml Y pcs" or "X ml Ypcs"
-        match(sku, '(\\d+)\\s*[mM][lL]\\s*(\\d+)\\s*pcs'),
-            (toFloat64(extract(sku, '(\\d+)\\s*[mM][lL]')) * toInt32(extract(sku, '(\\d+)\\s*pcs'))) / 1000,
-
-        -- Case: "X ml x Y" or "X ml x Ys"
-        match(sku, '(\\d+)\\s*[mM][lL]\\s*[xX]\\s*(\\d+)s?'),
-            (toFloat64(extract(sku, '(\\d+)\\s*[mM][lL]')) * toInt32(extract(sku, '[xX]\\s*(\\d+)'))) / 1000,
-
-        -- Case: "X L x Y" or "X L x Ys"
-        match(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]\\s*[xX]\\s*(\\d+)s?'),
-            toFloat64(extract(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]')) * toInt32(extract(sku, '[xX]\\s*(\\d+)')),
-
-        -- Case: range in ml (e.g. "200-250ml")
-        match(sku, '(\\d+)\\s*-\\s*(\\d+)\\s*[mM][lL]'),
-            ((toFloat64(arrayElement(extractAll(sku, '(\\d+)'), 1)) +
-            toFloat64(arrayElement(extractAll(sku, '(\\d+)'), 2))) / 2.0) / 1000,
-
-        -- Case: "X L"
-        match(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]'),
-            toFloat64(extract(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]')),
-
-        -- Case: "X ml"
-        match(sku, '(\\d+)\\s*[mM][lL]'),
-            toFloat64(extract(sku, '(\\d+)\\s*[mM][lL]')) / 1000,
-
-        -- Else NULL
-        NULL
-                    ) AS volume_liters,
-            price/volume_liters price_per_liters
-        from default.input_raw_products
-        where 
-            main_category='groceries'
-            and sku ilike '%vinegar%'
-            and sku ilike '%white%'
-            and volume_liters is not null
-        order by insert_date desc
-        limit 1 by date, sku, market
-        )
 
-        select 
-            date, 
-            avg(price_per_liters) mean_price,
-            median(price_per_liters) median_price, 
-            uniq(sku, market) sampled_skus
-        from base
-        group by 
-            date
-        order by 
-            date
-        """
-    return client.query_df(query)
-
-
-
-@cache.memoize()
-def philippine_cane_vingar_prices():
-    client = get_clickhouse_client()
-    query = r"""
-        with base as (
-        select 	
-            toDate(insert_date) date,
-            sku, 
-            price, 
-            market, 
-            multiIf(
-        -- Case: "X L Y pcs" or "X L Ypcs"
-        match(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]\\s*(\\d+)\\s*pcs'),
-            toFloat64(extract(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]')) * toInt32(extract(sku, '(\\d+)\\s*pcs')),
-
-        -- Case: "X ml Y pcs" or "X ml Ypcs"
-        match(sku, '(\\d+)\\s*[mM][lL]\\s*(\\d+)\\s*pcs'),
-            (toFloat64(extract(sku, '(\\d+)\\s*[mM][lL]')) * toInt32(extract(sku, '(\\d+)\\s*pcs'))) / 1000,
-
-        -- Case: "X ml x Y" or "X ml x Ys"
-        match(sku, '(\\d+)\\s*[mM][lL]\\s*[xX]\\s*(\\d+)s?'),
-            (toFloat64(extract(sku, '(\\d+)\\s*[mM][lL]')) * toInt32(extract(sku, '[xX]\\s*(\\d+)'))) / 1000,
-
-        -- Case: "X L x Y" or "X L x Ys"
-        match(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]\\s*[xX]\\s*(\\d+)s?'),
-            toFloat64(extract(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]')) * toInt32(extract(sku, '[xX]\\s*(\\d+)')),
-
-        -- Case: range in ml (e.g. "200-250ml")
-        match(sku, '(\\d+)\\s*-\\s*(\\d+)\\s*[mM][lL]'),
-            ((toFloat64(arrayElement(extractAll(sku, '(\\d+)'), 1)) +
-            toFloat64(arrayElement(extractAll(sku, '(\\d+)'), 2))) / 2.0) / 1000,
-
-        -- Case: "X L"
-        match(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]'),
-            toFloat64(extract(sku, '(\\d+(?:\\.\\d+)?)\\s*[lL]')),
-
-        -- Case: "X ml"
-        match(sku, '(\\d+)\\s*[mM][lL]'),
-            toFloat64(extract(sku, '(\\d+)\\s*[mM][lL]')) / 1000,
-
-        -- Else NULL
-        NULL
-                    ) AS volume_liters,
-            price/volume_liters price_per_liters
-        from default.input_raw_products
-        where 
-            main_category='groceries'
-            and sku ilike '%vinegar%'
-            and sku ilike '%cane%'
-            and volume_liters is not null
-        order by insert_date desc
-        limit 1 by date, sku, market
-        )
-
-        select 
-            date, 
-            avg(price_per_liters) mean_price,
-            median(price_per_liters) median_price, 
-            uniq(sku, market) sampled_skus
-        from base
-        group by 
-            date
-        order by 
-            date
-        """
-    return client.query_df(query)
-
-
-
-
-@cache.memoize()
-def philippine_garlic_prices():
-    client = get_clickhouse_client()
-    query = r"""
-        with base as (
-        select  
-            toDate(insert_date) td, 
-            sku,
-            market, 
-            calc_total_grams(sku, market) grams, 
-            price/grams price_per_gram
-        from default.input_raw_products
-        where 
-            main_category='groceries'
-            and (sku ilike '%garlic%' or  sku ilike '%bawang%')
-            and category ilike '%fresh%'
-            and grams is not null 
-        limit 1 by td,  sku, market 
-        )
-
-        select 
-            td date, 
-            uniq(sku, market) sampled_skus,
-            avg(price_per_gram * 375) avg_price, 
-            median(price_per_gram * 375) median_price
-        from base 
-        group by date
-        order by date
-        """
-    return client.query_df(query)
+def philippine_garlic_prices(start=None, end=None):
+    return grocery_slice(fetch_philippine_grocery_prices(start=start, end=end), "garlic", {
+        "date": "date", "sampled_skus": "sampled_skus", "mean_price": "avg_price", "median_price": "median_price",
+    })
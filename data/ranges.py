@@ -0,0 +1,164 @@
+"""
+Date-range pushdown with range-aware caching.
+
+A query opts in with @date_range(column) on top of @memoize_swr() and accepts
+start=None, end=None (inclusive dates), which it pushes into its SQL through
+range_filter. Called without a range it behaves exactly as before and returns
+the full history that the cache refresh keeps warm.
+
+A ranged call is answered from the cache when any cached result covers the
+range: the full-history entry or an earlier ranged one, sliced in memory. Only
+when nothing covers it is the narrower query run; its result is memoized under
+its own range key and registered, so later sub-ranges are served from it.
+Refreshing the full history drops the ranged entries (data.refresh).
+"""
+import functools
+import inspect
+from datetime import date, datetime
+
+import pandas as pd
+
+from cache import cache
+from metrics import record_cache
+
+# Ranged entries remembered per query function, oldest dropped first
+MAX_CACHED_RANGES = 32
+
+
+def as_date(value):
+    """
+    None, a date, a datetime/Timestamp or an ISO 'YYYY-MM-DD' string -> date.
+    Raises ValueError for anything else.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def range_filter(expression, start=None, end=None):
+    """
+    SQL conditions and parameters restricting expression to [start, end].
+
+    Returns:
+        tuple: ('and <expression> >= {start:Date} ...', {'start': ..., 'end': ...}),
+        both empty when no bound is given.
+    """
+    conditions, parameters = [], {}
+    if start is not None:
+        conditions.append(f"and {expression} >= {{start:Date}}")
+        parameters["start"] = start
+    if end is not None:
+        conditions.append(f"and {expression} <= {{end:Date}}")
+        parameters["end"] = end
+    return "\n        ".join(conditions), parameters
+
+
+def slice_range(df, column, start=None, end=None):
+    """
+    Rows of df whose column falls in [start, end].
+    """
+    dates = pd.to_datetime(df[column])
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= dates >= pd.Timestamp(start)
+    if end is not None:
+        # Inclusive end date, also for timestamps later in the day
+        mask &= dates < pd.Timestamp(end) + pd.Timedelta(days=1)
+    return df[mask].reset_index(drop=True)
+
+
+def covers(outer, inner):
+    """
+    Whether the (start, end) range outer contains inner; None is unbounded.
+    """
+    (outer_start, outer_end), (inner_start, inner_end) = outer, inner
+    starts_before = outer_start is None or (inner_start is not None and outer_start <= inner_start)
+    ends_after = outer_end is None or (inner_end is not None and outer_end >= inner_end)
+    return starts_before and ends_after
+
+
+def _ranges_key(func):
+    return f"{func.make_cache_key()}:ranges"
+
+
+def cached_ranges(func):
+    return cache.get(_ranges_key(func)) or []
+
+
+def _register_range(func, bounds):
+    ranges = [r for r in cached_ranges(func) if r != bounds] + [bounds]
+    cache.set(_ranges_key(func), ranges[-MAX_CACHED_RANGES:], timeout=func.cache_timeout)
+
+
+def drop_cached_ranges(func):
+    """
+    Deletes every ranged entry of func. Called after its full history was
+    refreshed, so ranged requests are sliced from the new data again.
+    """
+    for start, end in cached_ranges(func):
+        func.delete_memoized(start=start, end=end)
+    cache.delete(_ranges_key(func))
+
+
+def _cached_superset(func, bounds):
+    # Called through the memoized function rather than read with peek(), so
+    # a stale superset is revalidated in the background as on any other hit.
+    # The full history first, it is the entry the refresh keeps current.
+    if func.peek() is not None:
+        return func()
+    for start, end in reversed(cached_ranges(func)):
+        if covers((start, end), bounds) and func.peek(start=start, end=end) is not None:
+            return func(start=start, end=end)
+    return None
+
+
+def date_range(column="date", sliceable=True):
+    """
+    Adds start/end to a memoized query function.
+
+    Args:
+        column (str): Date column of the result the range applies to.
+        sliceable (bool): False for queries whose values depend on the window
+            itself (e.g. rebased to its first day); those are never served
+            from a wider cached result.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def ranged(*args, start=None, end=None, **kwargs):
+            start, end = as_date(start), as_date(end)
+            if start is None and end is None:
+                return func(*args, **kwargs)
+            if start is not None and end is not None and start > end:
+                raise ValueError(f"start {start} is after end {end}")
+
+            bounds = (start, end)
+            if sliceable and not args and not kwargs:
+                superset = _cached_superset(func, bounds)
+                if superset is not None:
+                    record_cache(func.__name__, "superset")
+                    return slice_range(superset, column, start, end)
+
+            result = func(*args, start=start, end=end, **kwargs)
+            if not args and not kwargs:
+                # Registered so a refresh can drop it, see drop_cached_ranges
+                _register_range(func, bounds)
+                if sliceable:
+                    # The SQL may widen the range to a period boundary
+                    result = slice_range(result, column, start, end)
+            return result
+
+        ranged.date_range = {"column": column, "sliceable": sliceable}
+        return ranged
+    return decorator
+
+
+def accepts_range(func):
+    """
+    Whether func takes start/end, e.g. a page's get_data.
+    """
+    parameters = inspect.signature(func).parameters
+    return "start" in parameters and "end" in parameters
@@ -0,0 +1,103 @@
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from cache import cache
+from metrics import LAST_REFRESH_KEY, record_refresh
+
+import data.queries as dq
+from .incremental import refresh_incremental
+from .ranges import drop_cached_ranges
+from .sku_units import sync_sku_units
+
+# ClickHouse does the heavy lifting, threads only wait on I/O
+REFRESH_MAX_WORKERS = 4
+
+
+def memoized_queries():
+    """
+    All cached query functions defined in data.queries.
+    """
+    return [
+        func for name, func in inspect.getmembers(dq, inspect.isfunction)
+        if func.__module__ == dq.__name__ and hasattr(func, "store")
+    ]
+
+
+def recompute(func, full=False):
+    """
+    Runs the query behind a memoized function and overwrites its cache entry.
+    The old value stays readable until the new one is written, so live
+    traffic never sees a miss while the refresh runs. @incremental queries
+    only fetch rows past their watermark unless full is set. Ranged entries
+    of @date_range queries are dropped, they are sliced from the new data.
+
+    Returns:
+        tuple: (result, 'full' | 'incremental')
+    """
+    if hasattr(func, "incremental"):
+        result, mode = refresh_incremental(func, full=full)
+    else:
+        result, mode = func.uncached(), "full"
+        func.store(result)
+    if hasattr(func, "date_range"):
+        drop_cached_ranges(func)
+    return result, mode
+
+
+def _refresh_one(app, func, full):
+    with app.app_context():
+        start = time.perf_counter()
+        entry = {"name": func.__name__, "status": "ok", "mode": None, "duration_s": None, "rows": None, "error": None}
+        try:
+            print(f"🔄 Caching → {func.__name__}()")
+            result, entry["mode"] = recompute(func, full=full)
+            entry["rows"] = len(result) if hasattr(result, "__len__") else None
+        except Exception as e:
+            print(f"⚠️ {func.__name__} failed: {e}")
+            entry["status"] = "failed"
+            entry["error"] = str(e)
+        entry["duration_s"] = round(time.perf_counter() - start, 3)
+        record_refresh(func.__name__, entry["status"])
+        return entry
+
+
+def _sync_sku_units():
+    # Grocery queries join the parsed-SKU table, so new SKUs go in first
+    try:
+        return {"parsed": sync_sku_units(), "error": None}
+    except Exception as e:
+        print(f"⚠️ SKU unit sync failed: {e}")
+        return {"parsed": 0, "error": str(e)}
+
+
+def refresh_all(funcs=None, max_workers=REFRESH_MAX_WORKERS, full=False):
+    """
+    Recomputes every memoized query with a bounded thread pool. full=True
+    rebuilds incremental queries from scratch as well.
+
+    Returns:
+        dict: {'duration_s', 'ok', 'failed', 'sku_units': {'parsed', 'error'},
+        'queries': [{'name', 'status', 'mode', 'duration_s', 'rows', 'error'}, ...]}
+    """
+    funcs = memoized_queries() if funcs is None else funcs
+    app = current_app._get_current_object()
+
+    start = time.perf_counter()
+    sku_units = _sync_sku_units()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="refresh") as pool:
+        entries = list(pool.map(lambda func: _refresh_one(app, func, full), funcs))
+
+    failed = [e["name"] for e in entries if e["status"] != "ok"]
+    report = {
+        "duration_s": round(time.perf_counter() - start, 3),
+        "ok": len(entries) - len(failed),
+        "failed": failed,
+        "sku_units": sku_units,
+        "queries": entries,
+    }
+    # Shared, so /metrics on any worker can report the last refresh
+    cache.set(LAST_REFRESH_KEY, report, timeout=0)
+    return report
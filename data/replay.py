@@ -0,0 +1,226 @@
+"""
+Record/replay stand-in for ClickHouse.
+
+With CLICKHOUSE_MODE=record, get_clickhouse_client wraps the live client and
+writes the result of every query it runs to a Parquet file in
+CLICKHOUSE_REPLAY_DIR. With CLICKHOUSE_MODE=replay it returns a ReplayClient
+that answers the same queries from those files, without a server or
+config.db_config, so pages, APIs and benchmarks run offline.
+
+A result is keyed by its SQL (whitespace-insensitive) and parameters, so
+replay serves exactly the queries that were recorded; anything else raises
+ReplayMiss. Writes (command, insert_df) are dropped on replay.
+
+Record every memoized query of data.queries against the live server, then
+list what was recorded:
+    python -m data.replay record [--dir DIR] [--range START:END ...]
+    python -m data.replay list [--dir DIR]
+
+`record` covers full-range loads, plus, for each --range, the @date_range
+queries over that range (e.g. what /api/<page>/data?start=&end= runs).
+Incremental refreshes (@incremental, since=<watermark>) depend on the cache
+state at the time and are not recorded; neither are ranges not given here.
+Replaying those raises ReplayMiss. To capture exactly what a workload
+issues, run it once with CLICKHOUSE_MODE=record instead.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only needed to record or replay
+    pa = pq = None
+
+MODE_ENV = "CLICKHOUSE_MODE"
+DIR_ENV = "CLICKHOUSE_REPLAY_DIR"
+LIVE, RECORD, REPLAY = "live", "record", "replay"
+
+DEFAULT_REPLAY_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "recordings"
+)
+MANIFEST = "manifest.json"
+
+
+def client_mode():
+    mode = os.environ.get(MODE_ENV, LIVE).lower()
+    if mode not in (LIVE, RECORD, REPLAY):
+        raise ValueError(f"{MODE_ENV} must be one of {LIVE}, {RECORD}, {REPLAY}, got {mode!r}")
+    return mode
+
+
+def replay_dir():
+    return os.environ.get(DIR_ENV, DEFAULT_REPLAY_DIR)
+
+
+def fingerprint(query, parameters=None):
+    normalized = " ".join(query.split())
+    params = json.dumps(sorted((parameters or {}).items()), default=str)
+    return hashlib.sha256(f"{normalized}\n{params}".encode("utf-8")).hexdigest()[:16]
+
+
+class ReplayMiss(KeyError):
+    """
+    The query was not recorded.
+    """
+
+
+class RecordingClient:
+    """
+    Wraps a live client and snapshots every query result to Parquet.
+    """
+
+    # data.db_client.query_df prefers the streaming calls when a client has
+    # them; hiding them sends every query through query_df/query_arrow, where
+    # it is recorded
+    raw_stream = None
+    query_df_stream = None
+
+    def __init__(self, client, directory):
+        self._client = client
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _record(self, query, parameters, table):
+        key = fingerprint(query, parameters)
+        pq.write_table(table, os.path.join(self.directory, f"{key}.parquet"))
+        with self._lock:
+            path = os.path.join(self.directory, MANIFEST)
+            manifest = _read_manifest(self.directory)
+            manifest[key] = {
+                "query": " ".join(query.split())[:200],
+                "parameters": {k: str(v) for k, v in (parameters or {}).items()},
+                "rows": table.num_rows,
+                "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            with open(path, "w") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+
+    def query_df(self, query, parameters=None, settings=None, **kwargs):
+        df = self._client.query_df(query, parameters=parameters, settings=settings, **kwargs)
+        self._record(query, parameters, pa.Table.from_pandas(df, preserve_index=False))
+        return df
+
+    def query_arrow(self, query, parameters=None, settings=None, **kwargs):
+        table = self._client.query_arrow(query, parameters=parameters, settings=settings, **kwargs)
+        self._record(query, parameters, table)
+        return table
+
+
+class ReplayClient:
+    """
+    Serves recorded results; a drop-in for the clickhouse_connect client as
+    far as this app uses it.
+    """
+
+    def __init__(self, directory):
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"No recordings in {directory}, run `python -m data.replay record` first")
+        self.directory = directory
+
+    def _load(self, query, parameters):
+        key = fingerprint(query, parameters)
+        path = os.path.join(self.directory, f"{key}.parquet")
+        if not os.path.exists(path):
+            head = " ".join(query.split())[:120]
+            raise ReplayMiss(f"query {key} was not recorded (ranged and incremental calls need their own "
+                             f"recording, see data.replay): {head}")
+        return pq.read_table(path)
+
+    def query_arrow(self, query, parameters=None, settings=None, **kwargs):
+        return self._load(query, parameters)
+
+    def query_df(self, query, parameters=None, settings=None, **kwargs):
+        return self._load(query, parameters).to_pandas()
+
+    def command(self, *args, **kwargs):
+        return None
+
+    def insert_df(self, *args, **kwargs):
+        return None
+
+    def ping(self):
+        return True
+
+
+def _read_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def record_all(directory=None, ranges=()):
+    """
+    Runs every memoized query of data.queries once against the live server
+    with recording on, bypassing the cache, and every @date_range query once
+    more per (start, end) in ranges.
+
+    Returns:
+        list: [{'name', 'range', 'status', 'rows', 'error'}, ...]
+    """
+    os.environ[MODE_ENV] = RECORD
+    if directory:
+        os.environ[DIR_ENV] = directory
+
+    from .ranges import as_date
+    from .refresh import memoized_queries
+
+    calls = []
+    for func in memoized_queries():
+        calls.append((func, None))
+        if hasattr(func, "date_range"):
+            # Same arguments the ranged wrapper passes, so the SQL and its
+            # parameters (the replay key) match a live ranged call
+            calls.extend((func, (as_date(start), as_date(end))) for start, end in ranges)
+
+    entries = []
+    for func, bounds in calls:
+        entry = {"name": func.__name__, "range": None, "status": "ok", "rows": None, "error": None}
+        try:
+            if bounds is None:
+                print(f"⏺️ Recording → {func.__name__}()")
+                entry["rows"] = len(func.uncached())
+            else:
+                entry["range"] = [str(b) if b is not None else None for b in bounds]
+                print(f"⏺️ Recording → {func.__name__}(start={bounds[0]}, end={bounds[1]})")
+                entry["rows"] = len(func.uncached(start=bounds[0], end=bounds[1]))
+        except Exception as e:
+            print(f"⚠️ {func.__name__} failed: {e}")
+            entry["status"], entry["error"] = "failed", str(e)
+        entries.append(entry)
+    return entries
+
+
+def _parse_range(value):
+    start, sep, end = value.partition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected START:END, got {value!r}")
+    return start or None, end or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["record", "list"])
+    parser.add_argument("--dir", default=None, help=f"recordings directory (default ${DIR_ENV} or {DEFAULT_REPLAY_DIR})")
+    parser.add_argument("--range", dest="ranges", action="append", type=_parse_range, default=[],
+                        metavar="START:END", help="also record @date_range queries over this range (repeatable)")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        print(json.dumps(record_all(args.dir, args.ranges), indent=2))
+    else:
+        print(json.dumps(_read_manifest(args.dir or replay_dir()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Declared result schemas for query functions.
+
+A query that passes schema= to data.db_client.query_df is fetched as an Arrow
+table, cast column by column to the declared types and converted to pandas
+with split blocks, so numeric columns are handed over without a copy or a
+round trip through object dtype. Columns not listed keep the type Arrow
+gives them.
+
+    schema = {"date": DATE, "close": FLOAT64, "product": CATEGORY}
+"""
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # without pyarrow the schema is applied on the pandas side
+    pa = None
+
+DATE = "date"
+FLOAT64 = "float64"
+FLOAT32 = "float32"
+INT64 = "int64"
+CATEGORY = "category"
+STRING = "string"
+
+
+def _arrow_type(kind):
+    return {
+        DATE: pa.timestamp("s"),
+        FLOAT64: pa.float64(),
+        FLOAT32: pa.float32(),
+        INT64: pa.int64(),
+        STRING: pa.string(),
+    }[kind]
+
+
+def _cast_column(column, kind):
+    if kind == CATEGORY:
+        if not pa.types.is_dictionary(column.type):
+            column = pc.cast(column, pa.string()).dictionary_encode()
+        return column
+    if pa.types.is_dictionary(column.type):
+        column = column.dictionary_decode()
+    if kind == DATE and pa.types.is_timestamp(column.type) and column.type.tz is not None:
+        # Timezone-aware DateTime columns keep their wall-clock time
+        column = pc.local_timestamp(column)
+    return pc.cast(column, _arrow_type(kind), safe=False)
+
+
+def _sorted_categories(df, schema):
+    # dictionary_encode orders categories by first appearance; sort them so
+    # sort_values and groupby behave as they did on plain strings
+    for name, kind in schema.items():
+        if kind == CATEGORY and name in df.columns:
+            df[name] = df[name].cat.reorder_categories(sorted(df[name].cat.categories))
+    return df
+
+
+def arrow_to_frame(table, schema):
+    """
+    Casts an Arrow table to the declared schema and converts it to pandas.
+
+    Args:
+        table (pa.Table): Query result.
+        schema (dict): Column -> DATE | FLOAT64 | FLOAT32 | INT64 | CATEGORY | STRING.
+    """
+    for name, kind in schema.items():
+        if name in table.column_names:
+            index = table.column_names.index(name)
+            table = table.set_column(index, name, _cast_column(table.column(name), kind))
+    df = table.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
+    return _sorted_categories(df, schema)
+
+
+def apply_schema(df, schema):
+    """
+    pandas-side fallback of arrow_to_frame for a frame from client.query_df.
+    """
+    for name, kind in schema.items():
+        if name not in df.columns:
+            continue
+        if kind == DATE:
+            df[name] = pd.to_datetime(df[name])
+        elif kind == CATEGORY:
+            df[name] = df[name].astype(str).astype("category")
+        elif kind == STRING:
+            df[name] = df[name].astype(str)
+        else:
+            df[name] = pd.to_numeric(df[name], errors="coerce").astype(kind)
+    return _sorted_categories(df, schema)
@@ -0,0 +1,158 @@
+"""
+Latest-version snapshot tables for the versioned trading.* tables.
+
+Every source table keeps its full version history and the queries used to
+pick the latest row per key with ORDER BY version DESC LIMIT 1 BY ..., which
+sorts the whole history on every refresh. Each source here gets a
+ReplacingMergeTree copy keyed on the dedup key, fed incrementally by a
+materialized view, so readers only need `FROM <snapshot> FINAL`. The
+fundamentals snapshot is keyed per filing instead, see latest_filings_sql.
+
+Usage (from the repository root):
+    python -m data.schema --create --backfill
+    python -m data.schema --print          # DDL only, nothing executed
+"""
+import argparse
+
+from .db_client import get_clickhouse_client
+
+# source table → snapshot spec. 'keys' is the dedup key (ORDER BY of the
+# snapshot), 'version' the column whose highest value wins.
+SNAPSHOTS = {
+    "trading.asset_prices": {
+        "table": "trading.asset_prices_latest",
+        "keys": ["ticker", "date"],
+        "version": "version",
+    },
+    "trading.economic_calendar": {
+        "table": "trading.economic_calendar_latest",
+        "keys": ["attribute", "date"],
+        "version": "version",
+    },
+    "trading.bonds": {
+        "table": "trading.bonds_latest",
+        "keys": ["isin"],
+        "version": "version",
+    },
+    "trading.cot_financial_futures": {
+        "table": "trading.cot_financial_futures_latest",
+        "keys": ["market_and_exchange_names", "report_date"],
+        "version": "version",
+    },
+    # Queries filter on form and id before deduplicating and break created_at
+    # ties on filed, which a single version column can't do. This snapshot
+    # keeps the latest row per filing instead; read it with
+    # latest_filings_sql(), which finishes the dedupe after the filters.
+    "trading.equity_fundamental": {
+        "table": "trading.equity_fundamental_filings",
+        "keys": ["entity", "dimension", "form", "start", "end", "id", "filed"],
+        "version": "created_at",
+    },
+}
+
+# Dedup key of the fundamentals queries, see latest_filings_sql
+FILING_KEYS = ["start", "end", "entity", "dimension"]
+
+
+def snapshot_table(source):
+    return SNAPSHOTS[source]["table"]
+
+
+def latest_filings_sql(columns, where):
+    """
+    The latest version of every equity_fundamental line matching where, as
+    the original queries picked it: filter first, then keep the row with the
+    highest (created_at, filed) per (start, end, entity, dimension).
+
+    Args:
+        columns (dict): Output column -> expression on a snapshot row.
+        where (str): Conditions, applied before the dedupe.
+
+    Returns:
+        str: SELECT start, end, entity, dimension and the columns.
+    """
+    keys = ", ".join(FILING_KEYS)
+    # A tuple keeps a latest row whose values are NULL, as LIMIT 1 BY did
+    values = ", ".join(columns.values())
+    picked = ",\n            ".join(f"latest.{i} AS {name}" for i, name in enumerate(columns, start=1))
+    return f"""
+        SELECT
+            {keys},
+            {picked}
+        FROM (
+            SELECT
+                {keys},
+                argMax(tuple({values}), (created_at, filed)) AS latest
+            FROM {snapshot_table("trading.equity_fundamental")} FINAL
+            WHERE {where}
+            GROUP BY {keys}
+        )
+    """
+
+
+def create_statements(source, spec):
+    keys = ", ".join(f"`{k}`" for k in spec["keys"])
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS {spec['table']} AS {source}
+        ENGINE = ReplacingMergeTree({spec['version']})
+        ORDER BY ({keys})
+        """,
+        # New inserts into the source flow into the snapshot as they arrive
+        f"""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS {spec['table']}_mv
+        TO {spec['table']}
+        AS SELECT * FROM {source}
+        """,
+    ]
+
+
+def backfill_statement(source, spec):
+    # Safe to run after the view exists: rows inserted twice collapse on merge
+    return f"INSERT INTO {spec['table']} SELECT * FROM {source}"
+
+
+def optimize_statement(spec):
+    return f"OPTIMIZE TABLE {spec['table']} FINAL"
+
+
+def ensure_snapshots(client=None, backfill=False, optimize=False):
+    """
+    Creates every snapshot table and its materialized view if missing.
+
+    Args:
+        client: ClickHouse client, defaults to get_clickhouse_client().
+        backfill (bool): Copy the existing history into the snapshots.
+        optimize (bool): Force a merge afterwards so FINAL has little to do.
+    """
+    client = client or get_clickhouse_client()
+    for source, spec in SNAPSHOTS.items():
+        print(f"🔧 {source} → {spec['table']}")
+        for statement in create_statements(source, spec):
+            client.command(statement)
+        if backfill:
+            client.command(backfill_statement(source, spec))
+        if optimize:
+            client.command(optimize_statement(spec))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--create", action="store_true", help="create snapshot tables and views")
+    parser.add_argument("--backfill", action="store_true", help="copy existing history into the snapshots")
+    parser.add_argument("--optimize", action="store_true", help="force a final merge of the snapshots")
+    parser.add_argument("--print", action="store_true", help="print the DDL without executing it")
+    args = parser.parse_args()
+
+    if args.print:
+        for source, spec in SNAPSHOTS.items():
+            for statement in create_statements(source, spec) + [backfill_statement(source, spec)]:
+                print(statement.strip() + ";\n")
+        return
+
+    if args.create or args.backfill or args.optimize:
+        ensure_snapshots(backfill=args.backfill, optimize=args.optimize)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+SKU unit parsing for the grocery price queries.
+
+Pack sizes (kilos, liters, grams, piece counts, multipacks) used to be pulled
+out of input_raw_products.sku with regex pipelines inside every query, on every
+row of every refresh, although only a few thousand distinct SKU strings exist.
+Here each rule is a vectorized pandas function over (sku, market), every
+distinct pair is parsed once and the results are kept in SKU_UNITS_TABLE,
+which the queries join against.
+
+Usage (from the repository root):
+    python -m data.sku_units            # parse new (sku, market) pairs
+    python -m data.sku_units --print    # DDL only, nothing executed
+"""
+import argparse
+import re
+
+import numpy as np
+import pandas as pd
+
+from .db_client import get_clickhouse_client
+
+SKU_UNITS_TABLE = "default.sku_units"
+
+# Bump after changing any rule: pairs parsed under an older version are
+# parsed again on the next sync and the newest version wins. Cached grocery
+# history is rebuilt in full on the next refresh, see data.incremental.
+RULES_VERSION = 1
+
+# One sync inserts at most this many pairs per batch
+INSERT_BATCH_ROWS = 50_000
+
+
+def _extract(sku, pattern, group=0):
+    # ClickHouse extract(): the capture group of the first match, NaN if none
+    return sku.str.extract(pattern, expand=True)[group]
+
+
+def _to_float(values):
+    return pd.to_numeric(values, errors="coerce").astype("float64")
+
+
+def _where(condition, value):
+    return value.where(condition)
+
+
+def _coalesce(*series):
+    result = series[0]
+    for s in series[1:]:
+        result = result.fillna(s)
+    return result
+
+
+def _without_groups(pattern):
+    # Same pattern with non-capturing groups, str.contains warns otherwise
+    return re.sub(r"(?<!\\)\((?!\?)", "(?:", pattern)
+
+
+def _first_match(sku, cases):
+    """
+    multiIf over (pattern, value) pairs: the value of the first pattern that
+    matches the SKU, NaN if none does.
+    """
+    conditions = [sku.str.contains(_without_groups(pattern), regex=True) for pattern, _ in cases]
+    values = [value for _, value in cases]
+    return pd.Series(np.select(conditions, values, default=np.nan), index=sku.index)
+
+
+# --- Rules -----------------------------------------------------------------------
+#
+# Each rule takes the frame of distinct (sku, market) pairs and returns one
+# float column. NaN means the SKU carries no usable size.
+
+def rice_kg(pairs):
+    sku, market = pairs["sku"], pairs["market"]
+    ever = _to_float(_extract(sku, r"s*(\d+(\.\d+)?)kg"))
+    other = _to_float(_extract(sku, r"\|\s*(\d+(\.\d+)?)kg"))
+    return ever.where(market == "ever", other)
+
+
+def egg_pcs(pairs):
+    sku, market = pairs["sku"], pairs["market"]
+    ever = _to_float(_extract(sku, r"(\d+)"))
+    other = _to_float(_extract(sku, r"\|\s*(\d+)"))
+    return ever.where(market == "ever", other)
+
+
+def volume_liters(pairs):
+    # Milk and vinegar; multipacks are multiplied out, ml ranges averaged
+    sku = pairs["sku"]
+    liters = _to_float(_extract(sku, r"(\d+(?:\.\d+)?)\s*[lL]"))
+    ml = _to_float(_extract(sku, r"(\d+)\s*[mM][lL]"))
+    pcs = _to_float(_extract(sku, r"(\d+)\s*pcs"))
+    times = _to_float(_extract(sku, r"[xX]\s*(\d+)"))
+    numbers = sku.str.extractall(r"(\d+)")[0].unstack()
+    first = _to_float(numbers[0]).reindex(sku.index) if 0 in numbers else pd.Series(np.nan, index=sku.index)
+    second = _to_float(numbers[1]).reindex(sku.index) if 1 in numbers else pd.Series(np.nan, index=sku.index)
+    return _first_match(sku, [
+        (r"(\d+(?:\.\d+)?)\s*[lL]\s*(\d+)\s*pcs", liters * pcs),
+        (r"(\d+)\s*[mM][lL]\s*(\d+)\s*pcs", ml * pcs / 1000),
+        (r"(\d+)\s*[mM][lL]\s*[xX]\s*(\d+)s?", ml * times / 1000),
+        (r"(\d+(?:\.\d+)?)\s*[lL]\s*[xX]\s*(\d+)s?", liters * times),
+        (r"(\d+)\s*-\s*(\d+)\s*[mM][lL]", (first + second) / 2.0 / 1000),
+        (r"(\d+(?:\.\d+)?)\s*[lL]", liters),
+        (r"(\d+)\s*[mM][lL]", ml / 1000),
+    ])
+
+
+def noodle_grams(pairs):
+    sku = pairs["sku"]
+    grams = _to_float(_extract(sku, r"([0-9]+)g"))
+    pcs = _to_float(_extract(sku, r"(?:x\s*)?([0-9]+)\s*(?:pcs|s)"))
+    return grams * pcs.fillna(1)
+
+
+def coffee_grams(pairs):
+    # Sachet weight times sachet count, '20g | 30s'
+    sku = pairs["sku"]
+    weight = _to_float(_extract(sku, r"(\d+)\s?g")).fillna(0)
+    quantity = _to_float(_extract(
+        sku, r"\|[^|]*?\d+\s?g[^0-9]*(\d+)\s?(?:[pP][cC][sS]?|[sS](?:achet|s)?|pack|Pack)?"
+    )).fillna(1)
+    return weight * quantity
+
+
+def oil_liters(pairs):
+    sku = pairs["sku"]
+    multiplier = _coalesce(
+        _to_float(_extract(sku, r"(?i)(\d+)\s*x")),
+        _to_float(_extract(sku, r"(?i)x\s*(\d+)")),
+        _to_float(_extract(sku, r"(?i)(\d+)\s*(s|pcs|pc|pck)")),
+    ).fillna(1)
+    size = sku.str.extract(r"(\d+(?:[./]\d+)?)\s*\.?\s*((?i:ml|l|gallon))", expand=True)
+    volume = _to_float(size[0])
+    unit = size[1].str.lower()
+    liters = volume.where(unit != "ml", volume / 1000) * multiplier
+    return _where(unit.isin(["ml", "l"]), liters)
+
+
+def onion_grams(pairs):
+    # Either '1kg' or a grams range such as '250-300g' after the '|'
+    sku = pairs["sku"]
+    has_bar = sku.str.contains("|", regex=False)
+    qty = sku.where(~has_bar, sku.str.split("|", n=1).str[1]).str.strip(" ").str.lower()
+    is_kg = qty.str.contains("kg", regex=False)
+    kg = _to_float(_extract(qty, r"(\d+(?:\.\d+)?)")).fillna(0)
+    left = _to_float(_extract(qty, r"^(\d+(?:\.\d+)?)")).fillna(0)
+    right = _to_float(_extract(qty, r"(\d+(?:\.\d+)?)[^\d]*$")).fillna(0)
+
+    kg_grams = 1000 * kg.where(kg != 0, 1)
+    low = kg_grams.where(is_kg, left)
+    high = kg_grams.where(is_kg, right)
+    grams = pd.Series(np.select(
+        [(low == 0) & (high != 0), (low != 0) & (high == 0)],
+        [high, low],
+        default=(low + high) / 2,
+    ), index=sku.index)
+    return _where((low != 0) | (high != 0), grams)
+
+
+def sugar_kg(pairs):
+    sku = pairs["sku"]
+    fraction = _extract(sku, r"(?i)([0-9]+/[0-9]+)\s*kg")
+    parts = fraction.str.split("/", expand=True).reindex(columns=[0, 1])
+    decimal = _extract(sku, r"(?i)([0-9]+(?:[.,][0-9]+)?)\s*kg").str.replace(",", ".", n=1, regex=False)
+    return _coalesce(_to_float(parts[0]) / _to_float(parts[1]), _to_float(decimal))
+
+
+def detergent_grams(pairs):
+    sku, market = pairs["sku"], pairs["market"]
+    ever_plus = _to_float(_extract(sku, r"(?i)(?:^|[^0-9])(\d+)x\s*(\d+)\s*(g|gr)"))
+    bonus = sku.str.extract(r"(?i)(\d+)\s*\+\s*(\d+)", expand=True)
+    other_plus = _to_float(bonus[0]) + _to_float(bonus[1])
+    qty_plus = ever_plus.where(market == "ever", other_plus)
+    qty_simple = _coalesce(
+        _to_float(_extract(sku, r"(?i)\b(\d+)\s*x\b")),
+        _to_float(_extract(sku, r"(?i)x\s*(\d+)")),
+        _to_float(_extract(sku, r"(?i)(\d+)\s*(pcs|s)\b")),
+    ).fillna(1)
+    qty = qty_plus.fillna(qty_simple)
+
+    kg = _to_float(_extract(sku, r"(?i)(\d+(?:\.\d+)?)\s*kg"))
+    g = _to_float(_extract(sku, r"(?i)(\d+(?:\.\d+)?)\s*(g|gr)"))
+    grams = _first_match(sku, [
+        (r"(?i)(\d+(?:\.\d+)?)\s*kg", kg * 1000.0),
+        (r"(?i)(\d+(?:\.\d+)?)\s*(g|gr)", g),
+    ])
+    return np.round(grams * qty)
+
+
+RULES = {
+    "rice_kg": rice_kg,
+    "egg_pcs": egg_pcs,
+    "volume_liters": volume_liters,
+    "noodle_grams": noodle_grams,
+    "coffee_grams": coffee_grams,
+    "oil_liters": oil_liters,
+    "onion_grams": onion_grams,
+    "sugar_kg": sugar_kg,
+    "detergent_grams": detergent_grams,
+}
+
+
+def parse_skus(pairs):
+    """
+    Applies every rule to a frame of distinct (sku, market) pairs.
+
+    Returns:
+        pd.DataFrame: sku, market, one column per rule, rules_version.
+    """
+    pairs = pairs[["sku", "market"]].drop_duplicates().reset_index(drop=True)
+    pairs["sku"] = pairs["sku"].fillna("").astype(str)
+    pairs["market"] = pairs["market"].fillna("").astype(str)
+    parsed = pairs.copy()
+    for name, rule in RULES.items():
+        parsed[name] = rule(pairs).astype("float64")
+    parsed["rules_version"] = RULES_VERSION
+    return parsed
+
+
+# --- Lookup table ----------------------------------------------------------------
+
+def sku_units_join(how="INNER", **columns):
+    """
+    JOIN clause against the lookup table for a query over
+    input_raw_products, e.g. sku_units_join(kilos="rice_kg") exposes the
+    rice_kg column as kilos. With the default INNER join, pairs not parsed
+    yet are left out; with how="LEFT" their sizes are NULL.
+    """
+    selected = ", ".join(f"{rule} AS {alias}" for alias, rule in columns.items())
+    return f"""
+        {how} JOIN (
+            SELECT sku, market, {selected}
+            FROM {SKU_UNITS_TABLE} FINAL
+        ) AS units USING (sku, market)
+    """
+
+
+def create_statement():
+    columns = ",\n            ".join(f"`{name}` Nullable(Float64)" for name in RULES)
+    return f"""
+        CREATE TABLE IF NOT EXISTS {SKU_UNITS_TABLE} (
+            `sku` String,
+            `market` String,
+            {columns},
+            `rules_version` UInt32,
+            `parsed_at` DateTime DEFAULT now()
+        )
+        ENGINE = ReplacingMergeTree(rules_version)
+        ORDER BY (market, sku)
+    """
+
+
+def add_column_statements():
+    # Rules added after the table was created
+    return [
+        f"ALTER TABLE {SKU_UNITS_TABLE} ADD COLUMN IF NOT EXISTS `{name}` Nullable(Float64)"
+        for name in RULES
+    ]
+
+
+def sync_sku_units(client=None):
+    """
+    Parses every grocery (sku, market) pair not yet in the lookup table under
+    the current RULES_VERSION and inserts the results.
+
+    Returns:
+        int: Number of pairs parsed.
+    """
+    client = client or get_clickhouse_client()
+    client.command(create_statement())
+    for statement in add_column_statements():
+        client.command(statement)
+
+    pending = client.query_df(
+        f"""
+        SELECT DISTINCT sku, market
+        FROM default.input_raw_products
+        WHERE main_category = 'groceries'
+            AND (sku, market) NOT IN (
+                SELECT sku, market FROM {SKU_UNITS_TABLE} FINAL
+                WHERE rules_version = {{rules_version:UInt32}}
+            )
+        """,
+        parameters={"rules_version": RULES_VERSION},
+    )
+    if pending.empty:
+        return 0
+
+    parsed = parse_skus(pending)
+    columns = ["sku", "market", *RULES, "rules_version"]
+    for start in range(0, len(parsed), INSERT_BATCH_ROWS):
+        batch = parsed.iloc[start:start + INSERT_BATCH_ROWS][columns]
+        # NaN -> NULL for the Nullable columns
+        batch = batch.astype(object).where(batch.notna(), None)
+        client.insert_df(SKU_UNITS_TABLE, batch)
+    return len(parsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--print", action="store_true", help="print the table DDL without executing it")
+    args = parser.parse_args()
+
+    if args.print:
+        print(create_statement().strip() + ";")
+        return
+    print(f"🔧 {SKU_UNITS_TABLE}: parsed {sync_sku_units()} new (sku, market) pairs")
+
+
+if __name__ == "__main__":
+    main()
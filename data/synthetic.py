@@ -0,0 +1,222 @@
+"""
+Synthetic, schema-faithful results for every memoized query in data.queries,
+for finding how pages scale with data volume.
+
+Each generator returns a frame with the columns and dtypes its query returns,
+about the production size at scale=1. The scale factor multiplies the
+dimension that grows in production: dates for daily and weekly series,
+industries for the per-industry fundamentals, tickers for the telecom
+comparison, years for the Wilshire series. Values are seeded random walks, so
+the same (scale, seed) always gives the same frames.
+
+seed_cache(scale) writes them into the query cache, so pages, the embed API
+and the data API run unchanged on top of them without ClickHouse:
+    with app.server.app_context():
+        seed_cache(scale=100)
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .grocery import GROCERY_SCHEMA, PRODUCTS
+from .result_schema import apply_schema
+
+DEFAULT_SEED = 0
+
+# Longest series generated, pandas timestamps end in 2262 anyway; beyond it a
+# larger scale no longer adds dates
+MAX_SPAN_DAYS = 200 * 365
+
+INDUSTRIES = [
+    "Industrial Applications and Services",
+    "Energy & Transportation",
+    "Real Estate & Construction",
+    "Trade & Services",
+    "Life Sciences",
+    "Technology",
+    "Manufacturing",
+    "Finance",
+    "Crypto Assets",
+]
+
+
+def _dates(base_days, scale, freq_days=1, end=None):
+    # Midnights freq_days apart, like the DATE columns they stand in for; the
+    # last is today (or end), going back base_days * scale days
+    span_days = min(base_days * scale, MAX_SPAN_DAYS)
+    periods = max(int(span_days / freq_days), 2)
+    end = pd.Timestamp(end or date.today()).normalize()
+    return pd.date_range(end=end, periods=periods, freq=f"{freq_days}D")
+
+
+def _walk(rng, n, start, volatility, floor=None):
+    values = start + np.cumsum(rng.normal(0, volatility, n))
+    return values if floor is None else np.maximum(values, floor)
+
+
+def _industries(scale):
+    extra = int(len(INDUSTRIES) * (scale - 1))
+    return INDUSTRIES + [f"Synthetic Industry {i + 1}" for i in range(extra)]
+
+
+def _years(base_years, scale, last=None):
+    last = last or date.today().year
+    return np.arange(last - int(base_years * scale) + 1, last + 1)
+
+
+def inflation_data(scale, rng):
+    dates = _dates(16 * 365, scale)
+    n = len(dates)
+    bond = _walk(rng, n, 1.5, 0.03)
+    tips = _walk(rng, n, -0.2, 0.03)
+    us_breakeven = _walk(rng, n, 2.2, 0.02)
+    us_ten_year = _walk(rng, n, 3.0, 0.03, floor=0.1)
+    return pd.DataFrame({
+        "date": dates,
+        "interpolated_german_breakeven_inflation": bond - tips,
+        "us_breakeven_inflation": us_breakeven,
+        "us_implied_tips": us_ten_year - us_breakeven,
+        "eur_usd_fx": _walk(rng, n, 1.1, 0.004, floor=0.5),
+        "interpolated_yield_bond": bond,
+        "interpolated_yield_tips": tips,
+        "us_ten_year_interest": us_ten_year,
+        "breakeven_inflation_spread": bond - tips - us_breakeven,
+        "real_return_spread": tips - (us_ten_year - us_breakeven),
+    })
+
+
+def net_income_to_wilshire(scale, rng):
+    years = _years(19, scale)
+    n = len(years)
+    return pd.DataFrame({
+        "year": years,
+        "total_net_income": np.abs(_walk(rng, n, 1.2e12, 8e10)),
+        "avg_price": np.abs(_walk(rng, n, 20000, 1500)) + 1000,
+    })
+
+
+def telecom_interest_sensitive_stock(scale, rng):
+    dates = _dates(365, 1)
+    tickers = ["T", "VZ", "CCOI", "SP500"] + [f"TEL{i + 1}" for i in range(int(4 * (scale - 1)))]
+    rates = _walk(rng, len(dates), 4.5, 0.03, floor=0.1)
+    frames = [
+        pd.DataFrame({
+            "date": dates,
+            "interest_rates": rates,
+            "ticker": ticker,
+            "cumulative_gain": np.cumsum(rng.normal(0, 1.2, len(dates))),
+        })
+        for ticker in tickers
+    ]
+    return pd.concat(frames, ignore_index=True).sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def _per_industry(years, industries, rng, columns):
+    grid = pd.MultiIndex.from_product([years, industries], names=["year", "category"]).to_frame(index=False)
+    for name, (mean, std) in columns.items():
+        grid[name] = rng.normal(mean, std, len(grid))
+    return grid
+
+
+def cash_flow_tax_us_companies(scale, rng):
+    df = _per_industry(_years(18, 1), _industries(scale), rng, {
+        "taxes_paid": (2e10, 5e9),
+        "cash_flow": (1.5e11, 3e10),
+    })
+    df["tax_rate"] = df["taxes_paid"] / df["cash_flow"]
+    return df
+
+
+def capital_expenditure_by_industry(scale, rng):
+    df = _per_industry(_years(16, 1), _industries(scale), rng, {
+        "capital_expenditure": (5e10, 1e10),
+        "cumulative_inflation_adjustment": (0.3, 0.1),
+    })
+    df["inflation_adjusted_capital_expenditure"] = df["capital_expenditure"] / (1 + df["cumulative_inflation_adjustment"])
+    return df[["year", "category", "capital_expenditure", "inflation_adjusted_capital_expenditure",
+               "cumulative_inflation_adjustment"]]
+
+
+def debt_free_cash_flow_by_industry(scale, rng):
+    df = _per_industry(_years(16, 1), _industries(scale), rng, {
+        "free_cash_flow": (4e10, 1e10),
+        "long_term_debt": (3e11, 5e10),
+    })
+    df["free_cash_flow_to_long_term_debt"] = df["free_cash_flow"] / df["long_term_debt"]
+    df["insert_date"] = pd.Timestamp(date.today())
+    return df
+
+
+def commitment_of_traders(scale, rng):
+    from .queries import COT_SCHEMA
+
+    weeks = _dates(15 * 365, scale, freq_days=7)
+    n = len(weeks)
+    df = pd.DataFrame({
+        "dt": weeks,
+        "close": _walk(rng, n, 1.1, 0.01, floor=0.5),
+        "key": 1,
+        "market_and_exchange_names": "EURO FX - CHICAGO MERCANTILE EXCHANGE",
+        "report_date": weeks - pd.Timedelta(days=5),
+        "df": weeks,
+    })
+    for group, size in [("dealer", 4e4), ("asset_mgr", 2e5), ("lev_money", 8e4)]:
+        df[f"{group}_positions_long_all"] = np.abs(_walk(rng, n, size, size * 0.02)) + 1
+        df[f"{group}_positions_short_all"] = np.abs(_walk(rng, n, size, size * 0.02)) + 1
+    return apply_schema(df, COT_SCHEMA)
+
+
+def philippine_grocery_prices(scale, rng):
+    dates = _dates(520, scale)
+    grid = pd.MultiIndex.from_product([dates, sorted(PRODUCTS)], names=["date", "product"]).to_frame(index=False)
+    n = len(grid)
+    grid["mean_price"] = np.abs(rng.normal(100, 20, n)) + 1
+    grid["median_price"] = grid["mean_price"] * rng.normal(1, 0.05, n)
+    grid["sampled_skus"] = rng.integers(5, 40 * max(int(scale), 1), n)
+    return apply_schema(grid, GROCERY_SCHEMA)
+
+
+# Query function name -> generator(scale, rng)
+GENERATORS = {
+    "fetch_inflation_data": inflation_data,
+    "fetch_coporate_america_net_income_to_wilshire": net_income_to_wilshire,
+    "fetch_telecom_interest_sensitive_stock": telecom_interest_sensitive_stock,
+    "get_cash_flow_tax_us_companies": cash_flow_tax_us_companies,
+    "fetch_capital_expenditure_by_industry": capital_expenditure_by_industry,
+    "fetch_debt_free_cash_flow_by_industry": debt_free_cash_flow_by_industry,
+    "fetch_commitment_of_traders": commitment_of_traders,
+    "fetch_philippine_grocery_prices": philippine_grocery_prices,
+}
+
+
+def synthetic_frame(name, scale=1, seed=DEFAULT_SEED):
+    """
+    Synthetic result of the query function called name.
+    """
+    if scale <= 0:
+        raise ValueError(f"scale must be positive, got {scale}")
+    return GENERATORS[name](scale, np.random.default_rng(seed))
+
+
+def seed_cache(scale=1, seed=DEFAULT_SEED, funcs=None):
+    """
+    Stores a synthetic result for every memoized query (or funcs) in the
+    query cache, as a refresh would. Needs an app context.
+
+    Returns:
+        dict: Query function name -> rows stored.
+    """
+    from .refresh import memoized_queries
+
+    funcs = memoized_queries() if funcs is None else funcs
+    missing = [func.__name__ for func in funcs if func.__name__ not in GENERATORS]
+    if missing:
+        raise KeyError(f"No synthetic generator for {', '.join(missing)}")
+
+    rows = {}
+    for func in funcs:
+        frame = synthetic_frame(func.__name__, scale, seed)
+        func.store(frame)
+        rows[func.__name__] = len(frame)
+    return rows
@@ -0,0 +1,163 @@
+"""
+Per-worker store of built page layouts and figures, one per data version.
+
+A page's layout() runs its queries, builds and validates the Plotly figure
+and lets themed_card set title and margins. get_layout does that once per
+data version and keeps the result, with its figures frozen to plain dicts
+(see utils.figures.freeze_figures), for every later navigation and embed.
+Component trees don't pickle cheaply, so unlike the embed snapshots they
+stay in process memory; a refresh bumps the data version and the next
+request rebuilds.
+
+get_figure does the same for the figure alone, through the page contract
+(see pages.registry), for the embed API that needs no Dash components.
+
+Graphs a page gives a detail_graph_id ship at screen resolution: the layout
+keeps a utils.downsample.DetailFigure of the full-resolution figure and
+shows its overview, and get_detail_figure serves a zoomed window from it
+(see the relayoutData callback in app.py).
+
+Figures are stored with their numeric and date arrays as base64 typed
+arrays (see utils.figures.encode_typed_arrays), for Dash and the embed API
+alike.
+
+The stored layouts and figures are shared between requests and must be
+treated as read-only.
+"""
+import threading
+
+from cache import get_data_version
+from theme import decorate_figure
+from utils.downsample import DetailFigure
+from utils.figures import encode_typed_arrays, freeze_figures, iter_graphs
+
+DETAIL_GRAPH = "detail-graph"
+DOWNLOAD = "download"
+DOWNLOAD_BUTTON = "download-btn"
+
+_layouts = {}
+_figures = {}
+_details = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(key):
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _cached(store, pathname, build):
+    version = get_data_version()
+    cached = store.get(pathname)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _lock_for((id(store), pathname)):
+        cached = store.get(pathname)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        value = build()
+        store[pathname] = (version, value)
+        return value
+
+
+def detail_graph_id(page):
+    """
+    Pattern-matching id for a page's dcc.Graph that reloads full-resolution
+    points for the zoomed range. page is the page module's __name__.
+    """
+    return {"type": DETAIL_GRAPH, "page": page}
+
+
+def download_id(page):
+    """
+    Pattern-matching id for a page's dcc.Download. page is the page module's
+    __name__; app.download_page_csv fills it from the page's download_csv().
+    """
+    return {"type": DOWNLOAD, "page": page}
+
+
+def download_button_id(page):
+    """
+    Pattern-matching id for the button that triggers a page's download.
+    """
+    return {"type": DOWNLOAD_BUTTON, "page": page}
+
+
+def _is_detail_graph(graph):
+    graph_id = getattr(graph, "id", None)
+    return isinstance(graph_id, dict) and graph_id.get("type") == DETAIL_GRAPH
+
+
+def _build_layout(pathname, build):
+    # A rebuild replaces the page's detail figure of the older data version,
+    # also when the new layout has none
+    _details.pop(pathname, None)
+    version = get_data_version()
+    layout = freeze_figures(build())
+    for graph in iter_graphs(layout):
+        if not isinstance(graph.figure, dict):
+            continue
+        if _is_detail_graph(graph):
+            detail = DetailFigure(graph.figure)
+            if detail.reducible:
+                _details[pathname] = (version, detail)
+                graph.figure = detail.overview()
+        graph.figure = encode_typed_arrays(graph.figure)
+    return layout
+
+
+def get_layout(pathname, build):
+    """
+    Returns the layout of pathname at the current data version, building it
+    with build() on first use. Concurrent requests for the same page in this
+    worker wait for one build.
+
+    Args:
+        pathname (str): Key in PAGE_LAYOUTS.
+        build (callable): The page's layout().
+    """
+    return _cached(_layouts, pathname, lambda: _build_layout(pathname, build))
+
+
+def get_figure(pathname, module):
+    """
+    Returns the decorated figure of pathname at the current data version as
+    a plain dict, built from the page's figure() and get_meta_data() title
+    and description without any Dash components.
+
+    Args:
+        pathname (str): Key in PAGE_LAYOUTS.
+        module: The page module.
+    """
+    def build():
+        meta = module.get_meta_data()
+        fig = decorate_figure(module.figure(), meta.get("title"), meta.get("description"))
+        return encode_typed_arrays(fig.to_plotly_json())
+    return _cached(_figures, pathname, build)
+
+
+def get_detail_figure(pathname, build, x0=None, x1=None):
+    """
+    Returns the figure of pathname's detail graph for the x range [x0, x1]
+    (the overview when both are None) at the current data version, or None
+    if the page has no detail graph or nothing in it to reduce.
+
+    Args:
+        pathname (str): Key in PAGE_LAYOUTS.
+        build (callable): The page's layout().
+        x0, x1: Plotly x axis values (numbers or date strings).
+    """
+    # The full-resolution figure is kept with the layout it was built for
+    get_layout(pathname, build)
+    cached = _details.get(pathname)
+    if cached is None or cached[0] != get_data_version():
+        return None
+    return encode_typed_arrays(cached[1].window(x0, x1))
+
+
+def clear_layouts():
+    _layouts.clear()
+    _figures.clear()
+    _details.clear()
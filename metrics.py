@@ -0,0 +1,190 @@
+"""
+Per-query instrumentation for the functions in data.queries.
+
+Counters live in the worker process that served the work; every worker exposes
+its own on /metrics (Prometheus text) and /metrics.json, labelled with its pid.
+The outcome of the last cache refresh is also kept in the shared cache, so any
+worker can report it.
+"""
+import functools
+import os
+import threading
+import time
+
+METRIC_PREFIX = "dashboard"
+LAST_REFRESH_KEY = "metrics:last_refresh"
+
+_lock = threading.Lock()
+_stats = {}
+_local = threading.local()
+
+
+def _new_stats():
+    return {
+        "calls": 0,
+        "errors": 0,
+        "duration_s_sum": 0.0,
+        "duration_s_max": 0.0,
+        "last_duration_s": None,
+        "read_rows": 0,
+        "read_bytes": 0,
+        "result_rows": None,
+        "result_bytes": None,
+        "cache": {"hit": 0, "miss": 0, "stale": 0, "superset": 0},
+        "refresh": {"ok": 0, "failed": 0},
+    }
+
+
+def _stats_for(name):
+    # Callers hold _lock
+    if name not in _stats:
+        _stats[name] = _new_stats()
+    return _stats[name]
+
+
+def _result_size(result):
+    if hasattr(result, "memory_usage"):
+        return len(result), int(result.memory_usage(index=True, deep=True).sum())
+    if hasattr(result, "__len__"):
+        return len(result), None
+    return None, None
+
+
+def record_clickhouse_summary(summary):
+    """
+    Adds the read_rows/read_bytes of a ClickHouse query summary to the query
+    function currently running in this thread, if any.
+    """
+    totals = getattr(_local, "totals", None)
+    if totals is None or not summary:
+        return
+    totals["read_rows"] += int(summary.get("read_rows", 0) or 0)
+    totals["read_bytes"] += int(summary.get("read_bytes", 0) or 0)
+
+
+def record_cache(name, outcome):
+    """
+    outcome: 'hit', 'miss', 'stale' or 'superset' (a date range sliced
+    out of a wider cached result, see data.ranges).
+    """
+    with _lock:
+        _stats_for(name)["cache"][outcome] += 1
+
+
+def record_refresh(name, status):
+    with _lock:
+        _stats_for(name)["refresh"]["ok" if status == "ok" else "failed"] += 1
+
+
+def instrumented(func):
+    """
+    Records wall time, ClickHouse rows/bytes read, result rows and memory and
+    errors of every run of a query function. Goes under @memoize_swr(), so
+    only real computations are measured, cache hits are counted separately.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        outer = getattr(_local, "totals", None)
+        _local.totals = totals = {"read_rows": 0, "read_bytes": 0}
+        start = time.perf_counter()
+        failed = False
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except Exception:
+            failed = True
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            _local.totals = outer
+            rows, nbytes = (None, None) if failed else _result_size(result)
+            with _lock:
+                stats = _stats_for(func.__name__)
+                stats["calls"] += 1
+                stats["errors"] += int(failed)
+                stats["duration_s_sum"] += duration
+                stats["duration_s_max"] = max(stats["duration_s_max"], duration)
+                stats["last_duration_s"] = round(duration, 4)
+                stats["read_rows"] += totals["read_rows"]
+                stats["read_bytes"] += totals["read_bytes"]
+                if not failed:
+                    stats["result_rows"] = rows
+                    stats["result_bytes"] = nbytes
+    return wrapper
+
+
+def summary():
+    """
+    JSON-ready copy of every counter of this worker.
+    """
+    with _lock:
+        queries = {
+            name: dict(stats, cache=dict(stats["cache"]), refresh=dict(stats["refresh"]))
+            for name, stats in sorted(_stats.items())
+        }
+    return {"pid": os.getpid(), "queries": queries}
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(data=None):
+    """
+    Renders summary() in the Prometheus text exposition format (0.0.4).
+    """
+    data = data or summary()
+    pid = data["pid"]
+    families = [
+        ("query_calls_total", "counter", "Computations of the query function", lambda s: [({}, s["calls"])]),
+        ("query_errors_total", "counter", "Computations that raised", lambda s: [({}, s["errors"])]),
+        ("query_duration_seconds_sum", "counter", "Total wall time of the computations", lambda s: [({}, s["duration_s_sum"])]),
+        ("query_duration_seconds_max", "gauge", "Slowest computation", lambda s: [({}, s["duration_s_max"])]),
+        ("query_last_duration_seconds", "gauge", "Wall time of the last computation", lambda s: [({}, s["last_duration_s"])]),
+        ("clickhouse_read_rows_total", "counter", "Rows read by ClickHouse", lambda s: [({}, s["read_rows"])]),
+        ("clickhouse_read_bytes_total", "counter", "Bytes read by ClickHouse", lambda s: [({}, s["read_bytes"])]),
+        ("query_result_rows", "gauge", "Rows of the last result", lambda s: [({}, s["result_rows"])]),
+        ("query_result_bytes", "gauge", "In-memory size of the last result", lambda s: [({}, s["result_bytes"])]),
+        ("query_cache_requests_total", "counter", "Memoized lookups by outcome",
+         lambda s: [({"outcome": k}, v) for k, v in s["cache"].items()]),
+        ("query_refresh_total", "counter", "Cache refreshes by status",
+         lambda s: [({"status": k}, v) for k, v in s["refresh"].items()]),
+    ]
+
+    lines = []
+    for metric, kind, help_text, samples in families:
+        name = f"{METRIC_PREFIX}_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for query, stats in data["queries"].items():
+            for labels, value in samples(stats):
+                if value is None:
+                    continue
+                labels = {"query": query, "pid": pid, **labels}
+                rendered = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{rendered}}} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def refresh_metrics_text(report):
+    """
+    Prometheus lines for the last refresh report (see data.refresh.refresh_all).
+    """
+    if not report:
+        return ""
+    name = f"{METRIC_PREFIX}_last_refresh"
+    lines = [
+        f"# HELP {name}_duration_seconds Wall time of the last cache refresh",
+        f"# TYPE {name}_duration_seconds gauge",
+        f"{name}_duration_seconds {report['duration_s']}",
+        f"# HELP {name}_failed_queries Queries that failed in the last cache refresh",
+        f"# TYPE {name}_failed_queries gauge",
+        f"{name}_failed_queries {len(report['failed'])}",
+        f"# HELP {name}_query_duration_seconds Per-query wall time in the last cache refresh",
+        f"# TYPE {name}_query_duration_seconds gauge",
+    ]
+    for entry in report["queries"]:
+        labels = f'query="{_escape_label(entry["name"])}",status="{entry["status"]}"'
+        lines.append(f"{name}_query_duration_seconds{{{labels}}} {entry['duration_s']}")
+    return "\n".join(lines) + "\n"
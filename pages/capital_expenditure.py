@@ -1,29 +1,39 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.express as px
 from data.queries import fetch_capital_expenditure_by_industry
+from data.derived import derived, sort_by, where, assign, map_values
 import plotly.graph_objects as go
 from dash.dcc import send_data_frame
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 
-def layout():
-    df = fetch_capital_expenditure_by_industry()
-    df = df.sort_values(by=['year', 'category'])
+TITLE = "Inflation-Adjusted Capital Expenditures"
+DESCRIPTION = "Industry-level capital expenditure trends adjusted for inflation, measured in billions."
+
+SHORT_NAMES = {
+    'Industrial Applications and Services': 'Industrial',
+    'Energy & Transportation': 'Energy/Transport',
+    'Real Estate & Construction': 'Real Estate',
+    'Trade & Services': 'Trade',
+    'Life Sciences': 'LifeSci',
+    'Technology': 'Tech',
+    'Manufacturing': 'Mfg',
+    'Finance': 'Finance'
+}
+
+# Shared by the chart, the CSV download and the data API
+CAPEX_BY_INDUSTRY = derived(
+    "capital-expenditure",
+    fetch_capital_expenditure_by_industry,
+    sort_by('year', 'category'),
+    where(lambda df: (df['year'] >= 2010) & (df['category'] != 'Crypto Assets')),
+    assign(capital_expenditure_b=lambda df: df['inflation_adjusted_capital_expenditure'] / 1e9),
+    map_values('category', SHORT_NAMES),
+)
 
-    # Filter and reshape
-    df = df[(df['year'] >= 2010) & (df['category'] != 'Crypto Assets')]
-    df['capital_expenditure_b'] = df['inflation_adjusted_capital_expenditure'] / 1e9  # now use inflation-adjusted!
 
-    rename_map = {
-        'Industrial Applications and Services': 'Industrial',
-        'Energy & Transportation': 'Energy/Transport',
-        'Real Estate & Construction': 'Real Estate',
-        'Trade & Services': 'Trade',
-        'Life Sciences': 'LifeSci',
-        'Technology': 'Tech',
-        'Manufacturing': 'Mfg',
-        'Finance': 'Finance'
-    }
-    df['category'] = df['category'].map(rename_map).fillna(df['category'])
+def figure():
+    df = CAPEX_BY_INDUSTRY()
 
     # Create line figure
     fig = px.line(
@@ -43,9 +53,14 @@ def layout():
         **CHART_TEMPLATE,
     )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Inflation-Adjusted Capital Expenditures",
-        description="Industry-level capital expenditure trends adjusted for inflation, measured in billions.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="inflation-adjusted-capex-graph",
@@ -55,7 +70,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-btn-inflation-adjusted-capex",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -69,33 +84,13 @@ def layout():
                         "boxShadow": "0 2px 6px rgba(255,204,0,.45)"
                     }
                 ),
-                dcc.Download(id="download-inflation-adjusted-capex")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
-@callback(
-    Output("download-inflation-adjusted-capex", "data"),
-    Input("download-btn-inflation-adjusted-capex", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_inflation_adjusted_capex_data(n_clicks):
-    df = fetch_capital_expenditure_by_industry()
-    df = df.sort_values(by=['year', 'category'])
-    df = df[(df['year'] >= 2010) & (df['category'] != 'Crypto Assets')]
-
-    rename_map = {
-        'Industrial Applications and Services': 'Industrial',
-        'Energy & Transportation': 'Energy/Transport',
-        'Real Estate & Construction': 'Real Estate',
-        'Trade & Services': 'Trade',
-        'Life Sciences': 'LifeSci',
-        'Technology': 'Tech',
-        'Manufacturing': 'Mfg',
-        'Finance': 'Finance'
-    }
-    df['category'] = df['category'].map(rename_map).fillna(df['category'])
-
+def download_csv():
+    df = CAPEX_BY_INDUSTRY()
     return send_data_frame(
         df.to_csv,
         "inflation_adjusted_capital_expenditure_data.csv",
@@ -103,17 +98,12 @@ def download_inflation_adjusted_capex_data(n_clicks):
     )
 
 def get_data():
-    df = fetch_capital_expenditure_by_industry()
-    df = df.sort_values(by=['year', 'category'])
-
-    # Filter and reshape
-    df = df[(df['year'] >= 2010) & (df['category'] != 'Crypto Assets')]
-    df['capital_expenditure_b'] = df['inflation_adjusted_capital_expenditure'] / 1e9  
-    return df
-
+    return CAPEX_BY_INDUSTRY()
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "United States" },
         ]
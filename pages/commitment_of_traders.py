@@ -1,39 +1,40 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 
 from data.queries import fetch_commitment_of_traders
+from data.derived import derived, sort_by, assign
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 
+TITLE = "EUR/USD — COT Net Positions"
+DESCRIPTION = "EUR/USD close price with normalized net positions by trader category (CFTC COT data)."
 
-def layout():
-    df = fetch_commitment_of_traders().copy()
-    df = df.sort_values("report_date")
-
-    df["dealer_net_position"] = (
-        df["dealer_positions_long_all"].astype(float)
-        - df["dealer_positions_short_all"].astype(float)
-    ) / (
-        df["dealer_positions_long_all"].astype(float)
-        + df["dealer_positions_short_all"].astype(float)
-    )
 
-    df["asset_mgr_net_position"] = (
-        df["asset_mgr_positions_long_all"].astype(float)
-        - df["asset_mgr_positions_short_all"].astype(float)
-    ) / (
-        df["asset_mgr_positions_long_all"].astype(float)
-        + df["asset_mgr_positions_short_all"].astype(float)
-    )
+def _net_position(group):
+    # (long - short) / (long + short), in [-1, 1]
+    def compute(df):
+        long, short = df[f"{group}_positions_long_all"], df[f"{group}_positions_short_all"]
+        return (long - short) / (long + short)
+    return compute
 
-    df["lev_money_net_position"] = (
-        df["lev_money_positions_long_all"].astype(float)
-        - df["lev_money_positions_short_all"].astype(float)
-    ) / (
-        df["lev_money_positions_long_all"].astype(float)
-        + df["lev_money_positions_short_all"].astype(float)
-    )
+
+# Shared by the chart, the CSV download and the data API
+NET_POSITIONS = derived(
+    "commitment-of-traders",
+    fetch_commitment_of_traders,
+    sort_by("report_date"),
+    assign(
+        dealer_net_position=_net_position("dealer"),
+        asset_mgr_net_position=_net_position("asset_mgr"),
+        lev_money_net_position=_net_position("lev_money"),
+    ),
+)
+
+
+def figure():
+    df = NET_POSITIONS()
 
     dimensions = [
         ("asset_mgr_net_position", "Asset Manager Net Position"),
@@ -102,9 +103,14 @@ def layout():
             secondary_y=True,
         )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="EUR/USD — COT Net Positions",
-        description="EUR/USD close price with normalized net positions by trader category (CFTC COT data).",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="cot-net-positions",
@@ -114,7 +120,7 @@ def layout():
                 [
                     html.Button(
                         "Download CSV",
-                        id="download-btn-cot-positions",
+                        id=download_button_id(__name__),
                         n_clicks=0,
                         style={
                             "backgroundColor": THEME_COLORS["primary"],
@@ -128,7 +134,7 @@ def layout():
                             "boxShadow": "0 1px 3px rgba(0,0,0,0.1)",
                         },
                     ),
-                    dcc.Download(id="download-cot-positions"),
+                    dcc.Download(id=download_id(__name__)),
                 ],
                 style={"textAlign": "right", "marginTop": "12px"},
             ),
@@ -136,39 +142,19 @@ def layout():
     )
 
 
+def download_csv():
+    df = NET_POSITIONS()
+    return dcc.send_data_frame(df.to_csv, "eur_usd_cot_net_positions.csv", index=False)
 
-def get_data():
-    df = fetch_commitment_of_traders().copy()
-
-    df["dealer_net_position"] = (
-        df["dealer_positions_long_all"].astype(float)
-        - df["dealer_positions_short_all"].astype(float)
-    ) / (
-        df["dealer_positions_long_all"].astype(float)
-        + df["dealer_positions_short_all"].astype(float)
-    )
-
-    df["asset_mgr_net_position"] = (
-        df["asset_mgr_positions_long_all"].astype(float)
-        - df["asset_mgr_positions_short_all"].astype(float)
-    ) / (
-        df["asset_mgr_positions_long_all"].astype(float)
-        + df["asset_mgr_positions_short_all"].astype(float)
-    )
-
-    df["lev_money_net_position"] = (
-        df["lev_money_positions_long_all"].astype(float)
-        - df["lev_money_positions_short_all"].astype(float)
-    ) / (
-        df["lev_money_positions_long_all"].astype(float)
-        + df["lev_money_positions_short_all"].astype(float)
-    )
 
-    return df
+def get_data():
+    return NET_POSITIONS()
 
 
 def get_meta_data():
     return {
+        "title": TITLE,
+        "description": DESCRIPTION,
         "spatial_coverage": [
             {"@type": "Place", "name": "Euro Area / United States"}
         ],
@@ -1,17 +1,19 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
 from data.queries import fetch_commitment_of_traders
+from data.derived import derived, sort_by
 from utils.utility import getBinsFromTrend
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 
+TITLE = "EUR/USD — COT Trend Signal"
+DESCRIPTION = "EUR/USD close prices colored by t-values from rolling linear trend detection."
 
-def layout():
-    df = fetch_commitment_of_traders().copy()
-    df = df.sort_values(by="df")
 
+def _trend_signal(df):
     _, t_values, _ = getBinsFromTrend(
         close=df["close"].values,
         span=(4, 12),
@@ -23,6 +25,21 @@ def layout():
     df = df.dropna(subset=["t_value"])
 
     df["signal_label"] = np.where(df["t_value"] >= 0, "Long", "Short")
+    return df
+
+
+# getBinsFromTrend fits a regression per window and point; run it once per
+# data version for the chart, the CSV download and the data API
+COT_TREND = derived(
+    "commitment-of-traders-trend",
+    fetch_commitment_of_traders,
+    sort_by("df"),
+    _trend_signal,
+)
+
+
+def figure():
+    df = COT_TREND()
 
     fig = go.Figure()
 
@@ -60,9 +77,14 @@ def layout():
         autosize=True
     )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="EUR/USD — COT Trend Signal",
-        description="EUR/USD close prices colored by t-values from rolling linear trend detection.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="eur-usd-cot-trend",
@@ -72,7 +94,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-btn-cot",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -86,27 +108,25 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-cot")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
 
+def download_csv():
+    df = COT_TREND()
+    return dcc.send_data_frame(df.to_csv, "eur_usd_cot_trend_signal.csv", index=False)
+
+
 def get_data():
-    df = fetch_commitment_of_traders().copy()
-    _, t_values, _ = getBinsFromTrend(
-        close=df["close"].values,
-        span=(4, 12),
-        threshold=0,
-        slope_threshold=0
-    )
-    df["t_value"] = t_values
-    df = df.dropna(subset=["t_value"])
-    return df
+    return COT_TREND()
 
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res["spatial_coverage"] = [
         {"@type": "Place", "name": "Euro Area / United States"}
     ]
@@ -1,28 +1,39 @@
-from dash import html, dcc, callback, Input, Output
+from dash import html, dcc
 import plotly.express as px
 from data.queries import fetch_debt_free_cash_flow_by_industry
+from data.derived import derived, sort_by, where, map_values
 from dash.dcc import send_data_frame
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 
-def layout():
-    # Fetch and prepare data
-    df = fetch_debt_free_cash_flow_by_industry()
-    df = df.sort_values(by=['year', 'category'])
-    df = df[(df['year'] >= 2010) & (df['category'] != 'Crypto Assets')]
-
-    rename_map = {
-        'Industrial Applications and Services': 'Industrial',
-        'Energy & Transportation': 'Energy/Transport',
-        'Real Estate & Construction': 'Real Estate',
-        'Trade & Services': 'Trade',
-        'Life Sciences': 'LifeSci',
-        'Technology': 'Tech',
-        'Manufacturing': 'Mfg',
-        'Finance': 'Finance'
-    }
-    df['category'] = df['category'].map(rename_map).fillna(df['category'])
+TITLE = "Free Cash Flow to Long‑Term Debt Ratio by Industry"
+DESCRIPTION = "Industry comparison of Free Cash Flow relative to long‑term debt, highlighting sectoral leverage trends."
+
+SHORT_NAMES = {
+    'Industrial Applications and Services': 'Industrial',
+    'Energy & Transportation': 'Energy/Transport',
+    'Real Estate & Construction': 'Real Estate',
+    'Trade & Services': 'Trade',
+    'Life Sciences': 'LifeSci',
+    'Technology': 'Tech',
+    'Manufacturing': 'Mfg',
+    'Finance': 'Finance'
+}
+
+# Shared by the chart, the CSV download and the data API
+FCF_TO_DEBT = derived(
+    "free-cash-flow-to-debt",
+    fetch_debt_free_cash_flow_by_industry,
+    sort_by('year', 'category'),
+    where(lambda df: (df['year'] >= 2010) & (df['category'] != 'Crypto Assets')),
+    map_values('category', SHORT_NAMES),
+)
+
+
+def figure():
+    df = FCF_TO_DEBT()
 
     industries = sorted(df['category'].unique())
     n_industries = len(industries)
@@ -74,44 +85,30 @@ def layout():
     for i in range(1, n_industries + 1):
         fig.update_xaxes(title_text="Year", row=i, col=1)
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Free Cash Flow to Long‑Term Debt Ratio by Industry",
-        description="Industry comparison of Free Cash Flow relative to long‑term debt, highlighting sectoral leverage trends.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(id="fcf-to-debt-ratio-graph", figure=fig),
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-btn-fcf-debt",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     className="black-button"
                 ),
-                dcc.Download(id="download-fcf-debt")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "center", "marginTop": "10px"})
         ]
     )
 
-@callback(
-    Output("download-fcf-debt", "data"),
-    Input("download-btn-fcf-debt", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_fcf_debt_data(n_clicks):
-    df = fetch_debt_free_cash_flow_by_industry()
-    df = df[(df['year'] >= 2010) & (df['category'] != 'Crypto Assets')]
-
-    rename_map = {
-        'Industrial Applications and Services': 'Industrial',
-        'Energy & Transportation': 'Energy/Transport',
-        'Real Estate & Construction': 'Real Estate',
-        'Trade & Services': 'Trade',
-        'Life Sciences': 'LifeSci',
-        'Technology': 'Tech',
-        'Manufacturing': 'Mfg',
-        'Finance': 'Finance'
-    }
-    df['category'] = df['category'].map(rename_map).fillna(df['category'])
-
+def download_csv():
+    df = FCF_TO_DEBT()
     return send_data_frame(
         df.to_csv,
         "free_cash_flow_to_long_term_debt_by_industry.csv",
@@ -119,24 +116,12 @@ def download_fcf_debt_data(n_clicks):
     )
 
 def get_data():
-    df = fetch_debt_free_cash_flow_by_industry()
-    df = df[(df['year'] >= 2010) & (df['category'] != 'Crypto Assets')]
-
-    rename_map = {
-        'Industrial Applications and Services': 'Industrial',
-        'Energy & Transportation': 'Energy/Transport',
-        'Real Estate & Construction': 'Real Estate',
-        'Trade & Services': 'Trade',
-        'Life Sciences': 'LifeSci',
-        'Technology': 'Tech',
-        'Manufacturing': 'Mfg',
-        'Finance': 'Finance'
-    }
-    df['category'] = df['category'].map(rename_map).fillna(df['category'])
-    return df
+    return FCF_TO_DEBT()
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "United States" },
         ]
@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 from data.queries import fetch_inflation_data
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import detail_graph_id, download_button_id, download_id
 
-def layout():
+TITLE = "German 10-Year Breakeven Inflation"
+DESCRIPTION = "Daily interpolated breakeven inflation for German 10-year bonds."
+
+
+def figure():
     df = fetch_inflation_data()
     df = df.sort_values(by='date')
 
@@ -25,19 +30,24 @@ def layout():
         autosize=True,
     )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="German 10-Year Breakeven Inflation",
-        description="Daily interpolated breakeven inflation for German 10-year bonds.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
-                id="german-breakeven-inflation-graph",
+                id=detail_graph_id(__name__),
                 figure=fig,
                 style={"height": "460px"}
             ),
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-btn",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -51,23 +61,18 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-breakeven-inflation-data")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
-@callback(
-    Output("download-breakeven-inflation-data", "data"),
-    Input("download-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_inflation_data(n_clicks):
+def download_csv():
     df = fetch_inflation_data()
     return dcc.send_data_frame(df[[ 'date', 'interpolated_german_breakeven_inflation']].to_csv, "german_breakeven_inflation.csv", index=False)
 
 
-def get_data():
-    df = fetch_inflation_data()
+def get_data(start=None, end=None):
+    df = fetch_inflation_data(start=start, end=end)
     df = df[[ 'date', 'interpolated_german_breakeven_inflation']]
     df = df.sort_values(by='date') 
     return df
@@ -75,6 +80,8 @@ def get_data():
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Germany" },
         ]
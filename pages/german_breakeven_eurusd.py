@@ -2,8 +2,13 @@ from dash import html, dcc
 from data.queries import fetch_inflation_data
 import plotly.graph_objects as go
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import detail_graph_id
 
-def layout():
+TITLE = "Eurozone–US Yield Spreads & EUR/USD"
+DESCRIPTION = "Breakeven and real yield spreads alongside EUR/USD."
+
+
+def figure():
     df = fetch_inflation_data()
 
     fig = go.Figure()
@@ -62,12 +67,17 @@ def layout():
 
     )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Eurozone–US Yield Spreads & EUR/USD",
-        description="Breakeven and real yield spreads alongside EUR/USD.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
-                id="interpolated-yield-bond",
+                id=detail_graph_id(__name__),
                 figure=fig
             )
         ]
@@ -76,6 +86,8 @@ def layout():
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Germany" },
         { "@type": "Place", "name": "United States" },
@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 from data.queries import fetch_inflation_data
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import detail_graph_id, download_button_id, download_id
 
-def layout():
+TITLE = "U.S. vs German 10-Year Bond Yields"
+DESCRIPTION = "Comparison of long-term interest rates between the U.S. and Germany."
+
+
+def figure():
     df = fetch_inflation_data()
     df = df[(df['us_ten_year_interest'] != 0)]
 
@@ -37,19 +42,24 @@ def layout():
         yaxis=dict(title="Yield (%)"),
         autosize=True,
     )
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="U.S. vs German 10-Year Bond Yields",
-        description="Comparison of long-term interest rates between the U.S. and Germany.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
-                id="bond-yields-comparison",
+                id=detail_graph_id(__name__),
                 figure=fig,
                 style={"height": "460px"}
             ),
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-btn-interest-rate-differential-eur-usd",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["button"],
@@ -63,17 +73,12 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-bonds-interest-rate-differential-eur-usd")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
-@callback(
-    Output("download-bonds-interest-rate-differential-eur-usd", "data"),
-    Input("download-btn-interest-rate-differential-eur-usd", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_inflation_data(n_clicks):
+def download_csv():
     df = fetch_inflation_data()
     df = df[(df['us_ten_year_interest'] != 0)]
     return dcc.send_data_frame(
@@ -87,8 +92,8 @@ def download_inflation_data(n_clicks):
         index=False
     )
 
-def get_data():
-    df = fetch_inflation_data()
+def get_data(start=None, end=None):
+    df = fetch_inflation_data(start=start, end=end)
     df = df[(df['us_ten_year_interest'] != 0)]
     df = df[['date', 'us_ten_year_interest', 'interpolated_yield_bond']]
     df = df.sort_values(by='date') 
@@ -97,6 +102,8 @@ def get_data():
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Germany" },
         { "@type": "Place", "name": "United States" },
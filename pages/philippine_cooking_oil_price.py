@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 from data.queries import philippine_cooking_oil
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 
-def layout():
+TITLE = "Philippine Cooking Oil Prices"
+DESCRIPTION = "Daily standardized cooking oil pricing across the Philippines."
+
+
+def figure():
     df = philippine_cooking_oil()
     df = df.sort_values(by='date')
 
@@ -52,9 +57,14 @@ def layout():
         ),
         autosize=True,  
     )
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-            title="Philippine Cooking Oil Prices",
-            description="Daily standardized cooking oil pricing across the Philippines.",
+            title=TITLE,
+            description=DESCRIPTION,
             children=[
                 dcc.Graph(
                     id="philippine-cooking-oil-price",
@@ -64,7 +74,7 @@ def layout():
                 html.Div([
                     html.Button(
                         "Download CSV",
-                        id="download-btn",
+                        id=download_button_id(__name__),
                         n_clicks=0,
                         style={
                             "backgroundColor": THEME_COLORS["primary"],
@@ -78,7 +88,7 @@ def layout():
                             "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                         }
                     ),
-                    dcc.Download(id="download-cooking-oil")
+                    dcc.Download(id=download_id(__name__))
                 ], style={"textAlign": "right", "marginTop": "12px"}),
 
                 html.P(
@@ -88,12 +98,7 @@ def layout():
             ]
         )
 
-@callback(
-    Output("download-cooking-oil", "data"),
-    Input("download-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_oil_data(n_clicks):
+def download_csv():
     df = philippine_cooking_oil()
     return dcc.send_data_frame(
         df[['date', 'mean_price', 'median_price', 'sampled_skus']].to_csv,
@@ -101,13 +106,15 @@ def download_oil_data(n_clicks):
         index=False
     )
 
-def get_data():
-    df = philippine_cooking_oil()
+def get_data(start=None, end=None):
+    df = philippine_cooking_oil(start=start, end=end)
     return df
 
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 from data.queries import philippine_detergent_powder
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 
-def layout():
+TITLE = "Philippine Detergent Powder Prices (2kg)"
+DESCRIPTION = "Daily standardized detergent powder pricing and SKU availability across the Philippines."
+
+
+def figure():
     df = philippine_detergent_powder()
     df = df.sort_values(by="date")
 
@@ -55,9 +60,14 @@ def layout():
         autosize=True
     )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-            title="Philippine Detergent Powder Prices (2kg)",
-            description="Daily standardized detergent powder pricing and SKU availability across the Philippines.",
+            title=TITLE,
+            description=DESCRIPTION,
             children=[
                 dcc.Graph(
                     id="ph-detergent-price",
@@ -67,7 +77,7 @@ def layout():
                 html.Div([
                     html.Button(
                         "Download CSV",
-                        id="download-detergent-btn",
+                        id=download_button_id(__name__),
                         n_clicks=0,
                         style={
                             "backgroundColor": THEME_COLORS["primary"],
@@ -81,17 +91,12 @@ def layout():
                             "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                         }
                     ),
-                    dcc.Download(id="download-detergent")
+                    dcc.Download(id=download_id(__name__))
                 ], style={"textAlign": "right", "marginTop": "12px"})
             ]
         )
 
-@callback(
-    Output("download-detergent", "data"),
-    Input("download-detergent-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_detergent_data(n_clicks):
+def download_csv():
     df = philippine_detergent_powder()
     return dcc.send_data_frame(
         df[["date", "mean_price", "median_price", "sampled_skus"]].to_csv,
@@ -99,13 +104,15 @@ def download_detergent_data(n_clicks):
         index=False
     )
 
-def get_data():
-    df = philippine_detergent_powder()
+def get_data(start=None, end=None):
+    df = philippine_detergent_powder(start=start, end=end)
     return df
 
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 from data.queries import fetch_philippine_egg_prices
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 
-def layout():
+TITLE = "Philippine Egg Prices (Per Piece)"
+DESCRIPTION = "Daily standardized average and median egg prices across the Philippines."
+
+
+def figure():
     df = fetch_philippine_egg_prices()
     df = df.sort_values(by='date')
 
@@ -47,9 +52,14 @@ def layout():
         autosize=True
     )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Philippine Egg Prices (Per Piece)",
-        description="Daily standardized average and median egg prices across the Philippines.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="philippine-egg-price",
@@ -59,7 +69,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-btn",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -73,17 +83,12 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-egg")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
-@callback(
-    Output("download-egg", "data"),
-    Input("download-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_egg_data(n_clicks):
+def download_csv():
     df = fetch_philippine_egg_prices()
     cols = set(df.columns)
     avg_candidates = ['avg_egg_price_per_pc', 'avg_price_per_pc']
@@ -97,12 +102,14 @@ def download_egg_data(n_clicks):
     )
 
 
-def get_data():
-    df = fetch_philippine_egg_prices()
+def get_data(start=None, end=None):
+    df = fetch_philippine_egg_prices(start=start, end=end)
     return df
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
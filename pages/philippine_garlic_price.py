@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 from data.queries import philippine_garlic_prices
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 
-def layout():
+TITLE = "Philippine Garlic Prices"
+DESCRIPTION = "Daily standardized garlic prices across the Philippines (375g)."
+
+
+def figure():
     df = philippine_garlic_prices()
     df = df.sort_values(by="date")
 
@@ -49,9 +54,14 @@ def layout():
         ),
         autosize=True
     )
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Philippine Garlic Prices",
-        description="Daily standardized garlic prices across the Philippines (375g).",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="philippine-garlic-price",
@@ -62,7 +72,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-btn-garlic",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -76,18 +86,13 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-garlic")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
 
-@callback(
-    Output("download-garlic", "data"),
-    Input("download-btn-garlic", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_garlic_data(n_clicks):
+def download_csv():
     df = philippine_garlic_prices()
     return dcc.send_data_frame(
         df[["date", "avg_price", "median_price", "sampled_skus"]].to_csv,
@@ -96,11 +101,13 @@ def download_garlic_data(n_clicks):
     )
 
 
-def get_data():
-    return philippine_garlic_prices()
+def get_data(start=None, end=None):
+    return philippine_garlic_prices(start=start, end=end)
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
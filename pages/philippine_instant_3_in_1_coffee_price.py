@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 from data.queries import philippine_instant_3_in_1_coffee_price
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 import plotly.graph_objects as go
 
-def layout():
+TITLE = "Philippine Instant 3-in-1 Coffee Price"
+DESCRIPTION = "Daily standardized instant 3-in-1 coffee pricing across the Philippines."
+
+
+def figure():
     df = philippine_instant_3_in_1_coffee_price()
     df = df.sort_values(by='date')
 
@@ -45,9 +50,14 @@ def layout():
         autosize=True
     )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Philippine Instant 3-in-1 Coffee Price",
-        description="Daily standardized instant 3-in-1 coffee pricing across the Philippines.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="philippine-coffee-price",
@@ -57,7 +67,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-btn",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -71,17 +81,12 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-coffee")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
-@callback(
-    Output("download-coffee", "data"),
-    Input("download-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_coffee_data(n_clicks):
+def download_csv():
     df = philippine_instant_3_in_1_coffee_price()
     return dcc.send_data_frame(
         df[['date', 'mean_price', 'median_price', 'sampled_skus']].to_csv,
@@ -89,13 +94,15 @@ def download_coffee_data(n_clicks):
         index=False
     )
 
-def get_data():
-    df = philippine_instant_3_in_1_coffee_price()
+def get_data(start=None, end=None):
+    df = philippine_instant_3_in_1_coffee_price(start=start, end=end)
     return df
 
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
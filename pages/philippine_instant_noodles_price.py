@@ -1,10 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 from data.queries import philippine_instant_noodles_price
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 
+TITLE = "Philippine Instant Noodle Prices"
+DESCRIPTION = "Daily standardized instant noodle pricing and SKU availability across the Philippines."
 
-def layout():
+
+def figure():
     df = philippine_instant_noodles_price()
     df = df.sort_values(by="date")
 
@@ -55,9 +59,14 @@ def layout():
         ),
         autosize=True,
     )
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Philippine Instant Noodle Prices",
-        description="Daily standardized instant noodle pricing and SKU availability across the Philippines.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="philippine-noodle-price",
@@ -67,7 +76,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-noodle-btn",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -81,17 +90,12 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-noodle")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
-@callback(
-    Output("download-noodle", "data"),
-    Input("download-noodle-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_noodle_data(n_clicks):
+def download_csv():
     df = philippine_instant_noodles_price()
     return dcc.send_data_frame(
         df[["date", "mean_price", "median_price", "sampled_skus"]].to_csv,
@@ -99,12 +103,14 @@ def download_noodle_data(n_clicks):
         index=False
     )
 
-def get_data():
-    df = philippine_instant_noodles_price()
+def get_data(start=None, end=None):
+    df = philippine_instant_noodles_price(start=start, end=end)
     return df
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 from data.queries import fetch_philippine_milk_prices
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 import plotly.graph_objects as go
 
-def layout():
+TITLE = "Philippine Non-Dairy Milk Prices — Alternatives"
+DESCRIPTION = "Daily standardized non-dairy milk pricing across the Philippines."
+
+
+def figure():
     df = fetch_philippine_milk_prices()
     df = df[df["category"] != "Cow Milk"]  # Only alternatives
     df = df.sort_values(by="dt")
@@ -45,9 +50,14 @@ def layout():
         ),
         autosize=True,
     )
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Philippine Non-Dairy Milk Prices — Alternatives",
-        description="Daily standardized non-dairy milk pricing across the Philippines.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="philippine-milk-alt",
@@ -57,7 +67,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-alt-milk-btn",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -71,17 +81,12 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-alt-milk")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
-@callback(
-    Output("download-alt-milk", "data"),
-    Input("download-alt-milk-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_alt_milk_data(n_clicks):
+def download_csv():
     df = fetch_philippine_milk_prices()
     df = df[df["category"] != "Cow Milk"]
 
@@ -91,12 +96,14 @@ def download_alt_milk_data(n_clicks):
         index=False
     )
 
-def get_data():
-    df = fetch_philippine_milk_prices()
+def get_data(start=None, end=None):
+    df = fetch_philippine_milk_prices(start=start, end=end)
     return df[df["category"] != "Cow Milk"]
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
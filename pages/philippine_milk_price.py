@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 from data.queries import fetch_philippine_milk_prices
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 import plotly.graph_objects as go
 
-def layout():
+TITLE = "Philippine Milk Prices"
+DESCRIPTION = "Daily standardized dairy milk pricing across the Philippines."
+
+
+def figure():
     df = fetch_philippine_milk_prices()
     df = df[df["category"] == "Cow Milk"]  # Only alternatives
     df = df.sort_values(by="dt")
@@ -46,9 +51,14 @@ def layout():
         autosize=True,
     )
     
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Philippine Milk Prices",
-        description="Daily standardized dairy milk pricing across the Philippines.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="philippine-milk",
@@ -58,7 +68,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-milk-btn",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -72,17 +82,12 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-milk")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
-@callback(
-    Output("download-milk", "data"),
-    Input("download-milk-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_alt_milk_data(n_clicks):
+def download_csv():
     df = fetch_philippine_milk_prices()
     df = df[df["category"] == "Cow Milk"]
 
@@ -92,13 +97,15 @@ def download_alt_milk_data(n_clicks):
         index=False
     )
 
-def get_data():
-    df = fetch_philippine_milk_prices()
+def get_data(start=None, end=None):
+    df = fetch_philippine_milk_prices(start=start, end=end)
     return df[df["category"] == "Cow Milk"]
 
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 from data.queries import fetch_philippine_rice_prices
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 import plotly.graph_objects as go
 
-def layout():
+TITLE = "Philippine Rice Price"
+DESCRIPTION = "Daily standardized rice pricing across the Philippines."
+
+
+def figure():
     df = fetch_philippine_rice_prices()
     df = df.sort_values(by='date') 
     fig = go.Figure()
@@ -43,9 +48,14 @@ def layout():
         ),
         autosize=True
     )
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Philippine Rice Price",
-        description="Daily standardized rice pricing across the Philippines.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="philippine-rice-price",
@@ -55,7 +65,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-btn",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -69,27 +79,24 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-rice")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
-@callback(
-    Output("download-rice", "data"),
-    Input("download-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_rice_data(n_clicks):
+def download_csv():
     df = fetch_philippine_rice_prices()
     return dcc.send_data_frame(df[['date', 'avg_price_per_kilo', 'median_price', 'sampled_skus']].to_csv, "philippine_rice_price_avg_median.csv", index=False)
 
 
-def get_data():
-    df = fetch_philippine_rice_prices()
+def get_data(start=None, end=None):
+    df = fetch_philippine_rice_prices(start=start, end=end)
     return df
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, ctx, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 from data.queries import fetch_philippine_sugar_prices
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 
-def layout():
+TITLE = "Philippine Refined Sugar Price"
+DESCRIPTION = "Daily standardized refined sugar pricing across the Philippines."
+
+
+def figure():
     df = fetch_philippine_sugar_prices()
     df = df.sort_values(by="date")
 
@@ -44,9 +49,14 @@ def layout():
         ),
         autosize=True
     )
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Philippine Refined Sugar Price",
-        description="Daily standardized refined sugar pricing across the Philippines.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="philippine-sugar-price",
@@ -56,7 +66,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-sugar-btn",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -70,17 +80,12 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-sugar")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
-@callback(
-    Output("download-sugar", "data"),
-    Input("download-sugar-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_sugar_data(n_clicks):
+def download_csv():
     df = fetch_philippine_sugar_prices()
     return dcc.send_data_frame(
         df[["date", "avg_price_per_kilo", "median_price", "sampled_skus"]].to_csv,
@@ -88,13 +93,15 @@ def download_sugar_data(n_clicks):
         index=False
     )
 
-def get_data():
-    df = fetch_philippine_sugar_prices()
+def get_data(start=None, end=None):
+    df = fetch_philippine_sugar_prices(start=start, end=end)
     return df
 
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
@@ -1,9 +1,14 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 import plotly.graph_objects as go
 from data.queries import philippine_white_vingar_prices
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
 
-def layout():
+TITLE = "Philippine White Vinegar Prices"
+DESCRIPTION = "Daily white vinegar prices (per 1L) and sampled SKUs across the Philippines."
+
+
+def figure():
     df = philippine_white_vingar_prices()
     df = df.sort_values(by="date")
 
@@ -53,9 +58,14 @@ def layout():
         autosize=True,
     )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Philippine White Vinegar Prices",
-         description="Daily white vinegar prices (per 1L) and sampled SKUs across the Philippines.",
+        title=TITLE,
+         description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="whitevinegar-chart",
@@ -65,7 +75,7 @@ def layout():
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-whitevinegar-btn",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": THEME_COLORS["primary"],
@@ -79,18 +89,13 @@ def layout():
                         "boxShadow": "0 1px 3px rgba(0,0,0,0.1)"
                     }
                 ),
-                dcc.Download(id="download-whitevinegar")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "right", "marginTop": "12px"})
         ]
     )
 
 
-@callback(
-    Output("download-whitevinegar", "data"),
-    Input("download-whitevinegar-btn", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_whitevinegar_data(n_clicks):
+def download_csv():
     df = philippine_white_vingar_prices()
     return dcc.send_data_frame(
         df[["date", "mean_price", "median_price", "sampled_skus"]].to_csv,
@@ -99,13 +104,15 @@ def download_whitevinegar_data(n_clicks):
     )
 
 
-def get_data():
-    df = philippine_white_vingar_prices()
+def get_data(start=None, end=None):
+    df = philippine_white_vingar_prices(start=start, end=end)
     return df
 
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "Philippines" },
         ]
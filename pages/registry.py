@@ -0,0 +1,74 @@
+from collections.abc import Mapping
+from importlib import import_module
+
+# Every page module provides:
+#   TITLE, DESCRIPTION  card and figure title text
+#   figure()            the undecorated plotly Figure, no Dash components
+#   layout()            themed_card around dcc.Graph(figure=figure()) plus controls
+#   get_meta_data()     {'title', 'description', 'spatial_coverage', 'url'}
+#   get_data()          optional, the frame behind /api/<slug>/data
+#   download_csv()      optional, dcc.send_data_frame(...) for the page's
+#                       download_id()/download_button_id() components
+# The embed API only uses figure() and get_meta_data(), see layouts.get_figure.
+# Pages define no @callback of their own: Dash only picks up global callbacks
+# of modules imported before its first request, and pages load lazily. Their
+# components use the pattern-matching ids in layouts, handled in app.py.
+
+# Slug → page module. Pages are imported on first use so a worker only pays for
+# the pages it actually serves (commitment_of_traders_eur_forcast pulls in numba).
+PAGE_MODULES = {
+    "german-10-year-bonds": "pages.german_10_year_bonds",
+    "german-10-year-inflation-protected-rate": "pages.german_10_year_inflation_protected_rate",
+    "german-10-year-breakeven-inflation": "pages.german_10_year_breakeven_inflation",
+    "wilshire-total-net-income": "pages.wilshire_net_income",
+    "german-inflation-real-return-spread-eurusd": "pages.german_breakeven_eurusd",
+    "telecom-interest-sensitive-stock": "pages.telecom_interest_sensitive_stock",
+    "wilshire-5000-cumulative-change": "pages.wilshire_cumulative_change",
+    "us-companies-cashflow-tax": "pages.us_companies_cashflow_tax",
+    "capital-expenditure": "pages.capital_expenditure",
+    "interest-rate-differential-eur-usd": "pages.interest_rate_differential_eur_usd",
+    "free-cash-flow-to-debt": "pages.free_cash_flow_to_debt",
+    "commitment-of-traders": "pages.commitment_of_traders",
+    "commitment-of_traders-eur-forecast": "pages.commitment_of_traders_eur_forcast",
+    "philippine-rice-price-history": "pages.philippine_rice_price",
+    "philippine-egg-price-history": "pages.philippine_egg_price",
+    "philippine-milk-price-history": "pages.philippine_milk_price",
+    "philippine-milk-alternative-price-history": "pages.philippine_milk_alternative",
+    "philippine-instant-noodles-price-history": "pages.philippine_instant_noodles_price",
+    "philippine-instant-3-in-1-coffee-price-history": "pages.philippine_instant_3_in_1_coffee_price",
+    "philippine-cooking-oil-price-history": "pages.philippine_cooking_oil_price",
+    "philippine-onion-price-history": "pages.philippine_onion_price",
+    "philippine-sugar-history": "pages.philippine_sugar_price",
+    "philippine-detergent-powder": "pages.philippine_detergent_powder",
+    "philippine-sardines": "pages.philippine_sardines",
+    "philippine-white-vinegar": "pages.philippine_vinegar_white",
+    "philippine-cane-vinegar": "pages.philippine_vinegar_cane",
+    "philippine-garlic-price": "pages.philippine_garlic_price",
+}
+
+
+class LazyPageRegistry(Mapping):
+    """
+    Read-only slug → module mapping that imports a page the first time it is
+    looked up. Membership tests and iteration never import anything.
+    """
+
+    def __init__(self, modules):
+        self._modules = dict(modules)
+
+    def __getitem__(self, slug):
+        # import_module is a dict lookup once the module is in sys.modules
+        return import_module(self._modules[slug])
+
+    def __contains__(self, slug):
+        return slug in self._modules
+
+    def __iter__(self):
+        return iter(self._modules)
+
+    def __len__(self):
+        return len(self._modules)
+
+    def module_path(self, slug):
+        return self._modules[slug]
+
@@ -3,7 +3,11 @@ from data.queries import fetch_telecom_interest_sensitive_stock
 import plotly.graph_objects as go
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
 
-def layout():
+TITLE = "Interest Rates vs Telecom Stock Performance"
+DESCRIPTION = "Comparison of U.S. interest rate movements and cumulative gains for interest-sensitive telecom stocks."
+
+
+def figure():
     df = fetch_telecom_interest_sensitive_stock()
     # Calculate y1 (interest rate) min/max
     min_rate = df['interest_rates'].min()
@@ -82,9 +86,14 @@ def layout():
         hoverlabel=dict(namelength=-1)
     )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Interest Rates vs Telecom Stock Performance",
-        description="Comparison of U.S. interest rate movements and cumulative gains for interest-sensitive telecom stocks.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(
                 id="interest-vs-stock-gain",
@@ -96,6 +105,8 @@ def layout():
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "United States" },
         ]
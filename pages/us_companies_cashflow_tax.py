@@ -1,14 +1,18 @@
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 import pandas as pd
 from data.queries import get_cash_flow_tax_us_companies
+from data.derived import derived, where
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
+from layouts import download_button_id, download_id
+
+TITLE = "US Corporate Operating Cash Flow vs Taxes Paid"
+DESCRIPTION = "A breakdown by industry showing how operational cash generation compares with taxes paid since 2010."
 
-def layout():
-    df = get_cash_flow_tax_us_companies()
-    df = df[(df['year'] >= 2010) & (df['category'] != 'Crypto Assets')]
 
+def _long_format(df):
+    # One row per year, industry and metric
     df_cash = df.groupby(['year', 'category'], as_index=False).agg({'cash_flow': 'sum'})
     df_cash['metric'] = 'Operating Cash Flow'
     df_cash = df_cash.rename(columns={'cash_flow': 'amount'})
@@ -17,7 +21,20 @@ def layout():
     df_tax['metric'] = 'Taxes Paid'
     df_tax = df_tax.rename(columns={'taxes_paid': 'amount'})
 
-    df_combined = pd.concat([df_cash, df_tax], ignore_index=True)
+    return pd.concat([df_cash, df_tax], ignore_index=True)
+
+
+# Shared by the chart, the CSV download and the data API
+CASH_FLOW_AND_TAXES = derived(
+    "us-companies-cashflow-tax",
+    get_cash_flow_tax_us_companies,
+    where(lambda df: (df['year'] >= 2010) & (df['category'] != 'Crypto Assets')),
+    _long_format,
+)
+
+
+def figure():
+    df_combined = CASH_FLOW_AND_TAXES()
 
     industries = sorted(df_combined['category'].unique())
     n_industries = len(industries)
@@ -102,15 +119,20 @@ def layout():
     fig.update_yaxes(title_text="Operating Cash Flow ($)", secondary_y=False)
     fig.update_yaxes(title_text="Taxes Paid ($)", secondary_y=True, showgrid=False)
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="US Corporate Operating Cash Flow vs Taxes Paid",
-        description="A breakdown by industry showing how operational cash generation compares with taxes paid since 2010.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(id="industry-line-subplots", figure=fig),
             html.Div([
                 html.Button(
                     "Download CSV",
-                    id="download-btn-industry-flow",
+                    id=download_button_id(__name__),
                     n_clicks=0,
                     style={
                         "backgroundColor": "#FFCC00",
@@ -126,51 +148,24 @@ def layout():
                         "transition": "background-color 0.2s ease-in-out"
                     }
                 ),
-                dcc.Download(id="download-data-industry-flow")
+                dcc.Download(id=download_id(__name__))
             ], style={"textAlign": "center", "marginTop": "20px"})
         ]
     )
 
-@callback(
-    Output("download-data-industry-flow", "data"),
-    Input("download-btn-industry-flow", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_industry_data(n_clicks):
-    df = get_cash_flow_tax_us_companies()
-    df = df[(df['year'] >= 2010) & (df['category'] != 'Crypto Assets')]
-
-    df_cash = df.groupby(['year', 'category'], as_index=False).agg({'cash_flow': 'sum'})
-    df_cash['metric'] = 'Operating Cash Flow'
-    df_cash = df_cash.rename(columns={'cash_flow': 'amount'})
-
-    df_tax = df.groupby(['year', 'category'], as_index=False).agg({'taxes_paid': 'sum'})
-    df_tax['metric'] = 'Taxes Paid'
-    df_tax = df_tax.rename(columns={'taxes_paid': 'amount'})
-
-    df_combined = pd.concat([df_cash, df_tax], ignore_index=True)
-
+def download_csv():
+    df_combined = CASH_FLOW_AND_TAXES()
     return dcc.send_data_frame(df_combined.to_csv, "industry_operating_cashflow_taxes.csv", index=False)
 
 
 def get_data():
-    df = get_cash_flow_tax_us_companies()
-    df = df[(df['year'] >= 2010) & (df['category'] != 'Crypto Assets')]
-
-    df_cash = df.groupby(['year', 'category'], as_index=False).agg({'cash_flow': 'sum'})
-    df_cash['metric'] = 'Operating Cash Flow'
-    df_cash = df_cash.rename(columns={'cash_flow': 'amount'})
-
-    df_tax = df.groupby(['year', 'category'], as_index=False).agg({'taxes_paid': 'sum'})
-    df_tax['metric'] = 'Taxes Paid'
-    df_tax = df_tax.rename(columns={'taxes_paid': 'amount'})
-
-    df_combined = pd.concat([df_cash, df_tax], ignore_index=True)
-    return df_combined
+    return CASH_FLOW_AND_TAXES()
 
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "United States" },
         ]
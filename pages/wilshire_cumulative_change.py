@@ -3,7 +3,11 @@ from dash import dcc, html
 from data.queries import fetch_coporate_america_net_income_to_wilshire
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
 
-def layout():
+TITLE = "Cumulative Change: Wilshire 5000 vs Corporate America Net Income"
+DESCRIPTION = "A comparison of long-term cumulative performance between U.S. corporate net income and the Wilshire 5000 index."
+
+
+def figure():
     df = fetch_coporate_america_net_income_to_wilshire()
 
     # Normalize to show cumulative % change from the first year
@@ -81,17 +85,24 @@ def layout():
         hoverlabel=dict(namelength=-1)
     )
 
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
         [
             dcc.Graph(id="wilshire5000-vs-net-income-cumulative", figure=fig)
         ],
-        title="Cumulative Change: Wilshire 5000 vs Corporate America Net Income",
-        description="A comparison of long-term cumulative performance between U.S. corporate net income and the Wilshire 5000 index."
+        title=TITLE,
+        description=DESCRIPTION
     )
 
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "United States" },
         ]
@@ -4,7 +4,11 @@ from data.queries import fetch_coporate_america_net_income_to_wilshire
 import numpy as np 
 from theme import CHART_TEMPLATE, THEME_COLORS, themed_card
 
-def layout():
+TITLE = "Wilshire 5000 vs Total Net Income of Corporate America"
+DESCRIPTION = "A long-term comparison of corporate America's net income against movements in the Wilshire 5000 index."
+
+
+def figure():
     df = fetch_coporate_america_net_income_to_wilshire()
     df = df.sort_values('year')
     fig = go.Figure()
@@ -88,9 +92,14 @@ def layout():
 
         hoverlabel=dict(namelength=-1)
     )
+    return fig
+
+
+def layout():
+    fig = figure()
     return themed_card(
-        title="Wilshire 5000 vs Total Net Income of Corporate America",
-        description="A long-term comparison of corporate America's net income against movements in the Wilshire 5000 index.",
+        title=TITLE,
+        description=DESCRIPTION,
         children=[
             dcc.Graph(id="wilshire-vs-net-income", figure=fig)
         ]
@@ -98,6 +107,8 @@ def layout():
 
 def get_meta_data():
     res = {}
+    res['title'] = TITLE
+    res['description'] = DESCRIPTION
     res['spatial_coverage'] =[
         { "@type": "Place", "name": "United States" },
         ]
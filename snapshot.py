@@ -0,0 +1,66 @@
+import hashlib
+
+from cache import cache, get_data_version
+
+# Rendered embeds carry this token wherever the caller's div_id goes, so one
+# snapshot per page serves every embed regardless of the requested div_id.
+DIV_ID_PLACEHOLDER = "__YP_DIV_ID__"
+
+
+def _snapshot_key(pathname, version):
+    return f"snapshot:{pathname}:{version}"
+
+
+def get_snapshot(pathname, render):
+    """
+    Returns the pre-rendered embed for pathname at the current data version,
+    rendering and storing it on the first request after a refresh.
+
+    Args:
+        pathname (str): Key in PAGE_LAYOUTS.
+        render (callable): render(pathname, date_modified) -> html containing
+            DIV_ID_PLACEHOLDER.
+
+    Returns:
+        dict: {'html', 'etag', 'date_modified'}
+    """
+    version = get_data_version()
+    key = _snapshot_key(pathname, version)
+
+    snapshot = cache.get(key)
+    if snapshot is None:
+        html = render(pathname, version)
+        if html is None:
+            return {"html": None, "etag": None, "date_modified": version}
+
+        snapshot = {
+            "html": html,
+            "etag": hashlib.sha256(html.encode("utf-8")).hexdigest()[:32],
+            "date_modified": version,
+        }
+        cache.set(key, snapshot)
+
+    return snapshot
+
+
+def embed_response_parts(snapshot, div_id):
+    """
+    Fills the div_id into a snapshot and derives the ETag for that variant.
+    """
+    html = snapshot["html"].replace(DIV_ID_PLACEHOLDER, div_id)
+    etag = hashlib.sha256(f"{snapshot['etag']}:{div_id}".encode("utf-8")).hexdigest()[:32]
+    return html, etag
+
+
+def prerender_snapshots(pathnames, render):
+    """
+    Renders every page for the current data version so the first embed hit
+    after a refresh is served from the store. Returns the pages that failed.
+    """
+    errors = []
+    for pathname in pathnames:
+        try:
+            get_snapshot(pathname, render)
+        except Exception as e:
+            errors.append(f"⚠️ snapshot {pathname} failed: {e}")
+    return errors
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+from flask import Flask
+
+from cache import bump_data_version, cache, get_data_version, memoize_swr
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.app_context():
+        cache.clear()
+        yield app
+
+
+def _revalidate(func, *args, **kwargs):
+    # Ages the entry past its soft timeout and waits for the background run
+    entry = func.peek(*args, **kwargs)
+    computed_at = entry["computed_at"]
+    entry["computed_at"] -= func.soft_timeout
+    func(*args, **kwargs)
+    for _ in range(200):
+        if func.peek(*args, **kwargs)["computed_at"] >= computed_at:
+            return
+        time.sleep(0.01)
+
+
+def test_miss_wait_is_bounded(app):
+    @memoize_swr(miss_wait=0.3)
+    def answer():
+        return 42
+
+    # Another worker holds the lock and never finishes
+    cache.add(f"{answer.make_cache_key()}:lock", 1, timeout=600)
+    started = time.perf_counter()
+    assert answer() == 42
+    assert time.perf_counter() - started < 2
+
+
+def test_only_full_entries_bump_the_data_version(app):
+    value = {"n": 0}
+
+    @memoize_swr()
+    def fetch(start=None):
+        return value["n"]
+
+    fetch()
+    fetch(start="2025-06-01")
+    version = bump_data_version()
+    value["n"] = 1
+    _revalidate(fetch, start="2025-06-01")
+    assert fetch.peek(start="2025-06-01")["value"] == 1
+    assert get_data_version() == version
+    time.sleep(1)
+    _revalidate(fetch)
+    assert fetch.peek()["value"] == 1
+    assert get_data_version() != version
@@ -0,0 +1,88 @@
+import io
+import json
+
+import pandas as pd
+import pyarrow as pa
+
+import metrics
+from data.db_client import query_df
+from data.result_schema import FLOAT64
+
+
+SUMMARY = {"read_rows": "1200", "read_bytes": "48000"}
+
+
+class ArrowResponse(io.BytesIO):
+    def __init__(self, table):
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        super().__init__(sink.getvalue().to_pybytes())
+        self.headers = {"X-ClickHouse-Summary": json.dumps(SUMMARY)}
+
+
+class NumpyResult:
+    column_names = ("close",)
+    summary = SUMMARY
+
+
+class DfStream:
+    source = NumpyResult()
+
+    def __init__(self, blocks):
+        self._blocks = iter(blocks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return self._blocks
+
+
+class FakeClient:
+    """
+    The public clickhouse_connect calls query_df uses, with canned results.
+    """
+
+    def __init__(self):
+        self.settings = []
+
+    def raw_stream(self, query, parameters=None, settings=None, fmt=None):
+        self.settings.append(settings)
+        return ArrowResponse(pa.table({"close": [1.0, 2.0, 3.0]}))
+
+    def query_df_stream(self, query, parameters=None, settings=None):
+        self.settings.append(settings)
+        return DfStream([pd.DataFrame({"close": [1.0, 2.0]}), pd.DataFrame({"close": [3.0]})])
+
+
+def _instrumented_query(name, **kwargs):
+    def fetch():
+        return query_df(FakeClient(), "SELECT close FROM t", **kwargs)
+
+    fetch.__name__ = name
+    df = metrics.instrumented(fetch)()
+    return df, metrics.summary()["queries"][name]
+
+
+def test_schema_query_reports_summary():
+    df, stats = _instrumented_query("fetch_close_arrow", schema={"close": FLOAT64})
+    assert df["close"].tolist() == [1.0, 2.0, 3.0]
+    assert (stats["read_rows"], stats["read_bytes"]) == (1200, 48000)
+
+
+def test_plain_query_reports_summary():
+    df, stats = _instrumented_query("fetch_close_pandas")
+    assert df["close"].tolist() == [1.0, 2.0, 3.0]
+    assert (stats["read_rows"], stats["read_bytes"]) == (1200, 48000)
+
+
+def test_streams_wait_for_the_final_summary():
+    client = FakeClient()
+    query_df(client, "SELECT close FROM t", settings={"max_threads": 2}, schema={"close": FLOAT64})
+    query_df(client, "SELECT close FROM t")
+    assert all(s["http_wait_end_of_query"] == 1 for s in client.settings)
+    assert client.settings[0]["max_threads"] == 2
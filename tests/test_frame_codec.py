@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from utils.frame_codec import ARROW_MIN_ROWS, decode_value, encode_value
+
+pytest.importorskip("pyarrow")
+
+ROWS = ARROW_MIN_ROWS * 2
+
+
+def _frame(index):
+    return pd.DataFrame({"price": range(ROWS), "market": ["ever", "puregold"] * (ROWS // 2)}, index=index)
+
+
+@pytest.mark.parametrize("index", [
+    pd.RangeIndex(ROWS),
+    pd.RangeIndex(ROWS, name="row"),
+    # e.g. the tail of a frame after slicing without reset_index
+    pd.RangeIndex(50, 50 + ROWS),
+    pd.RangeIndex(0, 2 * ROWS, 2),
+    pd.Index(range(ROWS - 1, -1, -1)),
+    pd.date_range("2025-01-01", periods=ROWS, name="date"),
+])
+def test_index_survives_the_round_trip(index):
+    df = _frame(index)
+    assert decode_value(encode_value(df)).index.equals(df.index)
+    # Arrow keeps the values of a DatetimeIndex but not its freq
+    pd.testing.assert_frame_equal(decode_value(encode_value(df)), df, check_freq=False)
@@ -0,0 +1,234 @@
+"""
+The single-scan grocery panel against the per-product queries it replaced,
+run on an embedded ClickHouse (chdb) over generated raw rows. Skipped when
+chdb is not installed (pip install chdb).
+"""
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from data.grocery import MILK_ALTERNATIVE_CONDITIONS, MILK_CONDITIONS, grocery_panel_sql
+from data.sku_units import RULES, SKU_UNITS_TABLE, sku_units_join
+
+chdb_session = pytest.importorskip("chdb.session")
+
+CALC_TOTAL_GRAMS = r"(sku, market) -> toFloat64OrNull(extract(sku, '([0-9]+) ?g\\b'))"
+
+# product -> (SKUs, categories, markets); every SKU is scraped under several
+# categories and markets so the dedupe and the category filters interact
+CATALOG = {
+    "rice": (["Dinurado Rice 5kg", "Sinandomeng Rice 2kg", "Jasmine Rice 5kg"], ["Rice", "Pantry"], ["ever", "puregold"]),
+    "egg": (["Medium Eggs 12s", "Large Eggs 12s"], ["Eggs", "Dairy"], ["ever", "puregold"]),
+    "milk": (["Fresh Milk 1L", "Soy Milk 1L", "Almond Milk 1L", "Evaporated Milk 370ml"],
+             ["Fresh Milk", "Liquid Milk", "Canned"], ["ever", "puregold"]),
+    "noodles": (["Instant Noodles Beef 55g", "Instant Pancit Canton 60g"], ["Noodles", "Pantry"], ["ever"]),
+    "coffee": (["Nescafe 3-in-1 Coffee Original 28g", "Great Taste 3 in 1 Coffee 30g", "Coffee Creamer 3in1 20g"],
+               ["Coffee", "Beverages"], ["ever", "puregold"]),
+    "oil": (["Palm Cooking Oil 1L", "Canola Oil 2L"], ["Cooking Essentials", "Pantry"], ["ever", "puregold"]),
+    "onion": (["Red Onion 250g", "Spring Onion 100g", "Sibuyas Bombay 500g"], ["Fresh Vegetables", "Fresh Produce", "Pantry"],
+              ["ever", "puregold"]),
+    "sugar": (["Refined Sugar 1kg", "Brown Sugar 1kg"], ["Cooking Essentials", "Pantry"], ["ever", "sm supermarket", "waltermart"]),
+    "detergent": (["Detergent Powder 2kg", "Phosphate Free Detergent Powder 1kg"], ["Laundry"], ["ever"]),
+    "sardines": (["Sardines in Tomato Sauce 155g", "Spanish Sardines 110g"], ["Canned"], ["ever", "puregold"]),
+    "vinegar": (["White Vinegar 1L", "Cane Vinegar 1L"], ["Condiments"], ["ever"]),
+    "garlic": (["Garlic 250g", "Bawang Peeled 100g"], ["Fresh Produce", "Spices"], ["ever", "puregold"]),
+}
+
+START = datetime(2025, 6, 2, 6)
+DAYS = 6
+
+
+def _raw_rows(rng):
+    rows = []
+    scrape_prices = {}
+    for skus, categories, markets in CATALOG.values():
+        for sku in skus:
+            for market in markets:
+                for day in range(DAYS):
+                    for scrape in range(rng.randint(1, 3)):
+                        insert_date = START + timedelta(days=day, hours=4 * scrape + rng.randint(0, 3))
+                        # Same price for a (sku, insert_date) in every market: the
+                        # per-scrape dedupe keeps an arbitrary one of them
+                        if "coffee" in sku.lower():
+                            price = scrape_prices.setdefault((sku, insert_date), round(rng.uniform(50, 150), 2))
+                        else:
+                            price = round(rng.uniform(20, 400), 2)
+                        rows.append((insert_date, sku, market, price, rng.choice(categories)))
+    return rows
+
+
+def _units(rng):
+    rows = []
+    for skus, _, markets in CATALOG.values():
+        for sku in skus:
+            for market in markets:
+                # Some pairs are not parsed yet, some rules do not apply
+                values = [None if rng.random() < 0.15 else round(rng.uniform(0.1, 5), 3) for _ in RULES]
+                rows.append((sku, market, *values))
+    return rows
+
+
+def _literal(value):
+    if value is None:
+        return "NULL"
+    if isinstance(value, datetime):
+        return f"'{value:%Y-%m-%d %H:%M:%S}'"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "\\'") + "'"
+    return repr(value)
+
+
+def _values(rows):
+    return ",\n".join("(" + ", ".join(_literal(v) for v in row) + ")" for row in rows)
+
+
+@pytest.fixture(scope="module")
+def clickhouse():
+    rng = random.Random(7)
+    session = chdb_session.Session()
+    session.query(f"CREATE FUNCTION calc_total_grams AS {CALC_TOTAL_GRAMS}")
+    session.query("""
+        CREATE TABLE default.input_raw_products (
+            insert_date DateTime, sku String, market String, price Float64,
+            category String, main_category String DEFAULT 'groceries'
+        ) ENGINE = MergeTree ORDER BY tuple()
+    """)
+    session.query(f"INSERT INTO default.input_raw_products (insert_date, sku, market, price, category) "
+                  f"VALUES {_values(_raw_rows(rng))}")
+    columns = ", ".join(f"{name} Nullable(Float64)" for name in RULES)
+    session.query(f"CREATE TABLE {SKU_UNITS_TABLE} (sku String, market String, {columns}) "
+                  f"ENGINE = ReplacingMergeTree ORDER BY (market, sku)")
+    session.query(f"INSERT INTO {SKU_UNITS_TABLE} VALUES {_values(_units(rng))}")
+    yield session
+    session.close()
+
+
+def _query(session, sql):
+    return session.query(sql, "DataFrame")
+
+
+def _latest_per_day(where, unit_price, units, date_expr="toDate(insert_date)"):
+    # Shape of the per-product queries: filter, then keep the latest row per
+    # (day, sku, market)
+    return f"""
+        with base as (
+            select {date_expr} dt, sku, market, {unit_price} unit_price
+            from default.input_raw_products
+            {sku_units_join(**units)}
+            where main_category = 'groceries' and {where}
+            order by insert_date desc
+            limit 1 by dt, sku, market
+        )
+        select dt date, avg(unit_price) mean_price, median(unit_price) median_price, uniq(sku, market) sampled_skus
+        from base group by dt order by dt
+    """
+
+
+def _garlic_or_sardines(where, unit_price):
+    return f"""
+        with base as (
+            select toDate(insert_date) dt, sku, market, calc_total_grams(sku, market) grams, {unit_price} unit_price
+            from default.input_raw_products
+            where main_category = 'groceries' and {where} and grams is not null
+            order by insert_date desc
+            limit 1 by dt, sku, market
+        )
+        select dt date, avg(unit_price) mean_price, median(unit_price) median_price, uniq(sku, market) sampled_skus
+        from base group by dt order by dt
+    """
+
+
+MILK = f"""
+    with base as (
+        select toDate(insert_date) dt, market, sku, price / volume_liters unit_price,
+            ({MILK_ALTERNATIVE_CONDITIONS}) is_alternative
+        from default.input_raw_products
+        {sku_units_join(volume_liters="volume_liters")}
+        where main_category = 'groceries' and {MILK_CONDITIONS}
+        order by insert_date desc
+        limit 1 by dt, sku, market
+    )
+    select dt date, avg(unit_price) mean_price, median(unit_price) median_price, uniq(sku, market) sampled_skus
+    from base where is_alternative = {{alternative}} group by dt order by dt
+"""
+
+# product -> the query it had before the single scan, reduced to
+# (date, mean_price, median_price, sampled_skus)
+BASELINE = {
+    "rice": _latest_per_day(
+        "(lower(sku) like '%dinurado%' or lower(sku) like '%sinandomeng%') and kilos > 0 and dt >= '2025-05-24'",
+        "price / kilos", {"kilos": "rice_kg"}),
+    "egg": _latest_per_day(
+        "lower(sku) like '%egg%' and lower(sku) like '%medium%' and pcs > 0",
+        "price / pcs", {"pcs": "egg_pcs"}),
+    "milk_cow": MILK.format(alternative=0),
+    "milk_alternatives": MILK.format(alternative=1),
+    "instant_noodles": _latest_per_day(
+        "lower(sku) like '%instant%' and lower(category) like '%noodle%' and dt > '2025-05-24'",
+        "price / total_grams * 55", {"total_grams": "noodle_grams"}),
+    "coffee_3_in_1": rf"""
+        SELECT date, avg(price / grams * 400) mean_price, median(price / grams * 400) median_price,
+            uniq(sku, market) sampled_skus
+        FROM (
+            select toDate(insert_date) date, market, sku, grams, price
+            from default.input_raw_products
+            {sku_units_join(grams="coffee_grams")}
+            where main_category='groceries'
+            and (lower(category) like '%coffee%' or (category='Beverages' and market='ever'))
+            and match(sku, '\\b[0-9]+\\s?g\\b')
+            and match(sku, '\\b[Cc]offee\\b')
+            and match(sku, '(?i)3[[:space:][:punct:]]*(in)?[[:space:][:punct:]]*1')
+            and sku != 'San Mig 3-in-1 Coffee Mix Original 20g | 30s'
+            and sku not ilike '%creamer%'
+            limit 1 by sku, insert_date)
+        group by date order by date
+    """,
+    "cooking_oil": _latest_per_day(
+        "sku ilike '%oil%' and category ilike '%cooking%' and adj_vol is not null",
+        "price / adj_vol", {"adj_vol": "oil_liters"}),
+    "onion": _latest_per_day(
+        """(sku ilike '%onion%' or sku ilike '%sibuyas%')
+            and ((category ilike '%fresh%' and category ilike '%vegetable%') or (category ilike '%fresh%' and market = 'ever'))
+            and sku not ilike '%leeks%' and sku not ilike '%leave%' and sku not ilike '%spring%'
+            and avg_qty is not null and sku not ilike '%sprout%'""",
+        "price / avg_qty * 375", {"avg_qty": "onion_grams"}),
+    "sugar": _latest_per_day(
+        """sku ilike '%sugar%' and sku ilike '%refined%'
+            and ((category ilike 'cooking%' and market = 'ever')
+                or (market = 'sm supermarket' and category ilike '%pantry%')
+                or (market = 'waltermart' and category ilike '%pantry%'))
+            and kilos > 0""",
+        "price / kilos", {"kilos": "sugar_kg"}),
+    "detergent_powder": _latest_per_day(
+        """sku ilike '%Detergent%' and sku ilike '%Powder%' and sku not ilike '%free%'
+            and toDate(insert_date) >= '2025-06-01' and total_grams is not null""",
+        "price / total_grams * 2000", {"total_grams": "detergent_grams"}),
+    "sardines": _garlic_or_sardines(
+        "sku ilike '%sardin%' and insert_date > '2025-05-24'", "price / grams * 155"),
+    "white_vinegar": _latest_per_day(
+        "sku ilike '%vinegar%' and sku ilike '%white%' and volume_liters is not null",
+        "price / volume_liters", {"volume_liters": "volume_liters"}),
+    "cane_vinegar": _latest_per_day(
+        "sku ilike '%vinegar%' and sku ilike '%cane%' and volume_liters is not null",
+        "price / volume_liters", {"volume_liters": "volume_liters"}),
+    "garlic": _garlic_or_sardines(
+        "(sku ilike '%garlic%' or sku ilike '%bawang%') and category ilike '%fresh%'", "price / grams * 375"),
+}
+
+
+@pytest.fixture(scope="module")
+def panel(clickhouse):
+    return _query(clickhouse, grocery_panel_sql())
+
+
+@pytest.mark.parametrize("product", sorted(BASELINE))
+def test_panel_matches_per_product_queries(clickhouse, panel, product):
+    series = panel[panel["product"] == product].drop(columns="product").reset_index(drop=True)
+    expected = _query(clickhouse, BASELINE[product])
+    assert len(expected) > 0
+    for frame in (series, expected):
+        frame["date"] = pd.to_datetime(frame["date"])
+        frame["sampled_skus"] = frame["sampled_skus"].astype("int64")
+    pd.testing.assert_frame_equal(series, expected[list(series.columns)], check_dtype=False, rtol=1e-9)
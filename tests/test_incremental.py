@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from cache import cache, memoize_swr
+from data.incremental import incremental, refresh_incremental
+
+TODAY = date(2025, 6, 30)
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.app_context():
+        cache.clear()
+        yield app
+
+
+@pytest.fixture
+def prices():
+    """
+    An @incremental query over a table whose history the test can rewrite,
+    recording the since of every run.
+    """
+    table = {"date": pd.date_range(end=TODAY, periods=30).date, "price": 1.0}
+    calls = []
+
+    @memoize_swr()
+    @incremental(column="date", overlap_days=2, history_version=1)
+    def fetch_prices(since=None):
+        calls.append(since)
+        df = pd.DataFrame(table)
+        return df if since is None else df[df["date"] >= since].reset_index(drop=True)
+
+    fetch_prices.table = table
+    fetch_prices.calls = calls
+    return fetch_prices
+
+
+def test_refresh_extends_cached_history(app, prices):
+    assert refresh_incremental(prices)[1] == "full"
+    result, mode = refresh_incremental(prices)
+    assert mode == "incremental"
+    assert prices.calls == [None, TODAY - timedelta(days=2)]
+    assert len(result) == 30
+
+
+def test_rules_version_change_rebuilds_history(app, prices):
+    refresh_incremental(prices)
+    # Reparsed sizes change old prices; a deploy with a new RULES_VERSION
+    # must not keep merging onto the history computed under the old rules
+    prices.table["price"] = 2.0
+    prices.incremental["history_version"] = 2
+    result, mode = refresh_incremental(prices)
+    assert mode == "full"
+    assert (result["price"] == 2.0).all()
+    assert refresh_incremental(prices)[1] == "incremental"
+
+
+def test_entry_written_elsewhere_has_no_watermark(app, prices):
+    refresh_incremental(prices)
+    # e.g. an SWR revalidation storing a full result
+    prices.store(prices.uncached())
+    assert refresh_incremental(prices)[1] == "full"
+
+
+def test_deleted_entry_takes_its_watermark(app, prices):
+    refresh_incremental(prices)
+    prices.delete_memoized()
+    assert refresh_incremental(prices)[1] == "full"
@@ -0,0 +1,70 @@
+import time
+from datetime import date
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from cache import cache, memoize_swr
+from data.ranges import cached_ranges, date_range
+from data.refresh import recompute
+
+END = date(2025, 6, 30)
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.app_context():
+        cache.clear()
+        yield app
+
+
+@pytest.fixture
+def prices():
+    """
+    A @date_range query over a table the test can reprice, recording the
+    range of every run.
+    """
+    table = {"date": pd.date_range(end=END, periods=30), "price": 1.0}
+    calls = []
+
+    @date_range(column="date")
+    @memoize_swr()
+    def fetch_prices(start=None, end=None):
+        calls.append((start, end))
+        df = pd.DataFrame(table)
+        if start is not None:
+            df = df[df["date"] >= pd.Timestamp(start)]
+        return df.reset_index(drop=True)
+
+    fetch_prices.table = table
+    fetch_prices.calls = calls
+    return fetch_prices
+
+
+def test_stale_superset_is_revalidated(app, prices, monkeypatch):
+    prices()
+    prices.table["price"] = 2.0
+    computed_at = time.time()
+    monkeypatch.setattr(time, "time", lambda: computed_at + prices.soft_timeout + 1)
+    # Served stale, but the full history is queried again in the background
+    assert (prices(start=date(2025, 6, 20))["price"] == 1.0).all()
+    for _ in range(200):
+        if prices.peek()["computed_at"] > computed_at:
+            break
+        time.sleep(0.01)
+    assert prices.calls == [(None, None), (None, None)]
+    assert (prices(start=date(2025, 6, 20))["price"] == 2.0).all()
+
+
+def test_refresh_drops_ranged_entries(app, prices):
+    ranged = prices(start=date(2025, 6, 20))
+    assert (ranged["price"] == 1.0).all()
+    assert cached_ranges(prices) == [(date(2025, 6, 20), None)]
+    prices.table["price"] = 2.0
+    recompute(prices)
+    assert cached_ranges(prices) == []
+    assert (prices(start=date(2025, 6, 20))["price"] == 2.0).all()
+    assert (prices(start=date(2025, 6, 25))["price"] == 2.0).all()
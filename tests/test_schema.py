@@ -0,0 +1,101 @@
+"""
+The fundamentals snapshot read through latest_filings_sql against the
+original filter-then-LIMIT 1 BY queries on the full history, on an embedded
+ClickHouse (chdb). Skipped when chdb is not installed (pip install chdb).
+"""
+import random
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from data.schema import SNAPSHOTS, backfill_statement, create_statements, latest_filings_sql
+
+chdb_session = pytest.importorskip("chdb.session")
+
+SOURCE = "trading.equity_fundamental"
+FAULTY_ID = "707605"
+
+WHERE = """
+    dimension IN ('Income Taxes Paid', 'Net Cash Provided by (Used in) Operating Activities')
+    AND id != '707605'
+    AND start >= '2007-01-01'
+    AND form = '10-K'
+    AND dateDiff('day', start, end) > 350
+"""
+
+# The shape every fundamentals query had before the snapshot
+ORIGINAL = f"""
+    SELECT start, end, entity, dimension, metric, id
+    FROM {SOURCE}
+    WHERE {WHERE}
+    ORDER BY created_at DESC, filed DESC
+    LIMIT 1 BY start, end, entity, dimension
+"""
+
+
+def _history(rng):
+    rows = []
+    for entity in range(12):
+        for dimension in ("Income Taxes Paid", "Net Cash Provided by (Used in) Operating Activities", "Revenues"):
+            for year in range(2006, 2012):
+                start = date(year, 1, 1)
+                end = date(year, 12, 31) if rng.random() > 0.1 else date(year, 3, 31)
+                created = datetime(year + 1, 2, 1)
+                for version in range(rng.randint(1, 4)):
+                    form = "10-K" if rng.random() > 0.15 else "10-K/A"
+                    # The newest version is sometimes the faulty filing, and
+                    # some versions share created_at and differ in filed only
+                    filing_id = FAULTY_ID if rng.random() < 0.2 else f"{entity}-{year}-{version}"
+                    if rng.random() > 0.3:
+                        created += timedelta(days=rng.randint(1, 90))
+                    filed = created.date() - timedelta(days=version)
+                    metric = None if rng.random() < 0.05 else round(rng.uniform(-1e6, 1e6), 2)
+                    rows.append((f"entity-{entity}", dimension, form, start, end, filing_id, filed, created, metric))
+    return rows
+
+
+def _literal(value):
+    if value is None:
+        return "NULL"
+    if isinstance(value, (date, datetime)):
+        return f"'{value}'"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "\\'") + "'"
+    return repr(value)
+
+
+@pytest.fixture(scope="module")
+def clickhouse():
+    rng = random.Random(3)
+    session = chdb_session.Session()
+    session.query("CREATE DATABASE IF NOT EXISTS trading")
+    session.query(f"""
+        CREATE TABLE {SOURCE} (
+            entity String, dimension String, form String, start Date, end Date,
+            id String, filed Date, created_at DateTime, metric Nullable(Float64)
+        ) ENGINE = MergeTree ORDER BY (entity, dimension)
+    """)
+    rows = _history(rng)
+    # Half the history is backfilled, the rest arrives through the view
+    half = len(rows) // 2
+    insert = f"INSERT INTO {SOURCE} VALUES "
+    session.query(insert + ",".join("(" + ", ".join(map(_literal, row)) + ")" for row in rows[:half]))
+    for statement in create_statements(SOURCE, SNAPSHOTS[SOURCE]):
+        session.query(statement)
+    session.query(backfill_statement(SOURCE, SNAPSHOTS[SOURCE]))
+    session.query(insert + ",".join("(" + ", ".join(map(_literal, row)) + ")" for row in rows[half:]))
+    yield session
+    session.close()
+
+
+def _sorted(df):
+    return df.sort_values(["entity", "dimension", "start", "end"]).reset_index(drop=True)
+
+
+def test_latest_filings_match_the_original_dedupe(clickhouse):
+    expected = _sorted(clickhouse.query(ORIGINAL, "DataFrame"))
+    snapshot = _sorted(clickhouse.query(latest_filings_sql({"metric": "metric", "id": "id"}, WHERE), "DataFrame"))
+    assert len(expected) > 0
+    assert FAULTY_ID not in set(snapshot["id"])
+    pd.testing.assert_frame_equal(snapshot[list(expected.columns)], expected, check_dtype=False)
@@ -41,6 +41,51 @@ CHART_TEMPLATE = {
     ),
 
 }
+
+
+def decorate_figure(fig, title=None, description=None):
+    """
+    Puts the card title and description into the figure's own title, as the
+    embed shows it, and makes the margins explicit. Used by themed_card and
+    by the figure-only embed path, so both render the same figure.
+    """
+    if not (title or description):
+        return fig
+
+    if title:
+        full_title = title
+        if description:
+            full_title = (
+                f"{title}"
+                f"<br><span style='font-size:14px; color:{THEME_COLORS['textMuted']};"
+                f" font-family:sans-serif;'>{description} <br><b>Data provided by <b>yellowplannet.com</b></span>"
+            )
+
+        fig.update_layout(
+            title=dict(
+                text=full_title,
+                x=0.05,
+                xanchor="left",
+                font=dict(size=20, color=THEME_COLORS["text"], family="sans-serif"),
+            )
+        )
+
+    safe_l = fig.layout.margin.l or 0
+    safe_r = fig.layout.margin.r or 0
+    safe_t = fig.layout.margin.t or 0
+    safe_b = fig.layout.margin.b or 0
+
+    fig.update_layout(
+        margin=dict(
+            l=safe_l,
+            r=safe_r,
+            t=safe_t,
+            b=safe_b,
+        )
+    )
+    return fig
+
+
 def themed_card(children, title=None, description=None, style=None):
     base = {
         "backgroundColor": THEME_COLORS["card"],
@@ -60,42 +105,7 @@ def themed_card(children, title=None, description=None, style=None):
         if hasattr(c, "figure"):
             graph = c
             break
-    if  (title or description):
-        existing = list(graph.figure.layout.annotations) if graph.figure.layout.annotations else []
-        annotations = existing.copy()
-
-        if title:
-            extracted_desc = description if description else ""
-            full_title = title
-            if description:
-                full_title = (
-                    f"{title}"
-                    f"<br><span style='font-size:14px; color:{THEME_COLORS['textMuted']};"
-                    f" font-family:sans-serif;'>{description} <br><b>Data provided by <b>yellowplannet.com</b></span>"
-                )
-
-            graph.figure.update_layout(
-                title=dict(
-                    text=full_title,
-                    x=0.05,
-                    xanchor="left",
-                    font=dict(size=20, color=THEME_COLORS["text"], family="sans-serif"), 
-                    
-                )
-            )
-            
-        safe_l = graph.figure.layout.margin.l or 0
-        safe_r = graph.figure.layout.margin.r or 0
-        safe_t = graph.figure.layout.margin.t or 0
-        safe_b = graph.figure.layout.margin.b or 0
-
-        graph.figure.update_layout(
-            margin=dict(
-                l=safe_l,
-                r=safe_r,
-                t=safe_t,
-                b=safe_b,
-            )
-        )
+    if graph is not None:
+        decorate_figure(graph.figure, title, description)
 
     return html.Div(children, style=base)
\ No newline at end of file
@@ -0,0 +1,125 @@
+import io
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+CSV_CHUNK_ROWS = 5000
+ARROW_BATCH_ROWS = 65536
+
+FORMATS = {
+    "csv": {"mimetype": "text/csv", "extension": "csv", "compressible": True},
+    "arrow": {"mimetype": "application/vnd.apache.arrow.stream", "extension": "arrow", "compressible": True},
+    # Parquet pages are already compressed, HTTP compression would only cost CPU
+    "parquet": {"mimetype": "application/vnd.apache.parquet", "extension": "parquet", "compressible": False},
+}
+
+
+def format_available(fmt):
+    return fmt == "csv" or (fmt in FORMATS and pa is not None)
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Picks the response Content-Encoding from the request's Accept-Encoding
+    (werkzeug MIMEAccept-style object). Prefers brotli when installed.
+    """
+    if brotli is not None and accept_encoding["br"]:
+        return "br"
+    if accept_encoding["gzip"]:
+        return "gzip"
+    return None
+
+
+def iter_csv(df, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Yields the frame as CSV text, header first, then chunk_rows rows at a time,
+    so only one chunk is ever materialized as a string.
+    """
+    yield df.iloc[0:0].to_csv(index=False)
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False)
+
+
+def iter_arrow(df, batch_rows=ARROW_BATCH_ROWS):
+    """
+    Yields the frame as an Arrow IPC stream, one record batch at a time.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    with pa_ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # End-of-stream marker written on close
+    yield sink.getvalue()
+
+
+def iter_parquet(df):
+    """
+    Parquet needs its footer written last, so the file is built in one buffer.
+    """
+    sink = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), sink, compression="zstd")
+    yield sink.getvalue()
+
+
+def compress(chunks, encoding):
+    """
+    Wraps a chunk generator with streaming gzip/brotli compression.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=5)
+        for chunk in chunks:
+            out = compressor.process(_to_bytes(chunk))
+            if out:
+                yield out
+        yield compressor.finish()
+    elif encoding == "gzip":
+        # wbits=31 -> gzip container
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            out = compressor.compress(_to_bytes(chunk))
+            if out:
+                yield out
+        yield compressor.flush()
+    else:
+        for chunk in chunks:
+            yield _to_bytes(chunk)
+
+
+def _to_bytes(chunk):
+    return chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def export_frame(df, fmt, encoding=None):
+    """
+    Returns a byte generator for df in the requested format, compressed with
+    encoding when the format benefits from it.
+
+    Args:
+        df (pd.DataFrame): Frame to export.
+        fmt (str): One of FORMATS.
+        encoding (str): 'br', 'gzip' or None.
+    """
+    if fmt == "arrow":
+        chunks = iter_arrow(df)
+    elif fmt == "parquet":
+        chunks = iter_parquet(df)
+    else:
+        chunks = iter_csv(df)
+
+    if not FORMATS[fmt]["compressible"]:
+        encoding = None
+    return compress(chunks, encoding), encoding
@@ -0,0 +1,229 @@
+'''
+Screen-resolution downsampling of long line series.
+
+A daily series since 2010 has thousands of points per trace, several times
+what a chart is wide. DetailFigure keeps a figure's full-resolution traces
+with a pyramid of min/max decimated levels per trace (each LEVEL_FACTOR
+times denser than the last, the finest being the series itself) and serves:
+
+    overview()          every trace reduced to max_points, for the page
+    window(x0, x1)      the same for a zoomed x range, picked from the
+                        coarsest level that still has max_points in it
+
+The final reduction is Largest-Triangle-Three-Buckets, which keeps the shape
+of the line; the min/max levels keep every local extreme that LTTB may pick.
+Only line scatter traces with a sorted numeric or date x are reduced; every
+other trace is passed through unchanged.
+'''
+import base64
+
+import numpy as np
+import pandas as pd
+
+MAX_POINTS = 2000
+LEVEL_FACTOR = 4
+
+
+def lttb(x, y, n_out):
+    '''
+    Largest-Triangle-Three-Buckets: indices of n_out points of (x, y) that
+    keep its visual shape, always including the first and last. Points with
+    a NaN y are never preferred.
+    '''
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets between the first and last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    valid = ~np.isnan(y)
+    y_filled = np.where(valid, y, 0.0)
+    # Bucket means; the last bucket ends before the last point
+    counts = np.add.reduceat(valid[:-1].astype(np.int64), edges[:-1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = np.add.reduceat(x[:-1], edges[:-1]) / np.diff(edges)
+        mean_y = np.add.reduceat(y_filled[:-1], edges[:-1]) / counts
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i == n_out - 3:
+            next_x, next_y = x[n - 1], y[n - 1]
+        else:
+            next_x, next_y = mean_x[i + 1], mean_y[i + 1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        out[i + 1] = a
+    return out
+
+
+def minmax(y, n_out):
+    '''
+    Min/max decimation: indices of the minimum and maximum of each of
+    n_out / 2 equal buckets, plus the first and last point, in order.
+    '''
+    n = len(y)
+    buckets = n_out // 2
+    if n_out >= n or buckets < 1:
+        return np.arange(n)
+
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+    highs = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+    indices = np.concatenate(([0, n - 1], lows, highs))
+    return np.unique(indices[indices < n])
+
+
+def decode_array(value):
+    '''
+    Plotly's typed-array form ({'dtype', 'bdata', 'shape'}) as a numpy
+    array; any other value is returned unchanged.
+    '''
+    if isinstance(value, dict) and "bdata" in value and "dtype" in value:
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+        if "shape" in value:
+            array = array.reshape([int(s) for s in str(value["shape"]).split(",")])
+        return array
+    return value
+
+
+def as_position(value, like):
+    '''
+    value (a number, date string or timestamp) on the numeric scale of the
+    x array like, as returned by _numeric_x.
+    '''
+    if np.issubdtype(like.dtype, np.datetime64):
+        return float(pd.Timestamp(value).to_datetime64().astype(like.dtype).astype(np.int64))
+    return float(value)
+
+
+def _numeric_x(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype(np.int64).astype(np.float64)
+    if np.issubdtype(x.dtype, np.number):
+        return x.astype(np.float64)
+    return None
+
+
+class SeriesLevels:
+    '''
+    One trace's x positions and its decimation pyramid, coarsest first.
+    '''
+
+    def __init__(self, x, y, max_points=MAX_POINTS):
+        self.x = x
+        self.y = y
+        self.max_points = max_points
+        n = len(x)
+        self.levels = []
+        size = 2 * max_points
+        while size < n:
+            self.levels.append(minmax(y, size))
+            size *= LEVEL_FACTOR
+        self.levels.append(np.arange(n))
+
+    def window(self, x0=None, x1=None):
+        '''
+        Indices of at most max_points points covering [x0, x1] (the whole
+        series when a bound is None), plus one point past each end so the
+        line runs to the edges of the plot.
+        '''
+        for indices in self.levels:
+            xs = self.x[indices]
+            lo = 0 if x0 is None else max(int(np.searchsorted(xs, x0, "left")) - 1, 0)
+            hi = len(xs) if x1 is None else min(int(np.searchsorted(xs, x1, "right")) + 1, len(xs))
+            if hi - lo >= self.max_points:
+                break
+        selected = indices[lo:hi]
+        return selected[lttb(self.x[selected], self.y[selected], self.max_points)]
+
+
+def _reducible(trace, max_points):
+    if trace.get("type", "scatter") not in ("scatter", "scattergl"):
+        return None
+    if "lines" not in trace.get("mode", "lines"):
+        return None
+    if trace.get("xaxis", "x") != "x":
+        return None
+    x, y = decode_array(trace.get("x")), decode_array(trace.get("y"))
+    if x is None or y is None or len(x) != len(y) or len(x) <= max_points:
+        return None
+    numeric = _numeric_x(x)
+    y = np.asarray(y)
+    if numeric is None or not np.issubdtype(y.dtype, np.number):
+        return None
+    if np.any(np.diff(numeric) < 0):
+        return None
+    return SeriesLevels(numeric, y.astype(np.float64), max_points)
+
+
+def _decoded(trace):
+    # Per-point arrays as numpy, nested one level (marker.color, line.width)
+    decoded = {}
+    for key, value in trace.items():
+        if isinstance(value, dict) and "bdata" not in value:
+            decoded[key] = {k: decode_array(v) for k, v in value.items()}
+        else:
+            decoded[key] = decode_array(value)
+    return decoded
+
+
+def _take(trace, n, indices):
+    def take(value):
+        if isinstance(value, (np.ndarray, list, tuple)) and len(value) == n:
+            return np.asarray(value)[indices]
+        return value
+
+    subset = {}
+    for key, value in trace.items():
+        if isinstance(value, dict):
+            subset[key] = {k: take(v) for k, v in value.items()}
+        else:
+            subset[key] = take(value)
+    return subset
+
+
+class DetailFigure:
+    '''
+    A figure dict (Figure.to_plotly_json()) at full resolution, served at
+    max_points per trace. Read-only once built; safe to share between
+    requests.
+    '''
+
+    def __init__(self, figure, max_points=MAX_POINTS):
+        self.layout = figure.get("layout", {})
+        self.traces = []
+        for trace in figure.get("data", []):
+            series = _reducible(trace, max_points)
+            self.traces.append((_decoded(trace) if series is not None else trace, series))
+
+    @property
+    def reducible(self):
+        return any(series is not None for _, series in self.traces)
+
+    def window(self, x0=None, x1=None):
+        '''
+        The figure with every reducible trace cut down to max_points in
+        [x0, x1]. Bounds are plotly axis values: numbers or date strings.
+        '''
+        data = []
+        for trace, series in self.traces:
+            if series is None:
+                data.append(trace)
+                continue
+            x = trace["x"]
+            lo = None if x0 is None else as_position(x0, np.asarray(x))
+            hi = None if x1 is None else as_position(x1, np.asarray(x))
+            data.append(_take(trace, len(series.x), series.window(lo, hi)))
+        # A constant uirevision keeps the user's zoom when the figure is swapped
+        return {"data": data, "layout": dict(self.layout, uirevision="detail")}
+
+    def overview(self):
+        return self.window()
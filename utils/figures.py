@@ -0,0 +1,181 @@
+import base64
+
+from dash import dcc
+import numpy as np
+import plotly.io as pio
+from plotly.basedatatypes import BaseFigure
+
+try:
+    import orjson  # noqa: F401  (only needed by plotly's orjson engine)
+    FIGURE_JSON_ENGINE = "orjson"
+except ImportError:
+    FIGURE_JSON_ENGINE = "json"
+
+def find_graph(component):
+    if isinstance(component, dcc.Graph):
+        return component.figure
+    if hasattr(component, "children"):
+        children = component.children
+        if isinstance(children, list):
+            for child in children:
+                result = find_graph(child)
+                if result:
+                    return result
+        else:
+            return find_graph(children)
+    return None
+
+def figure_to_json(fig):
+    '''
+    Serializes a plotly Figure with the fastest available encoder. The figure was
+    validated when it was built, so validation is skipped here.
+    '''
+    return pio.to_json(fig, validate=False, engine=FIGURE_JSON_ENGINE)
+
+
+def iter_graphs(component):
+    '''
+    Yields every dcc.Graph in a layout tree, depth first.
+    '''
+    if isinstance(component, dcc.Graph):
+        yield component
+        return
+    children = getattr(component, "children", None)
+    for child in children if isinstance(children, (list, tuple)) else [children]:
+        if child is not None:
+            yield from iter_graphs(child)
+
+
+def freeze_figures(component):
+    '''
+    Replaces every dcc.Graph figure in a layout tree with its plain dict form,
+    in place. The dict is what Dash and figure_to_json serialize anyway, so a
+    layout that is built once and served many times skips the Figure objects
+    and their validators on every request. Returns the component.
+    '''
+    for graph in iter_graphs(component):
+        if isinstance(graph.figure, BaseFigure):
+            graph.figure = graph.figure.to_plotly_json()
+    return component
+
+
+# Write numeric and date trace arrays as base64 typed arrays; off leaves
+# them as Figure.to_plotly_json() returns them
+TYPED_ARRAYS = True
+
+# numpy dtype -> Plotly.js typed array dtype; Plotly.js has no 64-bit ints
+TYPED_ARRAY_DTYPES = {
+    "float64": "f8", "float32": "f4",
+    "int32": "i4", "uint32": "u4",
+    "int16": "i2", "uint16": "u2",
+    "int8": "i1", "uint8": "u1",
+}
+
+
+def typed_array(array):
+    '''
+    A numeric numpy array as Plotly's typed array form {'dtype', 'bdata'
+    (, 'shape')}, or None when Plotly.js has no typed array for its dtype.
+    64-bit integers are narrowed to int32 when they fit, float64 otherwise.
+    '''
+    if array.dtype.kind in "iu" and array.itemsize == 8:
+        fits = array.size == 0 or (array.min() >= np.iinfo(np.int32).min and array.max() <= np.iinfo(np.int32).max)
+        array = array.astype(np.int32 if fits else np.float64)
+    dtype = TYPED_ARRAY_DTYPES.get(array.dtype.name)
+    if dtype is None:
+        return None
+    spec = {
+        "dtype": dtype,
+        "bdata": base64.b64encode(np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))).decode("ascii"),
+    }
+    if array.ndim > 1:
+        spec["shape"] = ",".join(str(n) for n in array.shape)
+    return spec
+
+
+def _encode_arrays(value):
+    if isinstance(value, np.ndarray):
+        spec = typed_array(value) if value.dtype.kind in "iuf" else None
+        return value if spec is None else spec
+    if isinstance(value, dict):
+        return {key: _encode_arrays(item) for key, item in value.items()}
+    return value
+
+
+def _axis_key(axis_id):
+    # Trace axis reference ('x', 'y2') -> layout key ('xaxis', 'yaxis2')
+    return f"{axis_id[0]}axis{axis_id[1:]}"
+
+
+def encode_typed_arrays(figure):
+    '''
+    Returns a figure dict (Figure.to_plotly_json()) with every numeric trace
+    array as a base64 typed array, which Plotly.js decodes without parsing
+    text. Date x and y arrays become milliseconds since the epoch (NaT as
+    NaN) on an axis set to type 'date', which Plotly.js reads the same way
+    as the date strings they replace. The input is not modified.
+    '''
+    if not TYPED_ARRAYS:
+        return figure
+    layout = dict(figure.get("layout") or {})
+    data = []
+    for trace in figure.get("data") or []:
+        trace = dict(trace)
+        for letter in ("x", "y"):
+            value = trace.get(letter)
+            if not (isinstance(value, np.ndarray) and value.dtype.kind == "M"):
+                continue
+            key = _axis_key(trace.get(f"{letter}axis", letter))
+            axis = dict(layout.get(key) or {})
+            if axis.get("type") not in (None, "-", "date"):
+                continue
+            axis["type"] = "date"
+            layout[key] = axis
+            millis = value.astype("datetime64[ms]").astype(np.int64).astype(np.float64)
+            millis[np.isnat(value)] = np.nan
+            trace[letter] = millis
+        data.append(_encode_arrays(trace))
+    return dict(figure, data=data, layout=layout)
+
+
+# Plotly.js reads typed arrays from 2.28 on. Embeds run on pages that load
+# their own Plotly.js, so on older versions the embed script turns them back
+# into plain arrays before plotting: TYPED_ARRAY_FALLBACK_JS defines
+# decodeTypedArrays(figure) for it.
+TYPED_ARRAY_FALLBACK_JS = """
+function supportsTypedArrays() {
+    const [major, minor] = String(Plotly.version || "0.0").split(".").map(Number);
+    return major > 2 || (major === 2 && minor >= 28);
+}
+
+function decodeTypedArrays(value) {
+    if (Array.isArray(value)) {
+        return value.map(decodeTypedArrays);
+    }
+    if (value === null || typeof value !== "object") {
+        return value;
+    }
+    if (typeof value.bdata === "string" && typeof value.dtype === "string") {
+        const types = {
+            f8: Float64Array, f4: Float32Array, i4: Int32Array, u4: Uint32Array,
+            i2: Int16Array, u2: Uint16Array, i1: Int8Array, u1: Uint8Array, u1c: Uint8ClampedArray
+        };
+        const bytes = Uint8Array.from(atob(value.bdata), (c) => c.charCodeAt(0));
+        const flat = Array.from(new types[value.dtype](bytes.buffer));
+        const shape = value.shape ? String(value.shape).split(",").map(Number) : [flat.length];
+        if (shape.length < 2) {
+            return flat;
+        }
+        const rows = [];
+        for (let i = 0; i < shape[0]; i++) {
+            rows.push(flat.slice(i * shape[1], (i + 1) * shape[1]));
+        }
+        return rows;
+    }
+    const decoded = {};
+    for (const key of Object.keys(value)) {
+        decoded[key] = decodeTypedArrays(value[key]);
+    }
+    return decoded;
+}
+"""
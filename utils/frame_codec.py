@@ -0,0 +1,127 @@
+import pickle
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # without pyarrow frames are cached as plain pickles
+    pa = None
+
+CODEC = "arrow-zstd"
+# Frames Arrow can't represent (e.g. object columns of mixed types)
+PICKLE_CODEC = "pickle"
+
+# Object/string columns with fewer distinct values than this share of rows are
+# dictionary-encoded (e.g. 'category' in get_cash_flow_tax_us_companies)
+DICTIONARY_MAX_RATIO = 0.5
+
+# float64 -> float32 is lossy, so it is opt-in
+DOWNCAST_FLOATS = False
+
+# Below this the Arrow schema overhead outweighs the savings
+ARROW_MIN_ROWS = 100
+
+
+def _is_stringy(series):
+    return series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+
+
+def _compact(df, downcast_floats):
+    """
+    Shrinks column types before encoding and returns the original dtype of
+    every column that was changed, so decode can restore it.
+    """
+    restore = {}
+    columns = {}
+    for name, series in df.items():
+        original = series.dtype
+        if _is_stringy(series) and len(series) and series.nunique(dropna=True) <= DICTIONARY_MAX_RATIO * len(series):
+            series = series.astype("category")
+        elif pd.api.types.is_integer_dtype(original) and not isinstance(original, pd.CategoricalDtype):
+            series = pd.to_numeric(series, downcast="integer")
+        elif downcast_floats and original == "float64":
+            series = series.astype("float32")
+        if series.dtype != original:
+            restore[name] = str(original)
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index), restore
+
+
+def _default_index(index):
+    # Decoding without an index gives back exactly RangeIndex(len(df))
+    return (isinstance(index, pd.RangeIndex) and index.name is None
+            and index.equals(pd.RangeIndex(len(index))))
+
+
+def encode_frame(df, downcast_floats=DOWNCAST_FLOATS):
+    """
+    Serializes a DataFrame as a zstd-compressed Arrow IPC stream with integer
+    downcasting and dictionary-encoded string columns.
+
+    Returns:
+        dict: {'codec', 'data', 'restore'} ready to be pickled by the cache.
+    """
+    compact, restore = _compact(df, downcast_floats)
+    # Any other index is kept; a shifted or named RangeIndex only as metadata
+    table = pa.Table.from_pandas(compact, preserve_index=False if _default_index(df.index) else None)
+
+    sink = pa.BufferOutputStream()
+    options = pa_ipc.IpcWriteOptions(compression="zstd")
+    with pa_ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return {"codec": CODEC, "data": sink.getvalue().to_pybytes(), "restore": restore}
+
+
+def decode_frame(payload):
+    df = pa_ipc.open_stream(payload["data"]).read_pandas()
+    for name, dtype in payload["restore"].items():
+        df[name] = df[name].astype(dtype)
+    return df
+
+
+def encode_value(value):
+    """
+    Cache-side encoding: DataFrames become Arrow payloads, anything else is
+    stored as is. A frame the Arrow path rejects is stored as a tagged
+    pickle instead, so it is still cached.
+    """
+    if pa is not None and isinstance(value, pd.DataFrame) and len(value) >= ARROW_MIN_ROWS:
+        try:
+            return encode_frame(value)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            print(f"⚠️ Arrow encoding failed, caching as pickle: {e}")
+            return {"codec": PICKLE_CODEC, "data": pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)}
+    return value
+
+
+def decode_value(value):
+    if isinstance(value, dict) and value.get("codec") == CODEC:
+        return decode_frame(value)
+    if isinstance(value, dict) and value.get("codec") == PICKLE_CODEC:
+        return pickle.loads(value["data"])
+    return value
+
+
+def size_report(frames):
+    """
+    Bytes per cached frame as a pickle versus the Arrow encoding.
+
+    Args:
+        frames (dict): {name: DataFrame}
+
+    Returns:
+        list: [{'name', 'rows', 'pickle_bytes', 'encoded_bytes', 'ratio'}, ...]
+    """
+    report = []
+    for name, df in frames.items():
+        pickled = len(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+        encoded = len(pickle.dumps(encode_value(df), protocol=pickle.HIGHEST_PROTOCOL))
+        report.append({
+            "name": name,
+            "rows": len(df),
+            "pickle_bytes": pickled,
+            "encoded_bytes": encoded,
+            "ratio": round(pickled / encoded, 2) if encoded else None,
+        })
+    return report